@@ -1,250 +1,116 @@
+import argparse
 import asyncio
 import os
+import sys
 import logging
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import scrapy # type: ignore
 from scrapy.crawler import CrawlerProcess # type: ignore
-import time
 from dotenv import load_dotenv # type: ignore
+from ingestion import fetch_forecasts, use_api_base
+from forecast_decoder import decode_forecast
+from geocode_cache import GeocodeCache
+from hotels import hotel_table
+from hotel_cache import HotelCache
+from forecast_store import FORECAST_FOLDER, append_partition
+from results_store import RESULTS_FOLDER, LEGACY_CSV, table_path, build_tables, write_results, read_results
+from checkpoints import RunState
+from region_maps import write_region_maps
+from cities import CITY_IDS, all_cities
 
 # coucou
 # Forcer SelectorEventLoop sur Windows
 if asyncio.get_event_loop_policy().__class__.__name__ == 'WindowsProactorEventLoopPolicy':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-# API Key OpenWeatherMap
-load_dotenv()
-api_key = os.getenv("API_KEY")
-
-# Liste des villes
-villes = [
-    # Analyse Météo
-    "Paris","Lyon", "Toulouse",    "Nantes", "Strasbourg", "Bordeaux", "Lille", 
-    "Rennes", "Reims", "Saint-Étienne", "Toulon", "Dijon", "Angers", "Nîmes", 
-    "Villeurbanne", "Le Mans", "Clermont-Ferrand", "Brest", "Aix-en-Provence", 
-    "Amiens", "Limoges", "Annecy", "Perpignan", "Caen", "Metz", "Besançon", 
-    "Orléans", "Rouen", "Avignon", "Pau", "Poitiers", "Mulhouse", "Colmar", 
-    "Chambéry", "Lourdes", "Arles", "Carcassonne", "Albi", "Ajaccio",
-
-    # Liste des parcs et autres attractions
-    #"Disneyland Paris", "Parc Astérix", "Futuroscope", "Puy du Fou", 
-    #"Le Pal", "Nigloland", "Walibi Rhône-Alpes", "Walibi Sud-Ouest",
-    #"France Miniature", "ZooParc de Beauval", "Terra Botanica",
-    #"Le palais idéal du Facteur Cheval", "Château de Chambord",
-    #"Château de Versailles", "Château de Vaux-le-Vicomte", "Château de Chenonceau",
-
-    
-    #Alpes
-    #Les Ecrins
-    "Bourg d'Oisans", "Le Périer", "La Chapelle-en-Valgaudémar", "Vallouise",
-    "Ailefroide", "Monêtier-les-Bains", "La Grave", "Saint-Christophe-en-Oisans",
-    #Mt-Blanc
-    "Chamonix", "Les Houches", "Saint-Gervais-les-Bains", 
-    "Servoz", "Vallorcine", "Argentière", "Combloux", "Megève", 
-    "Les Contamines-Montjoie", "Cordon", "Domancy", "Demi-Quartier", 
-    "Praz-sur-Arly", "Sixt-Fer-à-Cheval", 
-    #Vanoise
-    "Val-d'Isère", "Tignes", "Pralognan-la-Vanoise", "Termignon", "Modane", 
-    "Bonneval-sur-Arc", "Aussois", "Lanslebourg-Mont-Cenis", "Bessans",
-    #Beaufortain "Beaufort", 
-    "Arêches", "Les Saisies", "Hauteluce", "Villard-sur-Doron", 
-    "Queige",
-    #Chartreuse
-    "Saint-Pierre-de-Chartreuse", "Grenoble", "Le Sappey-en-Chartreuse",
-    "Saint-Laurent-du-Pont", "Entremont-le-Vieux",
-    #Mercantour
-    "Saint-Martin-Vésubie", "Isola", "Barcelonnette", "Tende", "Valdeblore",
-    "La Brigue", "Breil-sur-Roya", "Rimplas",
-    #Queyras
-    "Saint-Véran", "Abriès", "Ceillac", "Guillestre", "Molines-en-Queyras", 
-    "Château-Ville-Vieille", "Aiguilles",
-    #Maurienne
-    "Saint-Jean-de-Maurienne", "Valloire", "Lanslebourg-Mont-Cenis", "Termignon", 
-    "Albiez-Montrond", "Aussois", "Bessans", "Saint-Sorlin-d'Arves", 
-    "Saint-Colomban-des-Villards",
-    #Pyrénées
-    #Pyrénées Occidentales (Ouest)
-    "Gourette", "Eaux-Bonnes", "Artouste", "Arudy", "Oloron-Sainte-Marie", 
-    "Portet-d'Aspet",
-    #Pyrénées Centrales
-    "Saint-Lary-Soulan", "Luz-Saint-Sauveur", "Cauterets", "Gavarnie", "Barèges", 
-    "Bagnères-de-Bigorre", "Piau-Engaly", "Campan", "Ax-les-Thermes", 
-    "Luchon (Bagnères-de-Luchon)", "Peyragudes",
-    #Pyrénées Orientales (Est)
-    "Font-Romeu", "Les Angles", "Mont-Louis", "Villefranche-de-Conflent", 
-    "Prats-de-Mollo-la-Preste",
-    #Jura
-    "Les Rousses", "Morbier", "Saint-Claude", "Lons-le-Saunier", "Arbois", 
-    "Baume-les-Messieurs", "Salins-les-Bains", "Métabief", "Clairvaux-les-Lacs", 
-    "Lamoura", "Château-Chalon", "Nantua",   
-    #Mediterranée
-    "Nice", "Cannes", "Antibes", "Saint-Tropez", "Menton", "Juan-les-Pins", 
-    "Marseille", "Cassis", "Bandol", "Hyères", "Sanary-sur-Mer", "Montpellier", 
-    "Sète", "Agde", "Cap d’Agde", "Gruissan", "Narbonne", "Palavas-les-Flots", 
-    "Collioure", "Port-Vendres", "Banyuls-sur-Mer", "Argelès-sur-Mer",
-    #Littoral Atlantique
-    "Hendaye", "Saint-Jean-de-Luz", "Biarritz", "Anglet", "Bayonne", "Hossegor", 
-    "Capbreton", "Seignosse", "Biscarrosse", "Mimizan", "Arcachon", 
-    "Lège-Cap-Ferret", "Lacanau", "Soulac-sur-Mer", "Les Sables-d'Olonne", 
-    "Saint-Jean-de-Monts", "Saint-Gilles-Croix-de-Vie", "La Tranche-sur-Mer", 
-    "Île de Noirmoutier", "Île d'Yeu", "La Rochelle", "Île de Ré", "Île d'Oléron", 
-    "Royan", "Châtelaillon-Plage", "Rochefort", 
-    #Bretagne/Normandie
-    "Vannes", "Lorient", "Carnac", "Quiberon", "La Baule", "Pornic", "Saint-Nazaire",
-    "Pornic", "Préfailles", "Saint-Brévin-les-Pins", "Saint-Malo", "Dinard", 
-    "Cancale", "Deauville", "Trouville-sur-Mer", "Cabourg", "Honfleur", "Étretat", 
-    "Fécamp", "Dieppe", "Le Havre",
-    #Littoral de la Manche
-    "Calais", "Boulogne-sur-Mer", "Wimereux", "Wissant", "Le Touquet", 
-    "Berck-sur-Mer", "Saint-Valery-sur-Somme", "Le Crotoy", "Cayeux-sur-Mer", 
-    "Mers-les-Bains"
+# Page de recherche Booking scrapée pour chaque ville
+booking_url = "https://www.booking.com/searchresults.html"
+
+# URL SNCF personnalisé par ville
+train_base_url = "https://www.sncf-connect.com/app/home/search/od?originLabel=Paris&originId=RESARAIL_STA_8768600&destinationLabel={}&destinationId=RESARAIL_STA_8774678&outwardDateTime=2025-01-15T08:30:00&directTrains=true"
+
+# Nominatim, OpenWeatherMap et Booking remplacés par un serveur de rejeu local (bench/replay_server.py) :
+#   python Weekend_getaway_project.py --api-base http://127.0.0.1:8765   (ou API_BASE_URL dans l'environnement)
+def use_replay_server(base_url):
+    global booking_url
+    use_api_base(base_url)
+    booking_url = f"{base_url}/booking/searchresults.html"
+
+
+# Liste des colonnes fichiers forecasts
+columns_to_save = [
+    "Ville", "Latitude", "Longitude", "Date",
+    "Temp_Max", "Temp_Min", "Humidity", "Weather", "Rain_Probability",
+    "Weather_Score", "Temp_Avg", "Run_Date"
 ]
 
-# URL API Nominatim (OpenStreetMap) pour récupérer les coordonnées
-nominatim_url = "https://nominatim.openstreetmap.org/search"
-
-# Liste pour stocker les résultats météo
-meteo_resultats = []
-
-# Dictionnaire de notation des conditions météo
-notations = {
-    "clear sky": 600,
-    "few clouds": 500,
-    "scattered clouds": 400,
-    "broken clouds": 300,
-    "overcast clouds": 200,    
-
-    "light intensity drizzle": -1,
-    "drizzle": -2,
-    "heavy intensity drizzle": -3,
-    "light intensity drizzle rain": -4,
-    "drizzle rain": -5,
-    "heavy intensity drizzle rain": -6,
-    "shower drizzle": -7,
-    "shower rain and drizzle": -8,
-    "heavy shower rain and drizzle": -9,    
-
-    "light rain": -10,
-    "moderate rain": -20,
-    "heavy intensity rain": -30,
-    "very heavy rain": -40,
-    "extreme rain": -50,
-    "freezing rain": -60,
-    "light intensity shower rain": -70,
-    "shower rain": -80,
-    "heavy intensity shower rain": -90,
-    "ragged shower rain": -100,
-
-    "thunderstorm with light drizzle": -15,
-    "thunderstorm with drizzle": -25,
-    "thunderstorm with light rain": -35,
-    "thunderstorm with rain": -45,
-    "thunderstorm with heavy drizzle": -55,
-    "thunderstorm with heavy rain": -65,
-    "thunderstorm": -75,
-    "heavy thunderstorm": -85,
-    "ragged thunderstorm": -95,
-
-    "light snow": -20,
-    "snow": -40,
-    "heavy snow": -60,
-    "sleet": -80,
-    "light shower sleet": -100,
-    "shower sleet": -120,
-    "light rain and snow": -140,
-    "rain and snow": -160,
-    "light shower snow": -180,
-    "shower snow": -200,
-    "heavy shower snow": -220,
-
-    "mist": -10,
-    "smoke": -20,
-    "haze": -30,
-    "sand/dust whirls": -40,
-    "fog": -50,
-    "sand": -60,
-    "dust": -70,
-    "volcanic ash": -90,
-    "squalls": -100,
-    "tornado": -400,
-}
-
-# Créer une colonne "Day_Time"
-def time_of_the_day(dt):
-    hour = dt.hour
-    if 6 <= hour < 12:
-        return "Morning"
-    elif 12 <= hour < 18:
-        return "Afternoon"
-    elif 18 <= hour < 22:
-        return "Evening"
-    else:
-        return "Night"
-
-# Boucle pour récupérer les coordonnées et la météo
-for ville in villes:
-    params = {"city": ville, "country": "France", "format": "json", "limit": 1}
-    headers = {"User-Agent": "NotNecessary"}
-    r = requests.get(nominatim_url, params=params, headers=headers)
-
-    if r.status_code == 200:
-        data = r.json()
-        if data:
-            lat, lon = data[0]["lat"], data[0]["lon"]
-            weather_url = f"https://api.openweathermap.org/data/2.5/forecast"
-            weather_params = {"lat": lat, "lon": lon, "units": "metric", "appid": api_key}
-            weather_r = requests.get(weather_url, params=weather_params)
-
-            if weather_r.status_code == 200:
-                weather_data = weather_r.json()
-                for day in weather_data['list']:
-                    date_hour = pd.to_datetime(day["dt"],unit="s")
-                    meteo_resultats.append({
-                        "Ville": ville,
-                        "Latitude": lat,
-                        "Longitude": lon,
-                        "Date": date_hour.strftime('%Y-%m-%d'),
-                        "Hour": date_hour.hour,
-                        "Day_Time": time_of_the_day(date_hour),
-                        "Temp_Max": day['main']['temp_max'],
-                        "Temp_Min": day['main']['temp_min'],
-                        "Humidity": day['main']['humidity'],
-                        "Weather": day['weather'][0]['description'],
-                        "Rain_Probability": day['pop']
-                    })
-    # Attente pour respecter les limites des API
-    time.sleep(1)
-
-# Convertir les résultats météo en DataFrame
-df_meteo = pd.DataFrame(meteo_resultats)
-df_meteo["Weather_Score"] = df_meteo["Weather"].map(notations)
-df_meteo["Temp_Avg"] = (df_meteo["Temp_Max"] + df_meteo["Temp_Min"]) / 2
-# Add the column Run_Date
-run_date = datetime.now().strftime("%Y-%m-%d")
-df_meteo["Run_Date"] = run_date
-# convert the "Date" in a datetime format
-df_meteo["Date"] = pd.to_datetime(df_meteo["Date"])
-
-
-
-# SCRAPING
-
-# Liste pour les hôtels
-hotel_results = []
 
+# ÉTAPE 1 : coordonnées et météo
+def fetch_weather(villes, api_key, run_date, state):
+    # Cache des coordonnées (pré-rempli depuis les derniers résultats au premier lancement)
+    geocodes = GeocodeCache().load()
+    if not geocodes.entries:
+        geocodes.warm_from_csv(table_path("cities")) or geocodes.warm_from_csv(LEGACY_CSV)
+
+    # Récupérer les coordonnées et la météo des villes pas encore enregistrées
+    # (requêtes parallèles, limitées par API, chaque ville est enregistrée dès sa réception)
+    missing = state.missing_cities(villes)
+    if missing:
+        fetch_forecasts(missing, api_key, geocodes, on_result=state.save_city, on_not_found=state.save_not_found)
+        geocodes.save()
+    not_found = state.not_found_cities(villes)
+    if not_found:
+        print(f"{len(not_found)} villes introuvables, écartées : {', '.join(not_found)}")
+    failed = state.missing_cities(villes)
+    if failed:
+        print(f"{len(failed)} villes sans météo (relancer avec --resume) : {', '.join(failed)}")
+
+    forecasts = state.load_cities(villes)
+
+    # Convertir les résultats météo en DataFrame (une conversion en colonnes par ville)
+    df_meteo = pd.concat(
+        [decode_forecast(CITY_IDS[ville], ville, lat, lon, weather_data)
+         for ville, lat, lon, weather_data in forecasts],
+        ignore_index=True
+    )
+    # Add the column Run_Date
+    df_meteo["Run_Date"] = run_date
+    return df_meteo
+
+
+# ÉTAPE 2 : SCRAPING des hôtels
 class BookingSpider(scrapy.Spider):
     name = "booking_spider"
 
+    def __init__(self, villes, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.villes = villes
+        self.cache = cache
+
     def start_requests(self):
-        for ville in villes:
-            url = f"https://www.booking.com/searchresults.html?ss={ville.replace(' ', '+')}"
-            yield scrapy.Request(url=url, callback=self.parse, meta={"city": ville})
+        for ville in self.villes:
+            url = f"{booking_url}?ss={ville.replace(' ', '+')}"
+            yield scrapy.Request(
+                url=url,
+                callback=self.parse,
+                headers=self.cache.conditional_headers(ville),
+                meta={"city": ville, "handle_httpstatus_list": [304]}
+            )
+
+    # Scrapy >= 2.13 démarre par start() (start_requests n'est plus appelé à partir de 2.19)
+    async def start(self):
+        for request in self.start_requests():
+            yield request
 
     def parse(self, response):
-        hotels = response.css("div[data-testid='property-card-container']")[:5]
         city = response.meta["city"]
+        # Page inchangée depuis le dernier passage : on garde les hôtels en cache
+        if response.status == 304:
+            self.cache.touch(city)
+            return
+
+        hotels = response.css("div[data-testid='property-card-container']")[:5]
         hotel_info = []
 
         for hotel in hotels:
@@ -259,101 +125,136 @@ class BookingSpider(scrapy.Spider):
                     "note": note.strip() if note else "N/A"
                 })
 
-        hotel_results.append({"city": city, "hotels": hotel_info})
-
-
-# Configurer et exécuter le processus Scrapy
-process = CrawlerProcess(settings={
-    'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    'LOG_LEVEL': logging.INFO,
-})
-process.crawl(BookingSpider)
-process.start(install_signal_handlers=False)
-
-# Intégrer les résultats météo et hôtels
-combined_results = []
-
-# URL SNCF personnalisé par ville
-train_base_url = "https://www.sncf-connect.com/app/home/search/od?originLabel=Paris&originId=RESARAIL_STA_8768600&destinationLabel={}&destinationId=RESARAIL_STA_8774678&outwardDateTime=2025-01-15T08:30:00&directTrains=true"
-
-for _, row in df_meteo.iterrows():
-    ville = row["Ville"]
-    hotels = next((h["hotels"] for h in hotel_results if h["city"] == ville), [])
-    combined_row = row.to_dict()
-    for i, hotel in enumerate(hotels):
-        combined_row[f"Hotel_{i+1}_Name"] = hotel.get("hotel_name", "N/A")
-        combined_row[f"Hotel_{i+1}_Link"] = hotel.get("link", "N/A")
-        combined_row[f"Hotel_{i+1}_Note"] = hotel.get("note", "N/A")
-    
-    combined_row["Train"] = train_base_url.format(ville.replace(" ", "%20"))
-    combined_results.append(combined_row)
-
-# Convertir en DataFrame
-df_combined = pd.DataFrame(combined_results)
-
-# Sauvegarder les données combinées dans un fichier principal
-output_file = "final_results.csv"
-df_combined.to_csv(output_file, index=False, encoding="utf-8")
-print(f"Les résultats finaux ont été enregistrés dans {output_file}.")
-
-
-
-# Charger les données météo consolidées
-df_meteo = pd.read_csv("final_results.csv")
-df_meteo["Date"] = pd.to_datetime(df_meteo["Date"])
-
-
-# Chemin de sauvegarde des fichiers forecasts
-output_folder = "forecasts"
-os.makedirs(output_folder, exist_ok=True)
-
-# Liste des villes fichiers forecasts
-cities_to_split = [
-    "Paris", "Marseille", "Lyon", "Toulouse", "Nice", "Nantes", "Strasbourg",
-    "Montpellier", "Bordeaux", "Lille", "Rennes", "Reims", "Le Havre",
-    "Saint-Étienne", "Toulon", "Grenoble", "Dijon", "Angers", "Nîmes",
-    "Villeurbanne", "Le Mans", "Clermont-Ferrand", "Brest", "Aix-en-Provence",
-    "Amiens", "Limoges", "Annecy", "Perpignan", "Boulogne-sur-Mer", "Biarritz",
-    "Caen", "Metz", "Besançon", "Orléans", "Rouen", "Avignon", "Pau",
-    "Poitiers", "Mulhouse", "La Rochelle", "Bayonne", "Colmar", "Chambéry",
-    "Lourdes", "Saint-Malo", "Chamonix", "Arles", "Carcassonne",
-    "Albi", "Ajaccio"
-]
-
-# Liste des colonnes fichiers forecasts
-columns_to_save = [
-    "Ville", "Latitude", "Longitude", "Date",
-    "Temp_Max", "Temp_Min", "Humidity", "Weather", "Rain_Probability",
-    "Weather_Score", "Temp_Avg", "Run_Date"
-]
-
-# Sauvegarder les prévisions d'un jour spécifique
-def save_forecast_append(df, day_offset, output_folder, cities, columns):
+        # Page vide (blocage, changement de mise en page) : ne pas écraser une liste valide
+        if not hotel_info and self.cache.get(city):
+            return
+        self.cache.put(
+            city,
+            hotel_info,
+            etag=(response.headers.get("ETag") or b"").decode() or None,
+            last_modified=(response.headers.get("Last-Modified") or b"").decode() or None
+        )
+
+
+def scrape_hotels(villes, state):
+    hotels = state.load_hotels()
+    if hotels is not None:
+        return hotels
+
+    # Seules les villes jamais vues ou dont le cache a expiré sont scrapées
+    cache = HotelCache().load()
+    stale = cache.stale_cities(villes)
+    print(f"Hôtels : {len(villes) - len(stale)} villes servies par le cache, {len(stale)} à scraper.")
+
+    if stale:
+        # Configurer et exécuter le processus Scrapy
+        process = CrawlerProcess(settings={
+            'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'LOG_LEVEL': logging.INFO,
+        })
+        process.crawl(BookingSpider, villes=stale, cache=cache)
+        process.start(install_signal_handlers=False)
+        cache.save()
+
+    # Table des hôtels (une ligne par ville et par hôtel)
+    hotel_results = [
+        {"city": ville, "hotels": cache.get(ville)}
+        for ville in villes if cache.get(ville) is not None
+    ]
+    hotels = hotel_table(hotel_results)
+    state.save_hotels(hotels)
+    return hotels
+
+
+# ÉTAPE 3 : tables de résultats (prévisions + villes, hôtels et liens SNCF, reliés par City_Id)
+def combine(df_meteo, hotels):
+    train_links = {ville: train_base_url.format(ville.replace(" ", "%20")) for ville in df_meteo["Ville"].unique()}
+    return build_tables(df_meteo, hotels, train_links)
+
+
+# ÉTAPE 4 : archiver les prévisions d'un jour spécifique (nouvelle partition uniquement)
+def save_forecast_append(df, day_offset, run_date, output_folder, cities, columns):
     target_date = (datetime.now() + timedelta(days=day_offset)).date()
     # Filtrer les données par date, ville et colonnes
     filtered_data = df[(df["Date"].dt.date == target_date) & (df["Ville"].isin(cities))]
     filtered_data = filtered_data[columns]
-     
+
     if not filtered_data.empty:
-        output_file = os.path.join(output_folder, f"weather_data_forecast_{day_offset}day.csv")
-        
-        if os.path.exists(output_file):
-            # Charger les données existantes
-            existing_data = pd.read_csv(output_file)
-            combined_data = pd.concat([existing_data, filtered_data], ignore_index=True)
-        else:            
-            combined_data = filtered_data
-        
-        # Sauvegarder les données combinées
-        combined_data.to_csv(output_file, index=False, encoding="utf-8")
-        print(f"Données ajoutées à {output_file}.")
+        partition_file = append_partition(filtered_data, day_offset, run_date, output_folder)
+        print(f"Données ajoutées à {partition_file}.")
     else:
         print(f"Aucune donnée disponible pour la date {target_date}.")
 
-# Sauvegarder les 5 jours de prévision pour les 50 villes
-for day in range(1, 6):
-    save_forecast_append(df_meteo, day, output_folder, cities_to_split, columns_to_save)
 
-# Sauvegarder final_results.csv
-df_meteo.to_csv("final_results.csv", index=False, encoding="utf-8")
-print("final_results.csv sauvegardé.")
\ No newline at end of file
+def archive_forecasts(df, run_date):
+    # Sauvegarder les 5 jours de prévision pour toutes les villes (l'archive compactée ne garde que les révisions)
+    for day in range(1, 6):
+        save_forecast_append(df, day, run_date, FORECAST_FOLDER, all_cities(), columns_to_save)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collecte quotidienne météo + hôtels")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="reprendre l'exécution du jour là où elle s'est arrêtée (villes et étapes manquantes uniquement)"
+    )
+    parser.add_argument(
+        "--api-base",
+        help="URL d'un serveur de rejeu (bench/replay_server.py) à la place des vraies API (défaut : API_BASE_URL)"
+    )
+    args = parser.parse_args()
+
+    # API Key OpenWeatherMap
+    load_dotenv()
+    api_key = os.getenv("API_KEY")
+    api_base = args.api_base or os.getenv("API_BASE_URL")
+    if api_base:
+        use_replay_server(api_base)
+        print(f"API rejouées depuis {api_base}.")
+
+    # Liste des villes (référentiel partagé avec les pages, sans doublons)
+    villes = all_cities()
+    run_date = datetime.now().strftime("%Y-%m-%d")
+
+    # Points de reprise de l'exécution du jour
+    state = RunState(run_date)
+    if not args.resume:
+        state.reset()
+
+    if state.stage_done("final_results"):
+        df_meteo = read_results(columns=columns_to_save)
+    else:
+        df_meteo = fetch_weather(villes, api_key, run_date, state)
+        hotels = scrape_hotels(villes, state)
+        tables = combine(df_meteo, hotels)
+
+        # Sauvegarder les tables lues par les pages (écritures atomiques)
+        write_results(tables)
+        # Cartes animées des pages Trek & Mountains et Sea & Sun, prêtes à être servies.
+        # Facultatives : en cas d'échec les pages les construisent à la volée, l'archivage doit quand même avoir lieu
+        try:
+            write_region_maps()
+        except Exception as e:
+            print(f"Cartes des régions non générées : {e}")
+        print(f"Les résultats finaux ont été enregistrés dans {RESULTS_FOLDER}/.")
+        # Étape terminée seulement si aucune ville ne manque (hors villes introuvables),
+        # sinon --resume réessaiera les manquantes
+        if not state.missing_cities(villes):
+            state.mark_stage("final_results")
+
+    # Les partitions du jour sont remplacées, l'archivage peut être refait sans doublon
+    if not state.stage_done("archive"):
+        archive_forecasts(df_meteo, run_date)
+        if state.stage_done("final_results"):
+            state.mark_stage("archive")
+
+    # Journée incomplète (erreurs passagères) : code de sortie non nul pour que le workflow échoue
+    # (et soit relancé avec --resume) au lieu de compacter et publier une journée partielle.
+    # Les villes introuvables sont écartées comme avant et ne font pas échouer l'exécution.
+    failed = state.missing_cities(villes)
+    if failed:
+        print(f"{len(failed)} villes toujours sans météo après l'archivage : {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.express as px  # noqa: E402
+import seaborn as sns  # noqa: E402
+from storage import atomic_write_csv, atomic_write_json, atomic_write_parquet  # noqa: E402
+from forecast_store import FORECAST_FOLDER, HORIZONS  # noqa: E402
+from history_cube import refresh_cube, load_cube, nan_mean  # noqa: E402
+from region_maps import figure_dict  # noqa: E402
+from figure_cache import figure_png  # noqa: E402
+
+# pyarrow est optionnel : sans lui, les tables du lot sont écrites et lues en CSV
+try:
+    import pyarrow  # type: ignore # noqa: F401
+except ImportError:
+    pyarrow = None
+
+# Lot d'artefacts de la page Weather Analysis, construit une fois après l'ingestion :
+#   {dossier}/analysis_bundle.json          -> version courante et liste des artefacts
+#   {dossier}/analysis_bundle/{version}/    -> tables (parquet, ou csv sans pyarrow), graphiques matplotlib (png)
+#                                              et cartes Plotly (json)
+# La version est une empreinte du contenu du cube (et du format du lot) : elle ne dépend ni des dates de fichiers
+# ni de la machine, un lot construit par le workflow reste valable une fois déployé.
+# La page n'affiche que ces artefacts (l'analyse détaillée d'une ville filtre les tables city_days et
+# city_horizon_means) : ni base SQLite ni cube pendant une requête.
+# Construit depuis l'archive écrite par le script quotidien (forecasts/), à l'étape du workflow qui suit la compaction :
+#   python analysis_bundle.py [--folder DIR]
+BUNDLE_NAME = "analysis_bundle"
+BUNDLE_FORMAT = 2
+
+
+def bundle_path(folder=FORECAST_FOLDER):
+    return os.path.join(folder, f"{BUNDLE_NAME}.json")
+
+
+# Version du lot : empreinte des valeurs du cube, des villes et des dates
+def bundle_version(cube):
+    digest = hashlib.sha1(f"{BUNDLE_FORMAT}\n".encode("utf-8"))
+    digest.update(json.dumps([cube.meta["cities"], cube.meta["dates"], cube.meta["metrics"]]).encode("utf-8"))
+    digest.update(np.ascontiguousarray(cube.data).data)
+    return digest.hexdigest()[:16]
+
+
+# Tables globales de la page (tout l'historique, prévisions du jour 1 comparées aux jours 2 à 5)
+def analysis_tables(cube):
+    score_jour1 = cube.metric("Weather_Score", 1)
+    temp_jour1 = cube.metric("Temp_Avg", 1)
+    rain_jour1 = cube.metric("Rain_Probability", 1)
+    present_jour1 = ~np.isnan(score_jour1)
+
+    # Statistiques par ville pour le jour 1 (classements et cartes), villes dans l'ordre alphabétique
+    city_stats = pd.DataFrame({
+        "Ville": cube.cities,
+        "Weather_Score_jour1": np.nansum(score_jour1, axis=(1, 2), dtype="float64"),
+        "Temp_Avg_jour1": nan_mean(temp_jour1, axis=(1, 2)),
+        "Rain_Probability_jour1": np.nansum(rain_jour1, axis=(1, 2), dtype="float64"),
+        "Latitude": cube.latitude,
+        "Longitude": cube.longitude,
+    })[present_jour1.any(axis=(1, 2))].reset_index(drop=True)
+
+    # Somme des scores météo par ville et par jour (carte animée)
+    city_idx, date_idx = np.nonzero(present_jour1.any(axis=2))
+    score_by_date = pd.DataFrame({
+        "Date": cube.dates[date_idx],
+        "Latitude": cube.latitude[city_idx],
+        "Longitude": cube.longitude[city_idx],
+        "Weather_Score_jour1": np.nansum(score_jour1, axis=2, dtype="float64")[city_idx, date_idx],
+    }).sort_values(["Date", "Latitude", "Longitude"], ignore_index=True)
+
+    # Température moyenne par jour, toutes villes confondues
+    temp_by_date = pd.DataFrame({
+        "Date": cube.dates,
+        "Temp_Avg_jour1": nan_mean(temp_jour1, axis=(0, 2)),
+    }).dropna().reset_index(drop=True)
+
+    # Écarts de chaque prévision (jour 2 à 5) avec la prévision du jour 1 pour la même ville, date et créneau,
+    # score d'accuracy basé sur les écarts (borné entre 0 et 100), puis moyenne par ville et par jour
+    city_accuracy = pd.DataFrame({"Ville": cube.cities})
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for horizon in HORIZONS[1:]:
+            temp = cube.metric("Temp_Avg", horizon)
+            rain = cube.metric("Rain_Probability", horizon)
+            score = cube.metric("Weather_Score", horizon)
+            ecart = (
+                np.abs(temp - temp_jour1) / np.where(temp_jour1 == 0, np.nan, temp_jour1) * 40
+                + np.abs(rain - rain_jour1) * 35
+                + np.abs(score - score_jour1) / 200 * 25
+            )
+            city_accuracy[f"Accuracy_jour{horizon}"] = nan_mean(np.clip(100 - ecart, 0, 100), axis=(1, 2))
+    accuracy_columns = [f"Accuracy_jour{horizon}" for horizon in HORIZONS[1:]]
+    city_accuracy = city_accuracy.dropna(subset=accuracy_columns, how="all").reset_index(drop=True)
+    city_accuracy["Mean_Accuracy"] = city_accuracy[accuracy_columns].mean(axis=1)
+    # Triées de la meilleure à la pire, avec les coordonnées pour la carte
+    city_accuracy = city_accuracy.sort_values(by="Mean_Accuracy", ascending=False).merge(
+        city_stats[["Ville", "Latitude", "Longitude"]], on="Ville", how="left"
+    )
+
+    # Moyennes par jour de prévision
+    horizon_means = pd.DataFrame(
+        nan_mean(cube.data, axis=(0, 1, 3)), index=pd.Index(HORIZONS, name="Horizon"), columns=cube.meta["metrics"]
+    ).reset_index()
+
+    # Analyse détaillée d'une ville : prévisions du jour 1 par date et créneau (Weather en identifiant de condition),
+    # triées par ville, date et créneau
+    values_jour1 = cube.data[:, :, HORIZONS.index(1)]
+    city_idx, date_idx, slot_idx = np.nonzero(~np.isnan(values_jour1).all(axis=3))
+    city_days = pd.DataFrame(values_jour1[city_idx, date_idx, slot_idx], columns=cube.meta["metrics"])
+    city_days.insert(0, "Date", cube.dates[date_idx])
+    city_days.insert(0, "Longitude", cube.longitude[city_idx])
+    city_days.insert(0, "Latitude", cube.latitude[city_idx])
+    city_days.insert(0, "Ville", cube.cities[city_idx])
+
+    # ... et moyennes de chaque mesure par ville et par jour de prévision
+    means = nan_mean(cube.data, axis=(1, 3))
+    city_horizon_means = pd.DataFrame(means.reshape(-1, means.shape[-1]), columns=cube.meta["metrics"])
+    city_horizon_means.insert(0, "Horizon", np.tile(HORIZONS, len(cube.cities)))
+    city_horizon_means.insert(0, "Ville", np.repeat(cube.cities, len(HORIZONS)))
+
+    return {
+        "city_stats": city_stats,
+        "score_by_date": score_by_date,
+        "temp_by_date": temp_by_date,
+        "city_accuracy": city_accuracy,
+        "horizon_means": horizon_means,
+        "city_days": city_days,
+        "city_horizon_means": city_horizon_means,
+    }
+
+
+# Classement des 10 premières villes en barres, valeur écrite sur chaque barre
+def ranking_barplot(ranking, column, palette, xlabel, label_format="{}", ha="right", color="white"):
+    fig = plt.figure(figsize=(12, 8))
+    sns.barplot(x=column, y="Ville", data=ranking.head(10), palette=palette)
+
+    # ajouter les labels sur les barres
+    for i in range(min(10, len(ranking))):
+        plt.text(
+            x=ranking[column].iloc[i] + 0.1,
+            y=i,
+            s=label_format.format(ranking[column].iloc[i]),
+            ha=ha,
+            va="center",
+            fontsize=18,
+            fontweight="bold",
+            color=color
+        )
+
+    # Modifier la couleur des labels et du titre
+    plt.xlabel(xlabel, fontsize=12, color="black")
+    plt.ylabel("City", fontsize=12, color="black")
+
+    # Modifier la couleur des axes
+    plt.xticks(color="black")
+    plt.yticks(color="black")
+    return fig
+
+
+# Carte des 25 premières et 25 dernières villes d'un classement
+def top_bottom_map(ranking, column, labels, color_map):
+    top_25_cities = ranking.head(25).copy()
+    worst_25_cities = ranking.tail(25).copy()
+    top_25_cities["Category"] = labels[0]
+    worst_25_cities["Category"] = labels[1]
+    top_worst_cities = pd.concat([top_25_cities, worst_25_cities])
+    # Taille fixe pour tous les points
+    top_worst_cities["Size"] = 5
+    return px.scatter_map(
+        top_worst_cities,
+        lat="Latitude",
+        lon="Longitude",
+        color="Category",
+        size="Size",
+        hover_name="Ville",
+        hover_data={column: True},
+        map_style="open-street-map",
+        zoom=3.5,
+        color_discrete_map=color_map,
+        size_max=10
+    )
+
+
+# Moyenne d'une mesure par jour de prévision (Day +1 ... Day +5)
+def horizon_lineplot(horizon_means, column, title, ylabel, color):
+    data = {f"Day +{h}": value for h, value in zip(horizon_means["Horizon"], horizon_means[column])}
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.plot(list(data.keys()), list(data.values()), marker="o", linestyle="-", color=color, linewidth=2)
+
+    # Ajouter les valeurs sur les points
+    for i, txt in enumerate(data.values()):
+        ax.annotate(f"{txt:.2f}", (list(data.keys())[i], txt), textcoords="offset points", xytext=(0, 8),
+                    ha='center', fontsize=10, fontweight="bold")
+
+    ax.set_ylabel(ylabel)
+    ax.set_title(title, fontsize=12, fontweight="bold")
+    ax.grid(True)
+    return fig
+
+
+def temperature_lineplot(temp_by_date):
+    fig = plt.figure(figsize=(18, 8))
+    sns.lineplot(
+        x=temp_by_date["Date"],
+        y=temp_by_date["Temp_Avg_jour1"],
+        marker="o",
+        color="blue",
+        linewidth=2,
+        markersize=8
+    )
+
+    # Modifier la couleur des labels et du titre
+    plt.xlabel("Date", fontsize=12, color="black", fontweight="bold")
+    plt.ylabel("Average Temperature", fontsize=12, color="black", fontweight="bold")
+    plt.xticks(rotation=90, fontsize=10, color="black")
+    plt.yticks(fontsize=10, color="black")
+    return fig
+
+
+def score_density_map(score_by_date):
+    return px.density_map(
+        score_by_date,
+        lat="Latitude",
+        lon="Longitude",
+        z="Weather_Score_jour1",  # Influence des données
+        map_style="open-street-map",
+        animation_frame="Date",  # Animation basée sur la date
+        zoom=3.5,
+        radius=7,
+        color_continuous_scale="thermal",
+        center={"lat": 46.603354, "lon": 1.888334},
+        labels={"Weather_Score_jour1": "Weather Score"},
+        range_color=[score_by_date["Weather_Score_jour1"].min(), score_by_date["Weather_Score_jour1"].max()]
+    )
+
+
+# Graphiques de l'analyse détaillée d'une ville, rendus par la page avec figure_cache.render_png
+
+# 📈 Évolution d'une mesure de la ville au fil des jours
+def city_trend_plot(data, column, title, ylabel, **style):
+    fig, ax = plt.subplots(figsize=(15, 8))
+    sns.lineplot(x=data["Date"], y=data[column], marker="o", ax=ax, ci=None, **style)
+
+    plt.xticks(rotation=90, fontsize=10, color="black")
+    plt.yticks(fontsize=10, color="black")
+    plt.title(title, fontsize=16, color="black", fontweight="bold")
+    plt.ylabel(ylabel, fontsize=12, color="black", fontweight="bold")
+    return fig
+
+
+# 📈 Mesure moyenne de la ville par jour de prévision
+def city_horizon_lineplot(data, title, xlabel, ylabel, color):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.plot(list(data.keys()), list(data.values()), marker="o", linestyle="-", color=color, linewidth=2)
+
+    # Ajouter les valeurs sur les points
+    for i, txt in enumerate(data.values()):
+        ax.annotate(f"{txt:.2f}", (list(data.keys())[i], txt), textcoords="offset points", xytext=(0, 8),
+                    ha='center', fontsize=10, fontweight="bold")
+
+    ax.set_ylabel(ylabel, fontsize=12, fontweight="bold")
+    ax.set_title(title, fontsize=14, fontweight="bold")
+    ax.grid(True)
+    return fig
+
+
+# Données d'une ville : prévisions du jour 1 par date et créneau, moyennes par jour de prévision (index Horizon)
+def city_tables(tables, ville):
+    city_days, horizon_means = tables["city_days"], tables["city_horizon_means"]
+    return (
+        city_days[city_days["Ville"] == ville].reset_index(drop=True),
+        horizon_means[horizon_means["Ville"] == ville].set_index("Horizon"),
+    )
+
+
+# Graphiques d'une ville, par nom : (fonction de tracé, arguments, options)
+def city_charts(city_data, city_horizon_means, ville):
+    weather_score_daily = city_data.groupby("Date")["Weather_Score"].sum().reset_index()
+
+    def per_horizon(column):
+        return {f"Day +{h}": city_horizon_means.loc[h, column] for h in HORIZONS}
+
+    return {
+        "trend_score": (city_trend_plot, (weather_score_daily, "Weather_Score", "Weather Score", "Weather Score"),
+                        {"color": "purple"}),
+        "trend_temp": (city_trend_plot, (city_data[["Date", "Temp_Avg"]], "Temp_Avg", "Temperature",
+                                         "Average Temperature (°C)"), {"linewidth": 2, "markersize": 8}),
+        "trend_rain": (city_trend_plot, (city_data[["Date", "Rain_Probability"]], "Rain_Probability",
+                                         "Rain Probability", "Rain Probability (%)"), {"color": "blue"}),
+        "trend_humidity": (city_trend_plot, (city_data[["Date", "Humidity"]], "Humidity", "Humidity", "Humidity (%)"),
+                           {"color": "green"}),
+        "horizon_score": (city_horizon_lineplot, (per_horizon("Weather_Score"), f"Weather Score Evolution in {ville}",
+                                                  "Day", "Weather Score", "purple"), {}),
+        "horizon_temp": (city_horizon_lineplot, (per_horizon("Temp_Avg"), f"Temperature Evolution in {ville}", "Day",
+                                                 "Average Temperature", "red"), {}),
+        "horizon_rain": (city_horizon_lineplot, (per_horizon("Rain_Probability"),
+                                                 f"Rain Probability Evolution in {ville}", "Day", "Rain Probability",
+                                                 "blue"), {}),
+        "horizon_humidity": (city_horizon_lineplot, (per_horizon("Humidity"), f"Humidity Evolution in {ville}", "Day",
+                                                     "Average Humidity", "green"), {}),
+    }
+
+
+# Graphiques matplotlib (-> png) et cartes Plotly (-> json) de la page, par nom d'artefact
+def analysis_figures(tables):
+    city_stats = tables["city_stats"]
+    score = city_stats.sort_values(by="Weather_Score_jour1", ascending=False)
+    score_end = score.sort_values(by="Weather_Score_jour1", ascending=True)
+    temp = city_stats.sort_values(by="Temp_Avg_jour1", ascending=False)
+    temp_end = temp.sort_values(by="Temp_Avg_jour1", ascending=True)
+    rain = city_stats.sort_values(by="Rain_Probability_jour1", ascending=False)
+    rain_end = rain.sort_values(by="Rain_Probability_jour1", ascending=True)
+    accuracy = tables["city_accuracy"]
+    accuracy_end = accuracy.sort_values(by="Mean_Accuracy", ascending=True)
+    horizon_means = tables["horizon_means"]
+
+    images = {
+        "score_best": ranking_barplot(score, "Weather_Score_jour1", "plasma", "Weather Score (Sum)"),
+        "score_worst": ranking_barplot(score_end, "Weather_Score_jour1", "viridis", "Weather Score (Sum)"),
+        "temp_by_date": temperature_lineplot(tables["temp_by_date"]),
+        "temp_best": ranking_barplot(temp, "Temp_Avg_jour1", "plasma", "Average Temperature",
+                                     "{:.2f}", "left", "black"),
+        "temp_worst": ranking_barplot(temp_end, "Temp_Avg_jour1", "viridis", "Weather Score (Sum)",
+                                      "{:.2f}", "left", "black"),
+        "rain_lowest": ranking_barplot(rain_end, "Rain_Probability_jour1", "plasma", "Rain Probability (Sum)",
+                                       "{:.2f}"),
+        "rain_highest": ranking_barplot(rain, "Rain_Probability_jour1", "viridis", "Rain Probability (sum)",
+                                        "{:.2f}"),
+        "accuracy_best": ranking_barplot(accuracy, "Mean_Accuracy", "plasma", "Mean Accuracy Score", "{:.2f}%"),
+        "accuracy_worst": ranking_barplot(accuracy_end, "Mean_Accuracy", "viridis", "Mean Accuracy Score",
+                                          "{:.2f}%"),
+        "bias_weather_score": horizon_lineplot(horizon_means, "Weather_Score", "Weather Score", "Weather Score",
+                                               "purple"),
+        "bias_temp": horizon_lineplot(horizon_means, "Temp_Avg", "Temperature", "Average Temperature", "red"),
+        "bias_rain": horizon_lineplot(horizon_means, "Rain_Probability", "Rain Probability", "Rain Probability",
+                                      "blue"),
+        "bias_humidity": horizon_lineplot(horizon_means, "Humidity", "Humidity", "Average Humidity", "green"),
+    }
+    # Analyse détaillée de la première ville de la liste, affichée à l'ouverture de la page : déjà rendue
+    if not city_stats.empty:
+        ville = city_stats["Ville"].iloc[0]
+        for name, (draw, args, kwargs) in city_charts(*city_tables(tables, ville), ville).items():
+            images[f"city_{name}"] = draw(*args, **kwargs)
+    figures = {
+        "score_map": score_density_map(tables["score_by_date"]),
+        "score_top_bottom_map": top_bottom_map(score, "Weather_Score_jour1", ("Top 25", "Worst 25"),
+                                               {"Top 25": "red", "Worst 25": "blue"}),
+        "temp_top_bottom_map": top_bottom_map(temp, "Temp_Avg_jour1", ("Top 25", "Worst 25"),
+                                              {"Top 25": "red", "Worst 25": "blue"}),
+        "rain_top_bottom_map": top_bottom_map(rain, "Rain_Probability_jour1", ("High Prob 25", "Low Prob 25"),
+                                              {"Low Prob 25": "red", "High Prob 25": "blue"}),
+        "accuracy_top_bottom_map": top_bottom_map(accuracy, "Mean_Accuracy", ("High Prob 25", "Low Prob 25"),
+                                                  {"High Prob 25": "red", "Low Prob 25": "blue"}),
+    }
+    return images, figures
+
+
+def _table_ext():
+    return "parquet" if pyarrow is not None else "csv"
+
+
+# Construire le lot d'une version dans un dossier temporaire, le renommer, puis publier le JSON
+def build_bundle(cube, folder=FORECAST_FOLDER):
+    version = bundle_version(cube)
+    relative = f"{BUNDLE_NAME}/{version}"
+    target = os.path.join(folder, relative)
+    tmp = os.path.join(folder, BUNDLE_NAME, f".tmp-{version}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    tables = analysis_tables(cube)
+    images, figures = analysis_figures(tables)
+    ext = _table_ext()
+    for name, df in tables.items():
+        path = os.path.join(tmp, f"{name}.{ext}")
+        if ext == "parquet":
+            atomic_write_parquet(df, path)
+        else:
+            atomic_write_csv(df, path)
+    for name, fig in images.items():
+        with open(os.path.join(tmp, f"{name}.png"), "wb") as f:
+            f.write(figure_png(fig))
+    for name, fig in figures.items():
+        atomic_write_json(figure_dict(fig), os.path.join(tmp, f"{name}.json"))
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    atomic_write_json({
+        "version": version,
+        "path": relative,
+        "tables": {name: f"{name}.{ext}" for name in tables},
+        "images": {name: f"{name}.png" for name in images},
+        "figures": {name: f"{name}.json" for name in figures},
+    }, bundle_path(folder), indent=1)
+
+    # Les anciennes versions ne sont plus référencées
+    for path in glob.glob(os.path.join(folder, BUNDLE_NAME, "*")):
+        if os.path.basename(path) != version:
+            shutil.rmtree(path, ignore_errors=True)
+    return version
+
+
+def _read_manifest(folder):
+    if not os.path.exists(bundle_path(folder)):
+        return None
+    with open(bundle_path(folder), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Lot en mémoire : {"version", "tables": {nom: DataFrame}, "images": {nom: octets png}, "figures": {nom: texte json}}
+def read_bundle(folder=FORECAST_FOLDER):
+    # Lot remplacé pendant la lecture : on relit le JSON une fois
+    for _ in range(2):
+        manifest = _read_manifest(folder)
+        if manifest is None:
+            return None
+        base = os.path.join(folder, manifest["path"])
+        try:
+            tables = {}
+            for name, file in manifest["tables"].items():
+                path = os.path.join(base, file)
+                tables[name] = pd.read_parquet(path) if file.endswith(".parquet") else pd.read_csv(path)
+            images = {}
+            for name, file in manifest["images"].items():
+                with open(os.path.join(base, file), "rb") as f:
+                    images[name] = f.read()
+            figures = {}
+            for name, file in manifest["figures"].items():
+                with open(os.path.join(base, file), encoding="utf-8") as f:
+                    figures[name] = f.read()
+        except FileNotFoundError:
+            continue
+        return {"version": manifest["version"], "tables": tables, "images": images, "figures": figures}
+    return None
+
+
+# Cube à jour puis lot reconstruit seulement si son contenu a changé ; renvoie le lot lu
+def refresh_bundle(folder=FORECAST_FOLDER):
+    refresh_cube(folder)
+    cube = load_cube(folder)
+    manifest = _read_manifest(folder)
+    if manifest is None or manifest["version"] != bundle_version(cube) \
+            or not os.path.isdir(os.path.join(folder, manifest["path"])):
+        build_bundle(cube, folder)
+    return read_bundle(folder)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construction du lot d'artefacts de la page Weather Analysis")
+    parser.add_argument("--folder", default=FORECAST_FOLDER, help="dossier de l'historique des prévisions")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"Pas d'historique dans {args.folder}, rien à construire.")
+    else:
+        bundle = refresh_bundle(args.folder)
+        print(f"Lot {bundle['version']} : {len(bundle['tables'])} tables, {len(bundle['images'])} graphiques, "
+              f"{len(bundle['figures'])} cartes.")
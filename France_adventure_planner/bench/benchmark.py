@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROJECT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_FOLDER)
+import ingestion  # noqa: E402
+import Weekend_getaway_project as pipeline  # noqa: E402
+from cities import CITY_IDS, all_cities  # noqa: E402
+from geocode_cache import GeocodeCache  # noqa: E402
+from checkpoints import RunState  # noqa: E402
+from forecast_store import FORECAST_FOLDER  # noqa: E402
+from results_store import write_results  # noqa: E402
+from region_maps import write_region_maps  # noqa: E402
+from bench.replay_server import start_server, point_pipeline_to  # noqa: E402
+
+# Benchmark de bout en bout du pipeline quotidien, entièrement hors ligne :
+# les trois API sont remplacées par replay_server.py, chaque taille tourne dans un processus séparé
+# (le reactor Twisted de Scrapy ne peut pas être redémarré) et dans un dossier temporaire.
+#   python bench/benchmark.py                      -> 250, 1000 et 5000 villes
+#   python bench/benchmark.py --sizes 250 --latency 0.05 --error-rate 0.01
+SIZES = [250, 1000, 5000]
+STAGES = ["geocode", "fetch", "scrape", "combine", "archive"]
+
+
+# Les villes du référentiel, complétées par des villes synthétiques au-delà de 212
+def bench_cities(n):
+    villes = all_cities()[:n]
+    next_id = max(CITY_IDS.values()) + 1
+    for i in range(n - len(villes)):
+        ville = f"Ville Bench {i + 1}"
+        CITY_IDS.setdefault(ville, next_id + i)
+        villes.append(ville)
+    return villes
+
+
+@contextmanager
+def timed(timings, stage):
+    start = time.perf_counter()
+    yield
+    timings[stage] = time.perf_counter() - start
+
+
+async def geocode_all(villes, geocodes, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = ingestion.TokenBucket(ingestion.NOMINATIM_RATE, ingestion.NOMINATIM_BURST)
+
+    async def one(ville):
+        async with semaphore:
+            coords = await ingestion.geocode(ville, bucket)
+            if coords not in (None, ingestion.NOT_FOUND):
+                geocodes.put(ville, *coords)
+
+    await asyncio.gather(*(one(ville) for ville in villes))
+
+
+# Une taille de benchmark (dans le processus courant, depuis un dossier de travail vide)
+def run_size(n, latency, error_rate, rate, concurrency):
+    server, base_url = start_server(latency=latency, error_rate=error_rate, seed=n)
+    point_pipeline_to(base_url)
+    # Le serveur local n'a pas les quotas des vraies API
+    ingestion.NOMINATIM_RATE = ingestion.OWM_RATE = rate
+    ingestion.NOMINATIM_BURST = ingestion.OWM_BURST = max(1, int(rate))
+    ingestion.MAX_CONCURRENCY = concurrency
+    ingestion.BACKOFF_BASE = 0.05
+
+    villes = bench_cities(n)
+    run_date = datetime.now().strftime("%Y-%m-%d")
+    state = RunState(run_date)
+    state.reset()
+    timings = {}
+    start = time.perf_counter()
+
+    with timed(timings, "geocode"):
+        geocodes = GeocodeCache().load()
+        asyncio.run(geocode_all(villes, geocodes, concurrency))
+        geocodes.save()
+    with timed(timings, "fetch"):
+        df_meteo = pipeline.fetch_weather(villes, "bench", run_date, state)
+    with timed(timings, "scrape"):
+        hotels = pipeline.scrape_hotels(villes, state)
+    with timed(timings, "combine"):
+        write_results(pipeline.combine(df_meteo, hotels))
+        # Comme le script quotidien : un échec des cartes n'empêche pas l'archivage
+        try:
+            write_region_maps()
+        except Exception as e:
+            print(f"Cartes des régions non générées : {e}")
+    with timed(timings, "archive"):
+        # Toutes les villes sont archivées pour que l'étape grandisse avec la taille
+        for day in range(1, 6):
+            pipeline.save_forecast_append(df_meteo, day, run_date, FORECAST_FOLDER, villes,
+                                          pipeline.columns_to_save)
+
+    timings["total"] = time.perf_counter() - start
+    server.shutdown()
+    return {"cities": n, "rows": len(df_meteo), "missing": len(state.missing_cities(villes)), **timings}
+
+
+def print_report(results):
+    header = f"{'villes':>7} {'lignes':>8} " + " ".join(f"{stage:>9}" for stage in STAGES + ["total"])
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['cities']:>7} {r['rows']:>8} " + " ".join(f"{r[stage]:>8.2f}s" for stage in STAGES + ["total"]))
+        if r["missing"]:
+            print(f"        {r['missing']} villes sans météo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne du pipeline (géocodage, météo, hôtels, fusion, archive)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="nombres de villes à tester")
+    parser.add_argument("--latency", type=float, default=0.0, help="latence moyenne simulée par réponse (secondes)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part des réponses en 503 (0 à 1)")
+    parser.add_argument("--rate", type=float, default=1000.0, help="requêtes par seconde autorisées par API")
+    parser.add_argument("--concurrency", type=int, default=32, help="villes traitées en parallèle")
+    parser.add_argument("--json", help="écrire aussi les résultats dans ce fichier")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    options = ["--latency", str(args.latency), "--error-rate", str(args.error_rate),
+               "--rate", str(args.rate), "--concurrency", str(args.concurrency)]
+
+    if args.single:
+        # Processus enfant : une seule taille, résultat en JSON sur la dernière ligne
+        result = run_size(args.single, args.latency, args.error_rate, args.rate, args.concurrency)
+        print("BENCH_RESULT " + json.dumps(result))
+        sys.exit(0)
+
+    results = []
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--single", str(n)] + options,
+                cwd=workdir, capture_output=True, text=True
+            )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("BENCH_RESULT ")]
+        if proc.returncode != 0 or not lines:
+            print(proc.stdout[-2000:], proc.stderr[-2000:])
+            sys.exit(f"Échec du benchmark pour {n} villes.")
+        results.append(json.loads(lines[-1][len("BENCH_RESULT "):]))
+        print(f"{n} villes : {results[-1]['total']:.2f}s")
+
+    print()
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
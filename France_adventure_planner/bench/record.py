@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import sys
+import time
+import requests
+from dotenv import load_dotenv # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ingestion  # noqa: E402
+import Weekend_getaway_project  # noqa: E402
+from cities import all_cities  # noqa: E402
+from bench.replay_server import FIXTURES_FOLDER, fixture_key  # noqa: E402
+
+# Enregistrer de vraies réponses Nominatim / OpenWeatherMap / Booking dans bench/fixtures/
+# pour que replay_server.py puisse les rejouer hors ligne.
+# Les appels sont faits un par un en respectant la limite Nominatim (1 requête / seconde).
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def write_fixture(kind, ville, content, ext="json", folder=FIXTURES_FOLDER):
+    path = os.path.join(folder, kind, f"{fixture_key(ville)}.{ext}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        if ext == "json":
+            json.dump(content, f, ensure_ascii=False)
+        else:
+            f.write(content)
+
+
+def record_city(ville, api_key, with_booking=True, folder=FIXTURES_FOLDER):
+    params = {"city": ville, "country": "France", "format": "json", "limit": 1}
+    r = requests.get(ingestion.nominatim_url, params=params, headers={"User-Agent": "NotNecessary"},
+                     timeout=ingestion.REQUEST_TIMEOUT)
+    time.sleep(1 / ingestion.NOMINATIM_RATE)
+    if r.status_code != 200 or not r.json():
+        print(f"Géocodage impossible pour {ville}, fixture ignorée.")
+        return False
+    write_fixture("nominatim", ville, r.json(), folder=folder)
+    lat, lon = r.json()[0]["lat"], r.json()[0]["lon"]
+
+    weather_params = {"lat": lat, "lon": lon, "units": "metric", "appid": api_key}
+    r = requests.get(ingestion.weather_url, params=weather_params, timeout=ingestion.REQUEST_TIMEOUT)
+    if r.status_code != 200:
+        print(f"Météo indisponible pour {ville} ({r.status_code}).")
+        return False
+    write_fixture("weather", ville, r.json(), folder=folder)
+
+    if with_booking:
+        url = f"{Weekend_getaway_project.booking_url}?ss={ville.replace(' ', '+')}"
+        r = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=ingestion.REQUEST_TIMEOUT)
+        if r.status_code == 200:
+            write_fixture("booking", ville, r.text, ext="html", folder=folder)
+        else:
+            print(f"Page Booking indisponible pour {ville} ({r.status_code}).")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enregistrer des réponses réelles pour le rejeu hors ligne")
+    parser.add_argument("villes", nargs="*", help="villes à enregistrer (par défaut : tout le référentiel)")
+    parser.add_argument("--limit", type=int, default=None, help="nombre maximum de villes")
+    parser.add_argument("--no-booking", action="store_true", help="ne pas enregistrer les pages Booking")
+    parser.add_argument("--force", action="store_true", help="réenregistrer les villes déjà présentes")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = os.getenv("API_KEY")
+    villes = args.villes or all_cities()
+    if not args.force:
+        villes = [v for v in villes
+                  if not os.path.exists(os.path.join(FIXTURES_FOLDER, "weather", f"{fixture_key(v)}.json"))]
+    villes = villes[:args.limit]
+
+    recorded = sum(record_city(ville, api_key, not args.no_booking) for ville in villes)
+    print(f"{recorded}/{len(villes)} villes enregistrées dans {FIXTURES_FOLDER}.")
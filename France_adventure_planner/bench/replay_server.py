@@ -0,0 +1,190 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geocode_cache import normalize_city  # noqa: E402
+from forecast_decoder import CONDITIONS  # noqa: E402
+
+# Serveur HTTP local qui rejoue Nominatim, OpenWeatherMap et Booking sans réseau :
+#   /nominatim/search?city=...             -> fixtures/nominatim/{ville}.json
+#   /owm/data/2.5/forecast?lat=..&lon=..   -> fixtures/weather/{ville}.json
+#   /booking/searchresults.html?ss=...     -> fixtures/booking/{ville}.html
+# Une ville sans fixture reçoit une réponse synthétique déterministe (utile pour 1k / 5k villes).
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fixture_key(ville):
+    return normalize_city(ville).replace("/", "_").replace(" ", "_")
+
+
+def _hash(text):
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest(), 16)
+
+
+# Coordonnées synthétiques stables, à l'intérieur de la France métropolitaine
+def synthetic_coords(ville):
+    h = _hash(ville)
+    return f"{42.5 + (h % 8000) / 1000:.7f}", f"{-4.0 + (h // 8000 % 11000) / 1000:.7f}"
+
+
+def synthetic_weather(lat, lon):
+    rng = random.Random(f"{lat},{lon}")
+    slots = []
+    for i in range(40):
+        temp = rng.uniform(-5, 30)
+        slots.append({
+            "dt": 3 * 3600 * i,
+            "main": {"temp_max": round(temp + rng.uniform(0, 3), 2), "temp_min": round(temp, 2),
+                     "humidity": rng.randint(30, 100)},
+            "weather": [dict(zip(["id", "description"], rng.choice(CONDITIONS)[:2]))],
+            "pop": round(rng.random(), 2),
+        })
+    return {"cod": "200", "cnt": 40, "list": slots}
+
+
+def synthetic_booking(ville):
+    cards = "".join(
+        f"<div data-testid='property-card-container'>"
+        f"<div data-testid='title'>Hôtel {i} {ville}</div>"
+        f"<a data-testid='title-link' href='/hotel/{fixture_key(ville)}-{i}.html'>voir</a>"
+        f"<div data-testid='review-score'><div>{7 + i / 2}</div></div></div>"
+        for i in range(1, 6)
+    )
+    return f"<html><body>{cards}</body></html>"
+
+
+# Les prévisions rejouées commencent toujours au prochain créneau de 3 h, comme une réponse du jour
+def rebase_weather(weather_data):
+    slots = weather_data["list"]
+    if not slots:
+        return weather_data
+    start = (int(time.time()) // 10800 + 1) * 10800
+    offset = start - slots[0]["dt"]
+    rebased = dict(weather_data)
+    rebased["list"] = [dict(slot, dt=slot["dt"] + offset) for slot in slots]
+    return rebased
+
+
+class Fixtures:
+    def __init__(self, folder=FIXTURES_FOLDER):
+        self.folder = folder
+        # Coordonnées enregistrées -> ville, pour retrouver la fixture météo
+        self.coords_index = {}
+        nominatim_folder = os.path.join(folder, "nominatim")
+        if os.path.isdir(nominatim_folder):
+            for name in os.listdir(nominatim_folder):
+                data = self._load_json("nominatim", name[:-len(".json")])
+                if data:
+                    self.coords_index[(data[0]["lat"], data[0]["lon"])] = name[:-len(".json")]
+
+    def _path(self, kind, key, ext="json"):
+        return os.path.join(self.folder, kind, f"{key}.{ext}")
+
+    def _load_json(self, kind, key):
+        path = self._path(kind, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def nominatim(self, ville):
+        data = self._load_json("nominatim", fixture_key(ville))
+        if data is None:
+            lat, lon = synthetic_coords(ville)
+            data = [{"lat": lat, "lon": lon, "display_name": ville}]
+        return data
+
+    def weather(self, lat, lon):
+        key = self.coords_index.get((lat, lon))
+        data = self._load_json("weather", key) if key else None
+        return rebase_weather(data or synthetic_weather(lat, lon))
+
+    def booking(self, ville):
+        path = self._path("booking", fixture_key(ville), "html")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        return synthetic_booking(ville)
+
+
+def make_handler(fixtures, latency=0.0, error_rate=0.0, seed=None):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body, content_type):
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            with lock:
+                delay = rng.uniform(0.5, 1.5) * latency if latency else 0.0
+                fail = rng.random() < error_rate
+            if delay:
+                time.sleep(delay)
+            if fail:
+                self._send(503, "Service Unavailable", "text/plain")
+                return
+
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == "/nominatim/search":
+                self._send(200, json.dumps(fixtures.nominatim(params.get("city", ""))), "application/json")
+            elif url.path == "/owm/data/2.5/forecast":
+                self._send(200, json.dumps(fixtures.weather(params.get("lat"), params.get("lon"))), "application/json")
+            elif url.path == "/booking/searchresults.html":
+                self._send(200, fixtures.booking(params.get("ss", "")), "text/html; charset=utf-8")
+            else:
+                self._send(404, "Not Found", "text/plain")
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+# Démarrer le serveur dans un thread ; renvoie (serveur, url de base)
+def start_server(port=0, latency=0.0, error_rate=0.0, seed=None, folder=FIXTURES_FOLDER):
+    handler = make_handler(Fixtures(folder), latency, error_rate, seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# Faire pointer le pipeline vers le serveur local (même réglage que --api-base du script quotidien)
+def point_pipeline_to(base_url):
+    import Weekend_getaway_project
+    Weekend_getaway_project.use_replay_server(base_url)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur local de rejeu des API (hors ligne)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="latence moyenne par réponse (secondes)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part des réponses en 503 (0 à 1)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency, args.error_rate, args.seed)
+    print(f"Rejeu sur {base_url} (latence {args.latency}s, erreurs {args.error_rate:.0%}). Ctrl+C pour arrêter.")
+    print(f"Script quotidien : python Weekend_getaway_project.py --api-base {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import pandas as pd
+from storage import atomic_write_csv, atomic_write_json
+
+# Dossier local des points de reprise d'une exécution
+STATE_FOLDER = ".state"
+
+
+# Points de reprise d'une exécution : un fichier par ville récupérée, un marqueur par étape terminée
+#   .state/{run_date}/weather/{city_key}.json
+#   .state/{run_date}/not_found/{city_key}.json   (ville introuvable : pas réessayée, pas comptée comme manquante)
+#   .state/{run_date}/hotels.csv
+#   .state/{run_date}/stages.json
+class RunState:
+    def __init__(self, run_date, root=STATE_FOLDER):
+        self.root = root
+        self.folder = os.path.join(root, run_date)
+        self.weather_folder = os.path.join(self.folder, "weather")
+        self.not_found_folder = os.path.join(self.folder, "not_found")
+        self.stages_path = os.path.join(self.folder, "stages.json")
+        self.hotels_path = os.path.join(self.folder, "hotels.csv")
+
+    # Nouvelle exécution : on oublie tous les points de reprise
+    def reset(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _city_path(self, ville, folder=None):
+        # Nom de fichier sûr et stable pour chaque ville
+        key = ville.encode("utf-8").hex()
+        return os.path.join(folder or self.weather_folder, f"{key}.json")
+
+    # Résultat (ville, lat, lon, weather_data) d'une ville
+    def save_city(self, result):
+        ville, lat, lon, weather_data = result
+        atomic_write_json(
+            {"ville": ville, "lat": lat, "lon": lon, "weather_data": weather_data},
+            self._city_path(ville)
+        )
+
+    def has_city(self, ville):
+        return os.path.exists(self._city_path(ville))
+
+    # Ville introuvable (Nominatim, OpenWeatherMap) : échec définitif, comme la ville écartée auparavant
+    def save_not_found(self, ville):
+        atomic_write_json({"ville": ville}, self._city_path(ville, self.not_found_folder))
+
+    def is_not_found(self, ville):
+        return os.path.exists(self._city_path(ville, self.not_found_folder))
+
+    def not_found_cities(self, villes):
+        return [ville for ville in villes if self.is_not_found(ville)]
+
+    # Villes encore à récupérer (erreurs passagères), hors villes introuvables
+    def missing_cities(self, villes):
+        return [ville for ville in villes if not self.has_city(ville) and not self.is_not_found(ville)]
+
+    # Résultats enregistrés, dans l'ordre de `villes`
+    def load_cities(self, villes):
+        results = []
+        for ville in villes:
+            if self.has_city(ville):
+                with open(self._city_path(ville), encoding="utf-8") as f:
+                    data = json.load(f)
+                results.append((data["ville"], data["lat"], data["lon"], data["weather_data"]))
+        return results
+
+    def save_hotels(self, hotels):
+        atomic_write_csv(hotels, self.hotels_path)
+
+    def load_hotels(self):
+        if not os.path.exists(self.hotels_path):
+            return None
+        return pd.read_csv(self.hotels_path, dtype={"Note": str}, keep_default_na=False)
+
+    def _stages(self):
+        if not os.path.exists(self.stages_path):
+            return []
+        with open(self.stages_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def stage_done(self, name):
+        return name in self._stages()
+
+    def mark_stage(self, name):
+        stages = self._stages()
+        if name not in stages:
+            atomic_write_json(stages + [name], self.stages_path)
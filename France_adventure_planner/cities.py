@@ -0,0 +1,342 @@
+# Référentiel unique des villes, partagé par le script de collecte et les pages Streamlit
+# (id, ville, massif/littoral)
+# Les identifiants sont stables : ne jamais les réattribuer, ajouter les nouvelles villes à la fin
+CITIES = [
+    # Grandes villes
+    (1, "Paris", "Grandes villes"),
+    (2, "Lyon", "Grandes villes"),
+    (3, "Toulouse", "Grandes villes"),
+    (4, "Nantes", "Grandes villes"),
+    (5, "Strasbourg", "Grandes villes"),
+    (6, "Bordeaux", "Grandes villes"),
+    (7, "Lille", "Grandes villes"),
+    (8, "Rennes", "Grandes villes"),
+    (9, "Reims", "Grandes villes"),
+    (10, "Saint-Étienne", "Grandes villes"),
+    (11, "Toulon", "Grandes villes"),
+    (12, "Dijon", "Grandes villes"),
+    (13, "Angers", "Grandes villes"),
+    (14, "Nîmes", "Grandes villes"),
+    (15, "Villeurbanne", "Grandes villes"),
+    (16, "Le Mans", "Grandes villes"),
+    (17, "Clermont-Ferrand", "Grandes villes"),
+    (18, "Brest", "Grandes villes"),
+    (19, "Aix-en-Provence", "Grandes villes"),
+    (20, "Amiens", "Grandes villes"),
+    (21, "Limoges", "Grandes villes"),
+    (22, "Annecy", "Grandes villes"),
+    (23, "Perpignan", "Grandes villes"),
+    (24, "Caen", "Grandes villes"),
+    (25, "Metz", "Grandes villes"),
+    (26, "Besançon", "Grandes villes"),
+    (27, "Orléans", "Grandes villes"),
+    (28, "Rouen", "Grandes villes"),
+    (29, "Avignon", "Grandes villes"),
+    (30, "Pau", "Grandes villes"),
+    (31, "Poitiers", "Grandes villes"),
+    (32, "Mulhouse", "Grandes villes"),
+    (33, "Colmar", "Grandes villes"),
+    (34, "Chambéry", "Grandes villes"),
+    (35, "Lourdes", "Grandes villes"),
+    (36, "Arles", "Grandes villes"),
+    (37, "Carcassonne", "Grandes villes"),
+    (38, "Albi", "Grandes villes"),
+    (39, "Ajaccio", "Grandes villes"),
+    # Écrins
+    (40, "Bourg d'Oisans", "Écrins"),
+    (41, "Le Périer", "Écrins"),
+    (42, "La Chapelle-en-Valgaudémar", "Écrins"),
+    (43, "Vallouise", "Écrins"),
+    (44, "Ailefroide", "Écrins"),
+    (45, "Monêtier-les-Bains", "Écrins"),
+    (46, "La Grave", "Écrins"),
+    (47, "Saint-Christophe-en-Oisans", "Écrins"),
+    # Mont-Blanc
+    (48, "Chamonix", "Mont-Blanc"),
+    (49, "Les Houches", "Mont-Blanc"),
+    (50, "Saint-Gervais-les-Bains", "Mont-Blanc"),
+    (51, "Servoz", "Mont-Blanc"),
+    (52, "Vallorcine", "Mont-Blanc"),
+    (53, "Argentière", "Mont-Blanc"),
+    (54, "Combloux", "Mont-Blanc"),
+    (55, "Megève", "Mont-Blanc"),
+    (56, "Les Contamines-Montjoie", "Mont-Blanc"),
+    (57, "Cordon", "Mont-Blanc"),
+    (58, "Domancy", "Mont-Blanc"),
+    (59, "Demi-Quartier", "Mont-Blanc"),
+    (60, "Praz-sur-Arly", "Mont-Blanc"),
+    (61, "Sixt-Fer-à-Cheval", "Mont-Blanc"),
+    # Vanoise
+    (62, "Val-d'Isère", "Vanoise"),
+    (63, "Tignes", "Vanoise"),
+    (64, "Pralognan-la-Vanoise", "Vanoise"),
+    (65, "Termignon", "Vanoise"),
+    (66, "Modane", "Vanoise"),
+    (67, "Bonneval-sur-Arc", "Vanoise"),
+    (68, "Aussois", "Vanoise"),
+    (69, "Lanslebourg-Mont-Cenis", "Vanoise"),
+    (70, "Bessans", "Vanoise"),
+    # Beaufortain
+    (71, "Arêches", "Beaufortain"),
+    (72, "Les Saisies", "Beaufortain"),
+    (73, "Hauteluce", "Beaufortain"),
+    (74, "Villard-sur-Doron", "Beaufortain"),
+    (75, "Queige", "Beaufortain"),
+    # Chartreuse
+    (76, "Saint-Pierre-de-Chartreuse", "Chartreuse"),
+    (77, "Grenoble", "Chartreuse"),
+    (78, "Le Sappey-en-Chartreuse", "Chartreuse"),
+    (79, "Saint-Laurent-du-Pont", "Chartreuse"),
+    (80, "Entremont-le-Vieux", "Chartreuse"),
+    # Mercantour
+    (81, "Saint-Martin-Vésubie", "Mercantour"),
+    (82, "Isola", "Mercantour"),
+    (83, "Barcelonnette", "Mercantour"),
+    (84, "Tende", "Mercantour"),
+    (85, "Valdeblore", "Mercantour"),
+    (86, "La Brigue", "Mercantour"),
+    (87, "Breil-sur-Roya", "Mercantour"),
+    (88, "Rimplas", "Mercantour"),
+    # Queyras
+    (89, "Saint-Véran", "Queyras"),
+    (90, "Abriès", "Queyras"),
+    (91, "Ceillac", "Queyras"),
+    (92, "Guillestre", "Queyras"),
+    (93, "Molines-en-Queyras", "Queyras"),
+    (94, "Château-Ville-Vieille", "Queyras"),
+    (95, "Aiguilles", "Queyras"),
+    # Maurienne
+    (96, "Saint-Jean-de-Maurienne", "Maurienne"),
+    (97, "Valloire", "Maurienne"),
+    (98, "Albiez-Montrond", "Maurienne"),
+    (99, "Saint-Sorlin-d'Arves", "Maurienne"),
+    (100, "Saint-Colomban-des-Villards", "Maurienne"),
+    # Pyrénées Occidentales
+    (101, "Gourette", "Pyrénées Occidentales"),
+    (102, "Eaux-Bonnes", "Pyrénées Occidentales"),
+    (103, "Artouste", "Pyrénées Occidentales"),
+    (104, "Arudy", "Pyrénées Occidentales"),
+    (105, "Oloron-Sainte-Marie", "Pyrénées Occidentales"),
+    # Classée dans les Pyrénées Occidentales par la liste d'origine, mais située dans le Comminges (Pyrénées Centrales),
+    # comme dans l'itinéraire "Central Pyrenees"
+    (106, "Portet-d'Aspet", "Pyrénées Centrales"),
+    # Pyrénées Centrales
+    (107, "Saint-Lary-Soulan", "Pyrénées Centrales"),
+    (108, "Luz-Saint-Sauveur", "Pyrénées Centrales"),
+    (109, "Cauterets", "Pyrénées Centrales"),
+    (110, "Gavarnie", "Pyrénées Centrales"),
+    (111, "Barèges", "Pyrénées Centrales"),
+    (112, "Bagnères-de-Bigorre", "Pyrénées Centrales"),
+    (113, "Piau-Engaly", "Pyrénées Centrales"),
+    (114, "Campan", "Pyrénées Centrales"),
+    (115, "Ax-les-Thermes", "Pyrénées Centrales"),
+    (116, "Luchon (Bagnères-de-Luchon)", "Pyrénées Centrales"),
+    (117, "Peyragudes", "Pyrénées Centrales"),
+    # Pyrénées Orientales
+    (118, "Font-Romeu", "Pyrénées Orientales"),
+    (119, "Les Angles", "Pyrénées Orientales"),
+    (120, "Mont-Louis", "Pyrénées Orientales"),
+    (121, "Villefranche-de-Conflent", "Pyrénées Orientales"),
+    (122, "Prats-de-Mollo-la-Preste", "Pyrénées Orientales"),
+    # Jura
+    (123, "Les Rousses", "Jura"),
+    (124, "Morbier", "Jura"),
+    (125, "Saint-Claude", "Jura"),
+    (126, "Lons-le-Saunier", "Jura"),
+    (127, "Arbois", "Jura"),
+    (128, "Baume-les-Messieurs", "Jura"),
+    (129, "Salins-les-Bains", "Jura"),
+    (130, "Métabief", "Jura"),
+    (131, "Clairvaux-les-Lacs", "Jura"),
+    (132, "Lamoura", "Jura"),
+    (133, "Château-Chalon", "Jura"),
+    (134, "Nantua", "Jura"),
+    # Méditerranée
+    (135, "Nice", "Méditerranée"),
+    (136, "Cannes", "Méditerranée"),
+    (137, "Antibes", "Méditerranée"),
+    (138, "Saint-Tropez", "Méditerranée"),
+    (139, "Menton", "Méditerranée"),
+    (140, "Juan-les-Pins", "Méditerranée"),
+    (141, "Marseille", "Méditerranée"),
+    (142, "Cassis", "Méditerranée"),
+    (143, "Bandol", "Méditerranée"),
+    (144, "Hyères", "Méditerranée"),
+    (145, "Sanary-sur-Mer", "Méditerranée"),
+    (146, "Montpellier", "Méditerranée"),
+    (147, "Sète", "Méditerranée"),
+    (148, "Agde", "Méditerranée"),
+    (149, "Cap d’Agde", "Méditerranée"),
+    (150, "Gruissan", "Méditerranée"),
+    (151, "Narbonne", "Méditerranée"),
+    (152, "Palavas-les-Flots", "Méditerranée"),
+    (153, "Collioure", "Méditerranée"),
+    (154, "Port-Vendres", "Méditerranée"),
+    (155, "Banyuls-sur-Mer", "Méditerranée"),
+    (156, "Argelès-sur-Mer", "Méditerranée"),
+    # Littoral Atlantique
+    (157, "Hendaye", "Littoral Atlantique"),
+    (158, "Saint-Jean-de-Luz", "Littoral Atlantique"),
+    (159, "Biarritz", "Littoral Atlantique"),
+    (160, "Anglet", "Littoral Atlantique"),
+    (161, "Bayonne", "Littoral Atlantique"),
+    (162, "Hossegor", "Littoral Atlantique"),
+    (163, "Capbreton", "Littoral Atlantique"),
+    (164, "Seignosse", "Littoral Atlantique"),
+    (165, "Biscarrosse", "Littoral Atlantique"),
+    (166, "Mimizan", "Littoral Atlantique"),
+    (167, "Arcachon", "Littoral Atlantique"),
+    (168, "Lège-Cap-Ferret", "Littoral Atlantique"),
+    (169, "Lacanau", "Littoral Atlantique"),
+    (170, "Soulac-sur-Mer", "Littoral Atlantique"),
+    (171, "Les Sables-d'Olonne", "Littoral Atlantique"),
+    (172, "Saint-Jean-de-Monts", "Littoral Atlantique"),
+    (173, "Saint-Gilles-Croix-de-Vie", "Littoral Atlantique"),
+    (174, "La Tranche-sur-Mer", "Littoral Atlantique"),
+    (175, "Île de Noirmoutier", "Littoral Atlantique"),
+    (176, "Île d'Yeu", "Littoral Atlantique"),
+    (177, "La Rochelle", "Littoral Atlantique"),
+    (178, "Île de Ré", "Littoral Atlantique"),
+    (179, "Île d'Oléron", "Littoral Atlantique"),
+    (180, "Royan", "Littoral Atlantique"),
+    (181, "Châtelaillon-Plage", "Littoral Atlantique"),
+    (182, "Rochefort", "Littoral Atlantique"),
+    # Bretagne/Normandie
+    (183, "Vannes", "Bretagne/Normandie"),
+    (184, "Lorient", "Bretagne/Normandie"),
+    (185, "Carnac", "Bretagne/Normandie"),
+    (186, "Quiberon", "Bretagne/Normandie"),
+    (187, "La Baule", "Bretagne/Normandie"),
+    (188, "Pornic", "Bretagne/Normandie"),
+    (189, "Saint-Nazaire", "Bretagne/Normandie"),
+    (190, "Préfailles", "Bretagne/Normandie"),
+    (191, "Saint-Brévin-les-Pins", "Bretagne/Normandie"),
+    (192, "Saint-Malo", "Bretagne/Normandie"),
+    (193, "Dinard", "Bretagne/Normandie"),
+    (194, "Cancale", "Bretagne/Normandie"),
+    (195, "Deauville", "Bretagne/Normandie"),
+    (196, "Trouville-sur-Mer", "Bretagne/Normandie"),
+    (197, "Cabourg", "Bretagne/Normandie"),
+    (198, "Honfleur", "Bretagne/Normandie"),
+    (199, "Étretat", "Bretagne/Normandie"),
+    (200, "Fécamp", "Bretagne/Normandie"),
+    (201, "Dieppe", "Bretagne/Normandie"),
+    (202, "Le Havre", "Bretagne/Normandie"),
+    # Littoral de la Manche
+    (203, "Calais", "Littoral de la Manche"),
+    (204, "Boulogne-sur-Mer", "Littoral de la Manche"),
+    (205, "Wimereux", "Littoral de la Manche"),
+    (206, "Wissant", "Littoral de la Manche"),
+    (207, "Le Touquet", "Littoral de la Manche"),
+    (208, "Berck-sur-Mer", "Littoral de la Manche"),
+    (209, "Saint-Valery-sur-Somme", "Littoral de la Manche"),
+    (210, "Le Crotoy", "Littoral de la Manche"),
+    (211, "Cayeux-sur-Mer", "Littoral de la Manche"),
+    (212, "Mers-les-Bains", "Littoral de la Manche"),
+    # Parcs et autres attractions (désactivés)
+    # "Disneyland Paris", "Parc Astérix", "Futuroscope", "Puy du Fou",
+    # "Le Pal", "Nigloland", "Walibi Rhône-Alpes", "Walibi Sud-Ouest",
+    # "France Miniature", "ZooParc de Beauval", "Terra Botanica",
+    # "Le palais idéal du Facteur Cheval", "Château de Chambord",
+    # "Château de Versailles", "Château de Vaux-le-Vicomte", "Château de Chenonceau",
+    # "Beaufort",
+]
+
+CITY_NAMES = {city_id: ville for city_id, ville, _ in CITIES}
+CITY_IDS = {ville: city_id for city_id, ville, _ in CITIES}
+
+
+# Convertir une liste de noms en identifiants (KeyError si la ville est inconnue)
+def ids_of(villes):
+    return [CITY_IDS[ville] for ville in villes]
+
+
+# Itinéraires de la page Trek & Mountains (listes d'origine de la page : elles ne suivent pas toujours les massifs
+# du référentiel, ex. Les Angles et Ax-les-Thermes)
+TREKS = {
+    "Northern Alps (Mont-Blanc)": ids_of([
+        "Chamonix", "Les Houches", "Saint-Gervais-les-Bains", "Servoz", "Vallorcine",
+        "Argentière", "Combloux", "Megève", "Les Contamines-Montjoie", "Cordon",
+        "Domancy", "Demi-Quartier", "Praz-sur-Arly", "Sixt-Fer-à-Cheval",
+    ]),
+    "Central Alps (Vanoise, Écrins, Beaufortain)": ids_of([
+        "Bourg d'Oisans", "Le Périer", "La Chapelle-en-Valgaudémar", "Vallouise",
+        "Ailefroide", "Monêtier-les-Bains", "La Grave", "Saint-Christophe-en-Oisans",
+        "Val-d'Isère", "Tignes", "Pralognan-la-Vanoise", "Termignon", "Modane",
+        "Bonneval-sur-Arc", "Aussois", "Lanslebourg-Mont-Cenis", "Bessans",
+        "Arêches", "Les Saisies", "Hauteluce", "Villard-sur-Doron", "Queige",
+        "Saint-Pierre-de-Chartreuse", "Grenoble", "Le Sappey-en-Chartreuse",
+        "Saint-Laurent-du-Pont", "Entremont-le-Vieux",
+    ]),
+    "Southern Alps (Écrins, Queyras, Mercantour)": ids_of([
+        "Saint-Martin-Vésubie", "Isola", "Barcelonnette", "Tende", "Valdeblore",
+        "La Brigue", "Breil-sur-Roya", "Rimplas", "Saint-Véran", "Abriès", "Ceillac",
+        "Guillestre", "Molines-en-Queyras", "Château-Ville-Vieille", "Aiguilles",
+        "Saint-Jean-de-Maurienne", "Valloire", "Lanslebourg-Mont-Cenis", "Termignon",
+        "Albiez-Montrond", "Aussois", "Bessans", "Saint-Sorlin-d'Arves",
+        "Saint-Colomban-des-Villards",
+    ]),
+    "Western Pyrenees": ids_of([
+        "Gourette", "Eaux-Bonnes", "Artouste", "Arudy", "Oloron-Sainte-Marie",
+    ]),
+    "Central Pyrenees": ids_of([
+        "Saint-Lary-Soulan", "Luz-Saint-Sauveur", "Cauterets", "Gavarnie", "Barèges",
+        "Bagnères-de-Bigorre", "Piau-Engaly", "Campan", "Les Angles", "Portet-d'Aspet",
+        "Luchon (Bagnères-de-Luchon)", "Peyragudes",
+    ]),
+    "Eastern Pyrenees": ids_of([
+        "Font-Romeu", "Mont-Louis", "Villefranche-de-Conflent", "Ax-les-Thermes",
+        "Prats-de-Mollo-la-Preste",
+    ]),
+    "Jura": ids_of([
+        "Les Rousses", "Morbier", "Saint-Claude", "Lons-le-Saunier", "Arbois",
+        "Baume-les-Messieurs", "Salins-les-Bains", "Métabief", "Clairvaux-les-Lacs",
+        "Lamoura", "Château-Chalon", "Nantua",
+    ]),
+}
+
+# Régions de la page Sea & Sun
+COASTS = {
+    "Mediterranean Coast": ids_of([
+        "Nice", "Cannes", "Antibes", "Saint-Tropez", "Menton", "Juan-les-Pins",
+        "Marseille", "Cassis", "Bandol", "Hyères", "Sanary-sur-Mer", "Montpellier",
+        "Sète", "Agde", "Cap d’Agde", "Gruissan", "Narbonne", "Palavas-les-Flots",
+        "Collioure", "Port-Vendres", "Banyuls-sur-Mer", "Argelès-sur-Mer",
+    ]),
+    "Atlantic Coast": ids_of([
+        "Hendaye", "Saint-Jean-de-Luz", "Biarritz", "Anglet", "Bayonne", "Hossegor",
+        "Capbreton", "Seignosse", "Biscarrosse", "Mimizan", "Arcachon",
+        "Lège-Cap-Ferret", "Lacanau", "Soulac-sur-Mer", "Les Sables-d'Olonne",
+        "Saint-Jean-de-Monts", "Saint-Gilles-Croix-de-Vie", "La Tranche-sur-Mer",
+        "Île de Noirmoutier", "Île d'Yeu", "La Rochelle", "Île de Ré", "Île d'Oléron",
+        "Royan", "Châtelaillon-Plage", "Rochefort",
+    ]),
+    "Bretagne/Normandie": ids_of([
+        "Vannes", "Lorient", "Carnac", "Quiberon", "La Baule", "Pornic",
+        "Saint-Nazaire", "Préfailles", "Saint-Brévin-les-Pins", "Saint-Malo", "Dinard",
+        "Cancale", "Deauville", "Trouville-sur-Mer", "Cabourg", "Honfleur", "Étretat",
+        "Fécamp", "Dieppe", "Le Havre",
+    ]),
+    "English Channel Coast": ids_of([
+        "Calais", "Boulogne-sur-Mer", "Wimereux", "Wissant", "Le Touquet",
+        "Berck-sur-Mer", "Saint-Valery-sur-Somme", "Le Crotoy", "Cayeux-sur-Mer",
+        "Mers-les-Bains",
+    ]),
+}
+
+
+# Toutes les villes à collecter (chacune une seule fois)
+def all_cities():
+    return [ville for _, ville, _ in CITIES]
+
+
+# Ajouter la colonne City_Id aux fichiers produits avant le référentiel
+def add_city_ids(df):
+    if "City_Id" not in df.columns:
+        df.insert(0, "City_Id", df["Ville"].map(CITY_IDS).astype("Int64"))
+    return df
+
+
+# Lignes d'un DataFrame (avec une colonne City_Id) correspondant aux villes données
+def select_cities(df, city_ids):
+    return df[df["City_Id"].isin(city_ids)]
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+import results_store
+from results_store import RESULTS_FOLDER, LEGACY_CSV
+from forecast_store import FORECAST_FOLDER
+
+# Accès aux données pour toutes les pages Streamlit : un cache par processus, partagé par toutes les sessions.
+#   - clé = (source, empreinte des fichiers, fonction, arguments) ; l'empreinte vient des mtime/taille des fichiers
+#     de results/ (ou du manifeste de l'archive) : quand le script quotidien écrit de nouveaux fichiers, l'empreinte
+#     change et les entrées de l'ancienne version sont retirées au premier appel suivant
+#   - taille bornée (DATA_CACHE_MB, 256 Mo par défaut), les entrées les moins récemment utilisées sont évincées
+#   - les pages reçoivent une copie : elles peuvent modifier leur DataFrame sans toucher au cache
+# clear() vide le cache à la main (ex. après un déploiement qui remplace les fichiers sans changer leur date).
+# Les modules de cartes et de graphiques (plotly, matplotlib, seaborn) ne sont importés que par les fonctions qui
+# en ont besoin : une page qui ne lit que des tables ne les charge pas.
+MAX_BYTES = int(os.environ.get("DATA_CACHE_MB", 256)) * 1024 * 1024
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_fingerprints = {}
+
+
+# Empreinte d'une liste de fichiers (chemin, mtime, taille) ; un fichier absent compte aussi
+def files_fingerprint(paths):
+    parts = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+        except FileNotFoundError:
+            parts.append(f"{path}:-")
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+# Fichiers du jour (tables en étoile et agrégats, ou ancien fichier large)
+def results_fingerprint(folder=RESULTS_FOLDER):
+    paths = [LEGACY_CSV]
+    if os.path.isdir(folder):
+        # Fichiers temporaires des écritures atomiques (.tmp-*) ignorés
+        paths += [entry.path for entry in os.scandir(folder) if entry.is_file() and not entry.name.startswith(".")]
+    return files_fingerprint(paths)
+
+
+def _size(value):
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(_size(v) for v in value.values())
+    return 0
+
+
+def _copy(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    return value
+
+
+def _key_part(value):
+    if isinstance(value, (list, tuple, pd.Index, range)):
+        return tuple(_key_part(v) for v in value)
+    if hasattr(value, "tolist"):
+        return _key_part(value.tolist())
+    return value
+
+
+def _evict():
+    total = sum(size for _, size in _entries.values())
+    while _entries and total > MAX_BYTES:
+        _, (_, size) = _entries.popitem(last=False)
+        total -= size
+
+
+# Valeur en cache pour (source, empreinte, nom, arguments), calculée par load() au premier appel
+def cached(source, fingerprint, name, args, load):
+    key = (source, fingerprint, name, _key_part(args))
+    with _lock:
+        if _fingerprints.get(source) != fingerprint:
+            # Nouvelles données : on oublie tout ce qui a été lu dans l'ancienne version de la source
+            for old in [k for k in _entries if k[0] == source and k[1] != fingerprint]:
+                del _entries[old]
+            _fingerprints[source] = fingerprint
+        if key in _entries:
+            _entries.move_to_end(key)
+            return _copy(_entries[key][0])
+
+    # Lecture hors du verrou : les autres sessions ne sont pas bloquées pendant le chargement
+    value = load()
+    with _lock:
+        if _fingerprints.get(source) == fingerprint:
+            _entries[key] = (value, _size(value))
+            _entries.move_to_end(key)
+            _evict()
+    return _copy(value)
+
+
+def clear(source=None):
+    with _lock:
+        for key in [k for k in _entries if source is None or k[0] == source]:
+            del _entries[key]
+        if source is None:
+            _fingerprints.clear()
+        else:
+            _fingerprints.pop(source, None)
+
+
+# Résultats du jour, mêmes arguments que results_store.read_results
+def load_results(columns=None, city_ids=None, start=None, end=None, folder=RESULTS_FOLDER, table="forecasts"):
+    return cached(
+        folder, results_fingerprint(folder), "results", (columns, city_ids, start, end, table),
+        lambda: results_store.read_results(columns, city_ids, start, end, folder, table)
+    )
+
+
+# Table de dimension : lue en entier une fois, filtrée en mémoire
+def load_dimension(name, city_ids=None, folder=RESULTS_FOLDER):
+    df = cached(folder, results_fingerprint(folder), "dimension", (name,),
+                lambda: results_store.read_dimension(name, folder=folder))
+    if city_ids is not None:
+        df = df[df["City_Id"].isin(list(city_ids))].reset_index(drop=True)
+    return df
+
+
+# Tableaux de météo par moment de la journée d'une région (un par ville), calculés une fois par région
+def load_day_time_tables(city_ids, folder=RESULTS_FOLDER):
+    return cached(folder, results_fingerprint(folder), "day_time_tables", (city_ids,),
+                  lambda: results_store.read_day_time_tables(city_ids, folder))
+
+
+# Carte animée d'une région (figure JSON précalculée par le script quotidien) pour les lignes `df` de la page ;
+# gardée en texte : json.loads à chaque rerun, plus de px.density_map
+def load_region_map(kind, name, df, folder=RESULTS_FOLDER):
+    import region_maps
+    return cached(folder, results_fingerprint(folder), "region_map", (kind, name),
+                  lambda: json.dumps(region_maps.region_figure(kind, name, df, folder)))
+
+
+def join_dimensions(df, columns, folder=RESULTS_FOLDER):
+    return results_store.join_dimensions(df, columns, folder, read_dimension=load_dimension)
+
+
+# Lot d'artefacts de la page Weather Analysis (tables, png, cartes JSON) construit et versionné par le workflow
+# (analysis_bundle.py) : seulement lu ici, relu quand analysis_bundle.json change ; None s'il n'a jamais été construit
+def load_analysis_bundle(folder=FORECAST_FOLDER):
+    import analysis_bundle
+    return cached(folder, files_fingerprint([analysis_bundle.bundle_path(folder)]), "analysis_bundle", (),
+                  lambda: analysis_bundle.read_bundle(folder))
@@ -0,0 +1,110 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from PIL import Image  # noqa: E402
+
+# Rendu des graphiques matplotlib/seaborn des pages : un cache par processus, partagé par toutes les sessions.
+#   - clé = empreinte du contenu : fonction de tracé (nom et code) + données et paramètres passés
+#   - valeur = image png déjà rendue ; afficher une vue déjà vue ne coûte qu'une recherche dans le dictionnaire
+#   - taille bornée (FIGURE_CACHE_MB, 64 Mo par défaut), les images les moins récemment utilisées sont évincées
+#   - l'état de pyplot (figure courante, plt.xticks...) est global : un seul rendu à la fois, derrière un verrou
+# La fonction de tracé crée sa figure à partir de ses seuls arguments et la renvoie.
+MAX_BYTES = int(os.environ.get("FIGURE_CACHE_MB", 64)) * 1024 * 1024
+# Mêmes réglages que st.pyplot
+SAVEFIG = {"format": "png", "bbox_inches": "tight", "dpi": 200}
+# Largeur maximale affichée par Streamlit (2 x 730 px) : au-delà, st.image redimensionne et réencode l'image
+# à chaque rerun ; on garde directement l'image à cette largeur
+MAX_IMAGE_WIDTH = 1460
+
+_lock = threading.Lock()
+_render_lock = threading.Lock()
+_entries = OrderedDict()
+
+
+# Graphique matplotlib -> octets png, réduit à la largeur d'affichage comme le ferait st.pyplot
+def figure_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **SAVEFIG)
+    plt.close(fig)
+    image = Image.open(buffer)
+    if image.width <= MAX_IMAGE_WIDTH:
+        return buffer.getvalue()
+    height = int(1.0 * image.height * MAX_IMAGE_WIDTH / image.width)
+    buffer = io.BytesIO()
+    image.resize((MAX_IMAGE_WIDTH, height), resample=Image.BILINEAR).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _hash_part(digest, value):
+    digest.update(type(value).__name__.encode("utf-8"))
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr(value.name).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode("utf-8"))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _hash_part(digest, k)
+            _hash_part(digest, v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _hash_part(digest, v)
+    else:
+        digest.update(repr(value).encode("utf-8"))
+    digest.update(b"\0")
+
+
+# Empreinte d'un rendu : une fonction modifiée (rechargement de la page) ne sert pas les anciennes images
+def figure_key(draw, args, kwargs):
+    digest = hashlib.sha1(f"{draw.__module__}.{draw.__qualname__}".encode("utf-8"))
+    digest.update(draw.__code__.co_code)
+    digest.update(repr([c for c in draw.__code__.co_consts if not hasattr(c, "co_code")]).encode("utf-8"))
+    _hash_part(digest, args)
+    _hash_part(digest, sorted(kwargs.items()))
+    return digest.hexdigest()
+
+
+def _evict():
+    total = sum(len(png) for png in _entries.values())
+    while _entries and total > MAX_BYTES:
+        _, png = _entries.popitem(last=False)
+        total -= len(png)
+
+
+# Image png de draw(*args, **kwargs), rendue au premier appel puis servie depuis le cache
+def render_png(draw, *args, **kwargs):
+    key = figure_key(draw, args, kwargs)
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            return _entries[key]
+
+    with _render_lock:
+        # Rendu peut-être fait par une autre session pendant l'attente du verrou
+        with _lock:
+            if key in _entries:
+                _entries.move_to_end(key)
+                return _entries[key]
+        png = figure_png(draw(*args, **kwargs))
+
+    with _lock:
+        _entries[key] = png
+        _entries.move_to_end(key)
+        _evict()
+    return png
+
+
+def clear():
+    with _lock:
+        _entries.clear()
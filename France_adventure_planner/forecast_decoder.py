@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+# Vocabulaire fixe des conditions météo : identifiant OpenWeatherMap ("weather.id" de l'API),
+# libellé affiché, score et classe de sévérité.
+# Les scores sont ceux du barème d'origine (par libellé) ; une condition absente du barème n'a pas de score (None)
+SEVERITIES = ["Clear", "Clouds", "Atmosphere", "Drizzle", "Rain", "Snow", "Thunderstorm", "Extreme"]
+CONDITIONS = [
+    (800, "clear sky", 600, 0),
+    (801, "few clouds", 500, 1),
+    (802, "scattered clouds", 400, 1),
+    (803, "broken clouds", 300, 1),
+    (804, "overcast clouds", 200, 1),
+
+    (300, "light intensity drizzle", -1, 3),
+    (301, "drizzle", -2, 3),
+    (302, "heavy intensity drizzle", -3, 3),
+    (310, "light intensity drizzle rain", -4, 3),
+    (311, "drizzle rain", -5, 3),
+    (312, "heavy intensity drizzle rain", -6, 3),
+    (321, "shower drizzle", -7, 3),
+    (313, "shower rain and drizzle", -8, 3),
+    (314, "heavy shower rain and drizzle", -9, 3),
+
+    (500, "light rain", -10, 4),
+    (501, "moderate rain", -20, 4),
+    (502, "heavy intensity rain", -30, 4),
+    (503, "very heavy rain", -40, 4),
+    (504, "extreme rain", -50, 4),
+    (511, "freezing rain", -60, 4),
+    (520, "light intensity shower rain", -70, 4),
+    (521, "shower rain", -80, 4),
+    (522, "heavy intensity shower rain", -90, 4),
+    (531, "ragged shower rain", -100, 4),
+
+    (230, "thunderstorm with light drizzle", -15, 6),
+    (231, "thunderstorm with drizzle", -25, 6),
+    (200, "thunderstorm with light rain", -35, 6),
+    (201, "thunderstorm with rain", -45, 6),
+    (232, "thunderstorm with heavy drizzle", -55, 6),
+    (202, "thunderstorm with heavy rain", -65, 6),
+    (210, "light thunderstorm", None, 6),
+    (211, "thunderstorm", -75, 6),
+    (212, "heavy thunderstorm", -85, 6),
+    (221, "ragged thunderstorm", -95, 6),
+
+    (600, "light snow", -20, 5),
+    (601, "snow", -40, 5),
+    (602, "heavy snow", -60, 5),
+    (611, "sleet", -80, 5),
+    (612, "light shower sleet", -100, 5),
+    (613, "shower sleet", -120, 5),
+    (615, "light rain and snow", -140, 5),
+    (616, "rain and snow", -160, 5),
+    (620, "light shower snow", -180, 5),
+    (621, "shower snow", -200, 5),
+    (622, "heavy shower snow", -220, 5),
+
+    (701, "mist", -10, 2),
+    (711, "smoke", -20, 2),
+    (721, "haze", -30, 2),
+    (731, "sand/dust whirls", -40, 2),
+    (741, "fog", -50, 2),
+    (751, "sand", -60, 2),
+    (761, "dust", -70, 2),
+    (762, "volcanic ash", -90, 7),
+    (771, "squalls", -100, 7),
+    (781, "tornado", -400, 7),
+]
+# Tableaux de correspondance indexés par l'identifiant (0 à 999) ; -1 / NaN / None hors vocabulaire.
+# Un identifiant hors vocabulaire garde la description envoyée par l'API et n'a pas de score, comme avant.
+N_CODES = 1000
+CONDITION_LABELS = np.full(N_CODES, None, dtype=object)
+CONDITION_SCORES = np.full(N_CODES, np.nan)
+CONDITION_SEVERITY = np.full(N_CODES, -1, dtype="int8")
+for _code, _label, _score, _severity in CONDITIONS:
+    CONDITION_LABELS[_code], CONDITION_SEVERITY[_code] = _label, _severity
+    CONDITION_SCORES[_code] = np.nan if _score is None else _score
+
+# Libellé -> identifiant, pour les fichiers écrits avant les identifiants (archive, anciens résultats)
+CONDITION_CODES = pd.Index([label for _, label, _, _ in CONDITIONS])
+_CONDITION_IDS = np.array([code for code, _, _, _ in CONDITIONS], dtype="int16")
+
+
+# Identifiants à partir des libellés (0 pour un libellé absent du vocabulaire)
+def weather_codes(labels):
+    positions = CONDITION_CODES.get_indexer(pd.Index(labels, dtype=object))
+    return np.where(positions >= 0, _CONDITION_IDS[positions], 0).astype("int16")
+
+
+# Identifiants présents dans le vocabulaire
+def known_codes(codes):
+    codes = np.asarray(codes)
+    return (codes >= 0) & (codes < N_CODES) & (CONDITION_SEVERITY[codes.clip(0, N_CODES - 1)] >= 0)
+
+
+# Libellés à partir des identifiants, en catégorie (NaN pour un identifiant manquant ou hors vocabulaire)
+#   extra : {identifiant hors vocabulaire: description de l'API}, pour garder le libellé d'origine
+def weather_labels(codes, extra=None):
+    codes = pd.to_numeric(pd.Series(codes), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~np.isnan(codes)
+    labels = np.full(len(codes), None, dtype=object)
+    labels[valid] = CONDITION_LABELS[codes[valid].astype(int).clip(0, N_CODES - 1)]
+    categories = [label for _, label, _, _ in CONDITIONS]
+    for code, label in (extra or {}).items():
+        labels[(codes == code) & pd.isna(labels)] = label
+        categories.append(label)
+    return pd.Categorical(labels, categories=list(dict.fromkeys(categories)))
+
+
+# Moment de la journée pour chaque heure de 0 à 23
+DAY_TIMES = ["Morning", "Afternoon", "Evening", "Night"]
+HOUR_TO_DAY_TIME = np.array(
+    [3] * 6 +   # 0h-5h   : Night
+    [0] * 6 +   # 6h-11h  : Morning
+    [1] * 6 +   # 12h-17h : Afternoon
+    [2] * 4 +   # 18h-21h : Evening
+    [3] * 2,    # 22h-23h : Night
+    dtype="int8"
+)
+
+
+# Convertir le JSON OpenWeatherMap d'une ville en colonnes typées
+def decode_forecast(city_id, ville, lat, lon, weather_data):
+    slots = weather_data["list"]
+    n = len(slots)
+
+    dt = np.fromiter((slot["dt"] for slot in slots), dtype="int64", count=n)
+    temp_max = np.fromiter((slot["main"]["temp_max"] for slot in slots), dtype="float64", count=n)
+    temp_min = np.fromiter((slot["main"]["temp_min"] for slot in slots), dtype="float64", count=n)
+    humidity = np.fromiter((slot["main"]["humidity"] for slot in slots), dtype="int64", count=n)
+    rain = np.fromiter((slot["pop"] for slot in slots), dtype="float64", count=n)
+    # Identifiant de condition OWM ; à défaut, retrouvé depuis la description
+    conditions = [slot["weather"][0] for slot in slots]
+    codes = np.fromiter((condition.get("id", -1) for condition in conditions), dtype="int16", count=n)
+    missing = np.flatnonzero(codes < 0)
+    if missing.size:
+        codes[missing] = weather_codes([conditions[i].get("description") for i in missing])
+
+    # Une seule conversion vectorisée des timestamps
+    date_hour = pd.to_datetime(dt, unit="s")
+    hours = date_hour.hour.to_numpy()
+
+    # Score et libellé par simple indexation ; un identifiant hors vocabulaire est signalé,
+    # garde la description de l'API et n'a pas de score
+    unknown = ~known_codes(codes)
+    extra = {}
+    if unknown.any():
+        print(f"Conditions météo inconnues pour {ville} : {sorted(set(codes[unknown].tolist()))}")
+        extra = {int(codes[i]): conditions[i].get("description") for i in np.flatnonzero(unknown)}
+    scores = CONDITION_SCORES[codes.clip(0, N_CODES - 1)]
+    scores[unknown] = np.nan
+
+    return pd.DataFrame({
+        "City_Id": np.full(n, city_id, dtype="int64"),
+        "Ville": np.full(n, ville, dtype=object),
+        "Latitude": np.full(n, float(lat)),
+        "Longitude": np.full(n, float(lon)),
+        "Date": date_hour.normalize(),
+        "Hour": hours.astype("int64"),
+        "Day_Time": pd.Categorical.from_codes(HOUR_TO_DAY_TIME[hours], categories=DAY_TIMES),
+        "Temp_Max": temp_max,
+        "Temp_Min": temp_min,
+        "Humidity": humidity,
+        "Weather_Code": codes,
+        "Weather": weather_labels(codes, extra),
+        "Rain_Probability": rain,
+        "Weather_Score": scores,
+        "Temp_Avg": (temp_max + temp_min) / 2,
+    })
@@ -0,0 +1,161 @@
+import argparse
+import os
+import sqlite3
+import pandas as pd
+from cities import CITY_IDS
+from forecast_store import FORECAST_FOLDER, HORIZONS, legacy_path, list_partitions, list_revisions, decode_revisions
+
+# Historique des prévisions dans une base SQLite locale, à côté des fichiers qu'elle indexe :
+#   forecasts/history.sqlite
+# Une ligne par ville, date cible, créneau, horizon et date d'exécution.
+# La base se reconstruit à partir des fichiers CSV (elle n'est pas versionnée) :
+# sync() ne charge que les fichiers nouveaux ou modifiés depuis le dernier passage.
+# Synchronisée chaque nuit par l'étape du workflow qui construit le lot de la page Weather Analysis
+# (python analysis_bundle.py), depuis l'archive écrite par le script quotidien.
+HISTORY_NAME = "history.sqlite"
+# Attente maximale (secondes) d'un verrou d'écriture : deux sessions qui chargent la page en même temps
+# synchronisent la même base, la seconde attend la fin de la première au lieu d'échouer ("database is locked")
+SQLITE_TIMEOUT = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    Source TEXT NOT NULL,
+    City_Id INTEGER,
+    Ville TEXT NOT NULL,
+    Latitude REAL,
+    Longitude REAL,
+    Target_Date TEXT NOT NULL,
+    Slot INTEGER NOT NULL,
+    Horizon INTEGER NOT NULL,
+    Run_Date TEXT,
+    Temp_Max REAL,
+    Temp_Min REAL,
+    Temp_Avg REAL,
+    Humidity REAL,
+    Weather TEXT,
+    Rain_Probability REAL,
+    Weather_Score INTEGER
+);
+CREATE INDEX IF NOT EXISTS forecasts_key ON forecasts (Ville, Target_Date, Horizon, Run_Date);
+CREATE INDEX IF NOT EXISTS forecasts_horizon ON forecasts (Horizon, Target_Date);
+CREATE INDEX IF NOT EXISTS forecasts_source ON forecasts (Source);
+CREATE TABLE IF NOT EXISTS sources (
+    Source TEXT PRIMARY KEY,
+    Mtime_Ns INTEGER,
+    Size INTEGER,
+    Rows INTEGER
+);
+"""
+
+COLUMNS = [
+    "Source", "City_Id", "Ville", "Latitude", "Longitude", "Target_Date", "Slot", "Horizon", "Run_Date",
+    "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Weather", "Rain_Probability", "Weather_Score"
+]
+
+
+# Lignes d'un fichier d'archive au format de la table `forecasts`
+def history_rows(df, horizon, source):
+    df = df.copy()
+    df["Source"] = source
+    df["Horizon"] = horizon
+    df["City_Id"] = df["Ville"].map(CITY_IDS)
+    target = pd.to_datetime(df["Date"])
+    df["Target_Date"] = target.dt.strftime("%Y-%m-%d")
+    # Anciens fichiers sans Run_Date : la prévision a été faite `horizon` jours avant la date cible
+    if "Run_Date" in df.columns:
+        df["Run_Date"] = pd.to_datetime(df["Run_Date"]).dt.strftime("%Y-%m-%d")
+    else:
+        df["Run_Date"] = (target - pd.Timedelta(days=horizon)).dt.strftime("%Y-%m-%d")
+    # Les fichiers n'ont pas d'heure : le créneau est le rang de la ligne dans sa journée
+    if "Slot" not in df.columns:
+        df["Slot"] = df.groupby(["Ville", "Target_Date", "Run_Date"]).cumcount()
+    return df.reindex(columns=COLUMNS)
+
+
+class ForecastHistory:
+    def __init__(self, folder=FORECAST_FOLDER, path=None):
+        self.folder = folder
+        self.path = path or os.path.join(folder, HISTORY_NAME)
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT)
+        con.executescript(SCHEMA)
+        return con
+
+    # Fichiers d'archive du dossier : (horizon, chemin relatif), horizon None pour les révisions (tous les horizons)
+    def _source_files(self):
+        files = []
+        for horizon in HORIZONS:
+            if os.path.exists(legacy_path(horizon, self.folder)):
+                files.append((horizon, os.path.basename(legacy_path(horizon, self.folder))))
+        files += [(None, r["path"]) for r in list_revisions(self.folder)]
+        files += [(p["horizon"], p["path"]) for p in list_partitions(folder=self.folder)]
+        return files
+
+    def _read_source(self, horizon, source):
+        df = pd.read_csv(os.path.join(self.folder, source))
+        if horizon is not None:
+            return history_rows(df, horizon, source)
+        df = decode_revisions(df)
+        return pd.concat([history_rows(rows, h, source) for h, rows in df.groupby("Horizon")], ignore_index=True)
+
+    # Charger les fichiers nouveaux ou modifiés, oublier ceux qui ont disparu ; renvoie le nombre de fichiers chargés
+    def sync(self):
+        # Une compaction peut supprimer un fichier pendant le chargement : la transaction est annulée, on recommence
+        for attempt in range(2):
+            try:
+                return self._sync()
+            except FileNotFoundError:
+                if attempt:
+                    raise
+
+    def _sync(self):
+        con = self.connect()
+        try:
+            known = {source: (mtime, size) for source, mtime, size in
+                     con.execute("SELECT Source, Mtime_Ns, Size FROM sources")}
+            files = self._source_files()
+            loaded = 0
+            with con:
+                for source in set(known) - {source for _, source in files}:
+                    con.execute("DELETE FROM forecasts WHERE Source = ?", (source,))
+                    con.execute("DELETE FROM sources WHERE Source = ?", (source,))
+
+                for horizon, source in files:
+                    stat = os.stat(os.path.join(self.folder, source))
+                    if known.get(source) == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    rows = self._read_source(horizon, source)
+                    con.execute("DELETE FROM forecasts WHERE Source = ?", (source,))
+                    rows.to_sql("forecasts", con, if_exists="append", index=False)
+                    con.execute(
+                        "INSERT OR REPLACE INTO sources (Source, Mtime_Ns, Size, Rows) VALUES (?, ?, ?, ?)",
+                        (source, stat.st_mtime_ns, stat.st_size, len(rows))
+                    )
+                    loaded += 1
+            return loaded
+        finally:
+            con.close()
+
+    # Requête SQL -> DataFrame (une connexion par appel : utilisable depuis les threads Streamlit)
+    def query(self, sql, params=()):
+        con = self.connect()
+        try:
+            return pd.read_sql_query(sql, con, params=params)
+        finally:
+            con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mise à jour de la base SQLite de l'historique des prévisions")
+    parser.add_argument("--folder", default=FORECAST_FOLDER, help="dossier des fichiers d'archive")
+    parser.add_argument("--rebuild", action="store_true", help="reconstruire la base depuis zéro")
+    args = parser.parse_args()
+
+    history = ForecastHistory(args.folder)
+    if args.rebuild and os.path.exists(history.path):
+        os.remove(history.path)
+    loaded = history.sync()
+    count = history.query("SELECT COUNT(*) AS n FROM forecasts")["n"].iloc[0]
+    print(f"{loaded} fichiers chargés, {count} lignes dans {history.path}.")
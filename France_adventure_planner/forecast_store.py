@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import pandas as pd
+from storage import atomic_write_csv, atomic_write_json
+
+# Archive des prévisions : un fichier par horizon et par date d'exécution
+#   forecasts/{n}day/{run_date}.csv
+#   forecasts/manifest.json  -> liste des partitions, pour ne pas parcourir les dossiers
+# Les anciens fichiers forecasts/weather_data_forecast_{n}day.csv restent lus tels quels.
+# La compaction (python forecast_store.py --compact) regroupe les partitions par mois de date cible, encodé en révisions :
+#   forecasts/revisions/{YYYY-MM}.csv -> tous les horizons, sans doublon (voir encode_revisions)
+FORECAST_FOLDER = "forecasts"
+MANIFEST_NAME = "manifest.json"
+HORIZONS = range(1, 6)
+
+
+def legacy_path(horizon, folder=FORECAST_FOLDER):
+    return os.path.join(folder, f"weather_data_forecast_{horizon}day.csv")
+
+
+def partition_path(horizon, run_date, folder=FORECAST_FOLDER):
+    return os.path.join(folder, f"{horizon}day", f"{run_date}.csv")
+
+
+def load_manifest(folder=FORECAST_FOLDER):
+    path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"partitions": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, folder=FORECAST_FOLDER):
+    atomic_write_json(manifest, os.path.join(folder, MANIFEST_NAME), indent=1)
+
+
+# Partitions connues (éventuellement pour un seul horizon), triées par date d'exécution
+def list_partitions(horizon=None, folder=FORECAST_FOLDER):
+    partitions = load_manifest(folder)["partitions"]
+    if horizon is not None:
+        partitions = [p for p in partitions if p["horizon"] == horizon]
+    return sorted(partitions, key=lambda p: (p["horizon"], p["run_date"]))
+
+
+# Écrire les lignes d'une exécution : seule la nouvelle partition est touchée
+def append_partition(df, horizon, run_date, folder=FORECAST_FOLDER):
+    path = partition_path(horizon, run_date, folder)
+    atomic_write_csv(df, path)
+
+    # Une relance le même jour remplace la partition au lieu de l'ajouter une deuxième fois
+    manifest = load_manifest(folder)
+    manifest["partitions"] = [
+        p for p in manifest["partitions"]
+        if not (p["horizon"] == horizon and p["run_date"] == run_date)
+    ]
+    manifest["partitions"].append({
+        "horizon": horizon,
+        "run_date": run_date,
+        "path": os.path.relpath(path, folder).replace(os.sep, "/"),
+        "rows": len(df),
+    })
+    save_manifest(manifest, folder)
+    return path
+
+
+# Révisions d'une même prévision : la date cible est prévue 5 fois (J+5 puis J+4 ... J+1).
+# Fichier forecasts/revisions/{YYYY-MM}.csv (mois de la date cible), trié par ville, date, créneau et horizon décroissant :
+#   - première prévision du créneau (Delta = 0) : valeurs complètes
+#   - révisions suivantes (Delta = 1) : écart avec la révision précédente, cellule vide = inchangé
+#     (météo seulement si elle change ; coordonnées et Run_Date = Date - horizon omis)
+# Les mesures sont stockées en entiers à la précision de l'API (ex. centièmes de degré) : les écarts
+# sont exacts et le décodage est une somme cumulée par créneau.
+REVISION_FOLDER = "revisions"
+REVISION_KEY = ["Ville", "Date", "Slot"]
+PRECISION = {
+    "Temp_Max": 2, "Temp_Min": 2, "Temp_Avg": 3,
+    "Humidity": 0, "Rain_Probability": 2, "Weather_Score": 0,
+}
+ARCHIVE_COLUMNS = ["Ville", "Latitude", "Longitude", "Date", "Temp_Max", "Temp_Min", "Humidity", "Weather",
+                   "Rain_Probability", "Weather_Score", "Temp_Avg", "Run_Date"]
+
+
+def revision_path(month, folder=FORECAST_FOLDER):
+    return os.path.join(folder, REVISION_FOLDER, f"{month}.csv")
+
+
+def list_revisions(folder=FORECAST_FOLDER):
+    return sorted(load_manifest(folder).get("revisions", []), key=lambda r: r["month"])
+
+
+def _default_run_date(df):
+    return (pd.to_datetime(df["Date"]) - pd.to_timedelta(df["Horizon"], unit="D")).dt.strftime("%Y-%m-%d")
+
+
+# Lignes complètes (colonnes de l'archive + Horizon et Slot) -> lignes encodées
+def encode_revisions(df):
+    df = df.sort_values(REVISION_KEY + ["Horizon"], ascending=[True, True, True, False]).reset_index(drop=True)
+    prev = df.shift()
+    same_slot = df[REVISION_KEY].eq(prev[REVISION_KEY]).all(axis=1)
+
+    quantized = {col: (df[col].astype("float64") * 10 ** digits).round().astype("Int64")
+                 for col, digits in PRECISION.items()}
+    # Une révision ne peut être un écart que si les coordonnées sont les mêmes et qu'aucune valeur n'apparaît/disparaît
+    delta = same_slot & df[["Latitude", "Longitude"]].eq(prev[["Latitude", "Longitude"]]).all(axis=1)
+    for col in list(PRECISION) + ["Weather"]:
+        delta &= df[col].isna().eq(prev[col].isna())
+
+    out = df[REVISION_KEY + ["Horizon"]].copy()
+    out["Delta"] = delta.astype("int8")
+    run_date = df["Run_Date"].astype(str)
+    out["Run_Date"] = run_date.where(run_date != _default_run_date(df))
+    out["Latitude"] = df["Latitude"].where(~delta)
+    out["Longitude"] = df["Longitude"].where(~delta)
+    out["Weather"] = df["Weather"].where(~delta | (df["Weather"] != prev["Weather"]))
+    for col, values in quantized.items():
+        diff = values - values.shift()
+        out[col] = values.where(~delta, diff.where((diff != 0).fillna(False)))
+    return out
+
+
+# Lignes encodées -> lignes complètes, pour tous les horizons ou seulement ceux demandés
+def decode_revisions(df, horizons=None):
+    df = df.reset_index(drop=True)
+    block = (df["Delta"] == 0).cumsum()
+    out = df[REVISION_KEY + ["Horizon"]].copy()
+    out["Latitude"] = df["Latitude"].groupby(block).ffill()
+    out["Longitude"] = df["Longitude"].groupby(block).ffill()
+    out["Weather"] = df["Weather"].groupby(block).ffill()
+    full = df["Delta"] == 0
+    for col, digits in PRECISION.items():
+        missing = (df[col].isna() & full).groupby(block).transform("max")
+        values = df[col].astype("float64").fillna(0).groupby(block).cumsum() / 10 ** digits
+        out[col] = values.round(digits).where(~missing)
+    out["Run_Date"] = df["Run_Date"].fillna(_default_run_date(df))
+    if horizons is not None:
+        out = out[out["Horizon"].isin(list(horizons))]
+    return out.reset_index(drop=True)
+
+
+def read_revisions(folder=FORECAST_FOLDER, horizons=None):
+    frames = [decode_revisions(pd.read_csv(os.path.join(folder, r["path"])), horizons)
+              for r in list_revisions(folder)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+# Sources d'un horizon dans l'ordre d'écriture : ancien fichier cumulé, révisions compactées, partitions
+def _read_horizon_sources(horizon, folder=FORECAST_FOLDER, **read_csv_kwargs):
+    frames = []
+    if os.path.exists(legacy_path(horizon, folder)):
+        frames.append(pd.read_csv(legacy_path(horizon, folder), **read_csv_kwargs))
+    revisions = read_revisions(folder, [horizon])
+    if not revisions.empty:
+        frames.append(revisions.reindex(columns=ARCHIVE_COLUMNS))
+    frames += [pd.read_csv(os.path.join(folder, p["path"]), **read_csv_kwargs)
+               for p in list_partitions(horizon, folder)]
+    return frames
+
+
+# Historique complet d'un horizon : ancien fichier cumulé + révisions + partitions
+def read_horizon(horizon, folder=FORECAST_FOLDER, **read_csv_kwargs):
+    # Une compaction peut supprimer un fichier entre la lecture du manifeste et celle du fichier : on relit
+    for attempt in range(2):
+        try:
+            frames = _read_horizon_sources(horizon, folder, **read_csv_kwargs)
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        except FileNotFoundError:
+            if attempt:
+                raise
+
+
+# Garder, pour chaque (ville, date cible), le dernier bloc de lignes de la dernière exécution.
+# Un bloc = lignes consécutives d'une même (ville, date, exécution) : c'est ce qu'écrit une exécution,
+# une relance ajoute un deuxième bloc identique plus loin dans le fichier.
+def latest_run_rows(df, horizon):
+    df = df.reset_index(drop=True)
+    if "Run_Date" not in df.columns or df["Run_Date"].isna().any():
+        # Anciens fichiers : la prévision a été faite `horizon` jours avant la date cible
+        default = (pd.to_datetime(df["Date"]) - pd.Timedelta(days=horizon)).dt.strftime("%Y-%m-%d")
+        df["Run_Date"] = df["Run_Date"].fillna(default) if "Run_Date" in df.columns else default
+    key = df[["Ville", "Date", "Run_Date"]]
+    block = key.ne(key.shift()).any(axis=1).cumsum()
+    blocks = df.assign(Block=block).drop_duplicates("Block", keep="last")
+    winners = blocks.sort_values(["Run_Date", "Block"]).drop_duplicates(["Ville", "Date"], keep="last")["Block"]
+    return df[block.isin(winners)]
+
+
+def _file_paths(folder):
+    paths = [legacy_path(horizon, folder) for horizon in HORIZONS if os.path.exists(legacy_path(horizon, folder))]
+    paths += [os.path.join(folder, r["path"]) for r in list_revisions(folder)]
+    paths += [os.path.join(folder, p["path"]) for p in list_partitions(folder=folder)]
+    return paths
+
+
+# Lignes de chaque horizon (sources dans l'ordre d'écriture) -> lignes encodées, doublons retirés
+def _merge_sources(sources, report):
+    frames = []
+    for horizon, parts in sources.items():
+        if not parts:
+            continue
+        df = pd.concat(parts, ignore_index=True)
+        report["rows_before"] += len(df)
+        df = latest_run_rows(df, horizon)
+        df["Horizon"] = horizon
+        df["Slot"] = df.groupby(["Ville", "Date", "Run_Date"]).cumcount()
+        frames.append(df)
+    return encode_revisions(pd.concat(frames, ignore_index=True)) if frames else None
+
+
+# Compaction complète : ancien fichier cumulé, révisions et partitions de tous les horizons
+def _full_sources(folder):
+    sources = {horizon: _read_horizon_sources(horizon, folder) for horizon in HORIZONS}
+    return sources, _file_paths(folder), []
+
+
+# Compaction incrémentale : seuls les mois de date cible touchés par les partitions sont relus et réécrits
+def _partition_sources(folder):
+    partitions = list_partitions(folder=folder)
+    sources = {horizon: [] for horizon in HORIZONS}
+    months = set()
+    partition_frames = []
+    for p in partitions:
+        df = pd.read_csv(os.path.join(folder, p["path"]))
+        months |= set(df["Date"].astype(str).str[:7])
+        partition_frames.append((p["horizon"], df))
+
+    touched = [r for r in list_revisions(folder) if r["month"] in months]
+    for r in touched:
+        revisions = decode_revisions(pd.read_csv(os.path.join(folder, r["path"])))
+        for horizon, rows in revisions.groupby("Horizon"):
+            sources[horizon].append(rows.reindex(columns=ARCHIVE_COLUMNS))
+    for horizon, df in partition_frames:
+        sources[horizon].append(df)
+
+    old_paths = [os.path.join(folder, r["path"]) for r in touched]
+    old_paths += [os.path.join(folder, p["path"]) for p in partitions]
+    kept = [r for r in list_revisions(folder) if r["month"] not in months]
+    return sources, old_paths, kept
+
+
+# Compaction de l'archive : partitions journalières fusionnées dans le fichier de révisions du mois de leur date
+# cible, doublons retirés. Seuls les mois touchés par de nouvelles partitions sont relus et réécrits, le coût
+# ne dépend pas de la taille de l'historique. Tout est refusionné (ancien fichier cumulé compris) avec full=True,
+# ou tant que les anciens fichiers par horizon existent.
+# Les nouveaux fichiers et le manifeste sont écrits (de façon atomique) avant de supprimer les anciens :
+# aucun lecteur ne voit de fichier à moitié écrit, et un lecteur qui tombe sur un fichier supprimé relit le manifeste.
+def compact(folder=FORECAST_FOLDER, dry_run=False, full=False):
+    full = full or any(os.path.exists(legacy_path(horizon, folder)) for horizon in HORIZONS)
+    old_partitions = {p["path"] for p in list_partitions(folder=folder)}
+    sources, old_paths, kept = _full_sources(folder) if full else _partition_sources(folder)
+    report = {"files_before": len(old_paths), "files_after": 0, "rows_before": 0, "rows_after": 0,
+              "bytes_before": sum(os.path.getsize(path) for path in old_paths), "bytes_after": 0}
+
+    encoded = _merge_sources(sources, report)
+    if encoded is None:
+        return report
+
+    revisions, written = [], set()
+    for month, rows in encoded.groupby(encoded["Date"].str[:7], sort=True):
+        path = revision_path(month, folder)
+        revisions.append({"month": month, "path": os.path.relpath(path, folder).replace(os.sep, "/"),
+                          "rows": len(rows)})
+        report["files_after"] += 1
+        report["rows_after"] += len(rows)
+        if not dry_run:
+            atomic_write_csv(rows, path)
+            written.add(path)
+            report["bytes_after"] += os.path.getsize(path)
+
+    if dry_run:
+        return report
+
+    # Partitions ajoutées pendant la compaction : conservées telles quelles
+    manifest = load_manifest(folder)
+    manifest["partitions"] = [p for p in manifest["partitions"] if p["path"] not in old_partitions]
+    manifest["revisions"] = sorted(kept + revisions, key=lambda r: r["month"])
+    save_manifest(manifest, folder)
+
+    for path in set(old_paths) - written:
+        os.remove(path)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive des prévisions")
+    parser.add_argument("--compact", action="store_true", help="fusionner l'archive en révisions par mois et retirer les doublons")
+    parser.add_argument("--folder", default=FORECAST_FOLDER, help="dossier de l'archive")
+    parser.add_argument("--dry-run", action="store_true", help="afficher le bilan sans rien écrire")
+    parser.add_argument("--full", action="store_true", help="refusionner toute l'archive, pas seulement les mois touchés")
+    args = parser.parse_args()
+
+    if not args.compact:
+        for r in list_revisions(args.folder):
+            print(f"Révisions {r['month']} : {r['rows']} lignes ({r['path']})")
+        for p in list_partitions(folder=args.folder):
+            print(f"J+{p['horizon']} {p['run_date']} : {p['rows']} lignes ({p['path']})")
+        parser.exit()
+
+    report = compact(args.folder, dry_run=args.dry_run, full=args.full)
+    print(f"{report['files_before']} fichiers -> {report['files_after']}, "
+          f"{report['rows_before']} lignes -> {report['rows_after']} "
+          f"({report['rows_before'] - report['rows_after']} doublons retirés)")
+    if not args.dry_run:
+        print(f"{report['bytes_before']} octets -> {report['bytes_after']} "
+              f"({report['bytes_before'] - report['bytes_after']} octets récupérés)")
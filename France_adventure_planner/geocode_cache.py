@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import unicodedata
+from datetime import datetime, timedelta
+import pandas as pd
+from storage import atomic_write_json
+
+# Fichier du cache de géocodage (persisté entre les exécutions)
+CACHE_FILE = os.path.join("cache", "geocodes.json")
+# Coordonnées corrigées à la main : {"Ville": [lat, lon]}, jamais expirées
+OVERRIDES_FILE = "geocode_overrides.json"
+
+
+# Clé de cache : minuscules, sans accents, apostrophes et espaces uniformisés
+def normalize_city(name):
+    name = unicodedata.normalize("NFKD", name.replace("’", "'"))
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(name.casefold().split())
+
+
+class GeocodeCache:
+    def __init__(self, path=CACHE_FILE, overrides_path=OVERRIDES_FILE):
+        self.path = path
+        self.overrides_path = overrides_path
+        self.entries = {}
+        self.overrides = {}
+        self.dirty = False
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        if os.path.exists(self.overrides_path):
+            with open(self.overrides_path, encoding="utf-8") as f:
+                self.overrides = {
+                    normalize_city(ville): (str(lat), str(lon))
+                    for ville, (lat, lon) in json.load(f).items()
+                }
+        return self
+
+    def save(self):
+        if not self.dirty:
+            return
+        atomic_write_json(self.entries, self.path, ensure_ascii=False, indent=1, sort_keys=True)
+        self.dirty = False
+
+    # Renvoie (lat, lon) ou None si la ville n'est pas connue
+    def get(self, ville):
+        key = normalize_city(ville)
+        if key in self.overrides:
+            return self.overrides[key]
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry["lat"], entry["lon"]
+
+    def put(self, ville, lat, lon, fetched_at=None):
+        self.entries[normalize_city(ville)] = {
+            "name": ville,
+            "lat": str(lat),
+            "lon": str(lon),
+            "fetched_at": fetched_at or datetime.now().strftime("%Y-%m-%d"),
+        }
+        self.dirty = True
+
+    # Pré-remplir le cache à partir des colonnes Latitude/Longitude d'un CSV existant
+    def warm_from_csv(self, csv_path):
+        if not os.path.exists(csv_path):
+            return 0
+        df = pd.read_csv(csv_path, usecols=["Ville", "Latitude", "Longitude"])
+        df = df.drop_duplicates(subset=["Ville"])
+        added = 0
+        for ville, lat, lon in df.itertuples(index=False):
+            if self.get(ville) is None and pd.notna(lat) and pd.notna(lon):
+                self.put(ville, lat, lon)
+                added += 1
+        return added
+
+    # Supprimer des entrées : par nom et/ou plus anciennes que `older_than_days`
+    def expire(self, villes=None, older_than_days=None):
+        keys = set()
+        if villes:
+            keys.update(normalize_city(ville) for ville in villes)
+        if older_than_days is not None:
+            limit = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
+            keys.update(key for key, entry in self.entries.items() if entry["fetched_at"] < limit)
+        removed = [key for key in keys if self.entries.pop(key, None) is not None]
+        if removed:
+            self.dirty = True
+        return len(removed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gestion du cache de géocodage")
+    parser.add_argument("--warm", metavar="CSV", help="pré-remplir depuis un CSV (ex. final_results.csv)")
+    parser.add_argument("--expire", nargs="+", metavar="VILLE", help="supprimer ces villes du cache")
+    parser.add_argument("--older-than", type=int, metavar="JOURS", help="supprimer les entrées plus anciennes")
+    args = parser.parse_args()
+
+    cache = GeocodeCache().load()
+    if args.warm:
+        print(f"{cache.warm_from_csv(args.warm)} villes ajoutées depuis {args.warm}.")
+    if args.expire or args.older_than is not None:
+        print(f"{cache.expire(args.expire, args.older_than)} entrées supprimées.")
+    cache.save()
+    print(f"{len(cache.entries)} villes en cache, {len(cache.overrides)} corrections manuelles.")
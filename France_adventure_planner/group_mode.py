@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+# Valeur la plus fréquente par groupe, en une seule passe vectorisée (au lieu de lambda x: x.mode()[0],
+# évalué en Python groupe par groupe) :
+#   1. chaque ligne reçoit le numéro de son groupe (ngroup) et le code de sa valeur (catégorie ou factorize trié)
+#   2. np.bincount compte les couples (groupe, code) dans une matrice groupes x codes
+#   3. argmax par ligne de la matrice
+# En cas d'égalité, argmax garde le premier code, c'est-à-dire la plus petite valeur (ou la première catégorie),
+# comme x.mode()[0]. Un groupe sans aucune valeur renseignée donne une valeur manquante.
+
+
+# Série indexée par les clés des groupes, dans l'ordre de df.groupby(by, observed=True).agg(...)
+def grouped_mode(df, by, column):
+    grouper = df.groupby(by, observed=True, sort=True)
+    groups = grouper.ngroup().to_numpy()
+    keys = grouper.size().index
+
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values, sort=True)
+
+    # Lignes sans groupe (clé manquante) ou sans valeur ignorées
+    valid = (groups >= 0) & (codes >= 0)
+    n_groups, n_codes = len(keys), max(len(uniques), 1)
+    counts = np.bincount(
+        groups[valid].astype("int64") * n_codes + codes[valid],
+        minlength=n_groups * n_codes
+    ).reshape(n_groups, n_codes)
+    best = counts.argmax(axis=1)
+    empty = counts[np.arange(n_groups), best] == 0
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        result = pd.Series(pd.Categorical.from_codes(np.where(empty, -1, best), dtype=values.dtype), index=keys)
+    elif len(uniques):
+        result = pd.Series(uniques.take(best), index=keys).astype(values.dtype).where(~empty)
+    else:
+        result = pd.Series(pd.NA, index=keys).astype(values.dtype)
+    return result.rename(column)
@@ -0,0 +1,154 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from storage import atomic_write_json, atomic_write_npy
+from forecast_store import FORECAST_FOLDER, HORIZONS
+from forecast_history import ForecastHistory
+from forecast_decoder import weather_codes, weather_labels
+
+# Historique des prévisions sous forme de cube numérique dense, à côté de la base SQLite :
+#   forecasts/history_cube.json          -> tables de correspondance (villes, coordonnées, dates) et fichier du cube
+#   forecasts/history_cube-{empreinte}.npy -> float32, axes (ville, date cible, horizon, créneau, mesure), NaN = absent
+# Le cube est ouvert en lecture seule avec np.load(mmap_mode="r") par l'étape du workflow qui construit le lot
+# de la page Weather Analysis (analysis_bundle.py) ; la page, elle, ne lit que le lot.
+CUBE_NAME = "history_cube"
+METRICS = ["Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather_Score", "Weather"]
+# "Weather" est stocké comme identifiant de condition OWM (voir forecast_decoder.CONDITIONS)
+# Version du format, comprise dans l'empreinte : un cube d'un ancien format est reconstruit
+CUBE_FORMAT = 2
+
+
+def meta_path(folder=FORECAST_FOLDER):
+    return os.path.join(folder, f"{CUBE_NAME}.json")
+
+
+# Empreinte des fichiers chargés dans la base : le cube est à reconstruire quand elle change
+def sources_fingerprint(history):
+    sources = history.query("SELECT Source, Mtime_Ns, Size FROM sources ORDER BY Source")
+    content = f"{CUBE_FORMAT}\n" + sources.to_csv(index=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+# Moyenne en ignorant les NaN (NaN si aucune valeur, sans avertissement), accumulée en float64
+def nan_mean(values, axis):
+    count = (~np.isnan(values)).sum(axis=axis)
+    total = np.nansum(values, axis=axis, dtype="float64")
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+class HistoryCube:
+    def __init__(self, meta, data):
+        self.meta = meta
+        self.data = data
+        self.fingerprint = meta["fingerprint"]
+        self.cities = np.array(meta["cities"], dtype=object)
+        self.dates = np.array(meta["dates"], dtype=object)
+        self.latitude = np.array(meta["latitude"])
+        self.longitude = np.array(meta["longitude"])
+        self.city_index = {ville: i for i, ville in enumerate(meta["cities"])}
+
+    # Vue (ville, date, horizon, créneau) d'une mesure, éventuellement pour un seul horizon
+    def metric(self, name, horizon=None):
+        values = self.data[..., METRICS.index(name)]
+        if horizon is not None:
+            values = values[:, :, HORIZONS.index(horizon)]
+        return values
+
+    # Libellés météo à partir des identifiants (NaN -> valeur manquante)
+    def weather_labels(self, codes):
+        return weather_labels(codes)
+
+
+# Construire le cube depuis la base SQLite (déjà synchronisée) et l'écrire de façon atomique
+def build_cube(history, folder=FORECAST_FOLDER):
+    fingerprint = sources_fingerprint(history)
+    rows = history.query(f"""
+        SELECT Ville, Latitude, Longitude, Target_Date, Horizon, Slot, Run_Date, {", ".join(METRICS)}
+        FROM forecasts
+        ORDER BY Run_Date
+    """)
+    # Même ville, date, horizon et créneau dans deux fichiers : la dernière exécution l'emporte
+    rows = rows.drop_duplicates(["Ville", "Target_Date", "Horizon", "Slot"], keep="last")
+
+    coords = rows.groupby("Ville")[["Latitude", "Longitude"]].min()
+    cities = coords.index.tolist()
+    if rows.empty:
+        dates = []
+    else:
+        dates = pd.date_range(rows["Target_Date"].min(), rows["Target_Date"].max()).strftime("%Y-%m-%d").tolist()
+    n_slots = int(rows["Slot"].max()) + 1 if not rows.empty else 0
+
+    data = np.full((len(cities), len(dates), len(HORIZONS), n_slots, len(METRICS)), np.nan, dtype="float32")
+    values = rows[METRICS].copy()
+    codes = weather_codes(values["Weather"].fillna("").astype(object)).astype("float32")
+    values["Weather"] = np.where(codes > 0, codes, np.nan)
+    data[
+        rows["Ville"].map({ville: i for i, ville in enumerate(cities)}).to_numpy(),
+        rows["Target_Date"].map({date: i for i, date in enumerate(dates)}).to_numpy(),
+        rows["Horizon"].to_numpy() - HORIZONS[0],
+        rows["Slot"].to_numpy(),
+    ] = values.to_numpy(dtype="float32")
+
+    # Le nom du fichier change avec l'empreinte : un lecteur qui a ouvert l'ancien cube le garde intact
+    data_name = f"{CUBE_NAME}-{fingerprint}.npy"
+    atomic_write_npy(data, os.path.join(folder, data_name))
+    meta = {
+        "fingerprint": fingerprint,
+        "file": data_name,
+        "shape": list(data.shape),
+        "metrics": METRICS,
+        "horizons": list(HORIZONS),
+        "cities": cities,
+        "latitude": coords["Latitude"].tolist(),
+        "longitude": coords["Longitude"].tolist(),
+        "dates": dates,
+    }
+    atomic_write_json(meta, meta_path(folder))
+
+    for path in glob.glob(os.path.join(folder, f"{CUBE_NAME}-*.npy")):
+        if os.path.basename(path) != data_name:
+            os.remove(path)
+    return fingerprint
+
+
+# Ouvrir le cube en lecture seule (None s'il n'a jamais été construit)
+def load_cube(folder=FORECAST_FOLDER):
+    for _ in range(2):
+        if not os.path.exists(meta_path(folder)):
+            return None
+        with open(meta_path(folder), encoding="utf-8") as f:
+            meta = json.load(f)
+        try:
+            data = np.load(os.path.join(folder, meta["file"]), mmap_mode="r")
+        except FileNotFoundError:
+            # Cube remplacé entre la lecture du JSON et celle du fichier : on relit le JSON
+            continue
+        return HistoryCube(meta, data)
+    return None
+
+
+# Synchroniser la base et reconstruire le cube seulement si les fichiers d'archive ont changé ;
+# renvoie l'empreinte du cube à jour (sert de clé de cache côté Streamlit)
+def refresh_cube(folder=FORECAST_FOLDER):
+    history = ForecastHistory(folder)
+    history.sync()
+    fingerprint = sources_fingerprint(history)
+    if os.path.exists(meta_path(folder)):
+        with open(meta_path(folder), encoding="utf-8") as f:
+            if json.load(f)["fingerprint"] == fingerprint:
+                return fingerprint
+    return build_cube(history, folder)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construction du cube mémoire de l'historique des prévisions")
+    parser.add_argument("--folder", default=FORECAST_FOLDER, help="dossier des fichiers d'archive")
+    args = parser.parse_args()
+
+    fingerprint = refresh_cube(args.folder)
+    cube = load_cube(args.folder)
+    print(f"Cube {fingerprint} : {' x '.join(map(str, cube.data.shape))} ({cube.data.nbytes / 1e6:.1f} Mo).")
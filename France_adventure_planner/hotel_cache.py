@@ -0,0 +1,77 @@
+import json
+import os
+from datetime import datetime, timedelta
+from geocode_cache import normalize_city
+from storage import atomic_write_json
+
+# Cache des hôtels scrapés sur Booking (persisté entre les exécutions)
+CACHE_FILE = os.path.join("cache", "hotels.json")
+# Durée de validité d'une liste d'hôtels avant un nouveau passage du spider
+HOTEL_TTL = timedelta(days=7)
+
+
+class HotelCache:
+    def __init__(self, path=CACHE_FILE, ttl=HOTEL_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        self.dirty = False
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        return self
+
+    def save(self):
+        if not self.dirty:
+            return
+        atomic_write_json(self.entries, self.path, ensure_ascii=False, indent=1, sort_keys=True)
+        self.dirty = False
+
+    def entry(self, ville):
+        return self.entries.get(normalize_city(ville))
+
+    # Liste des hôtels en cache (même périmée), ou None si la ville n'a jamais été scrapée
+    def get(self, ville):
+        entry = self.entry(ville)
+        return entry["hotels"] if entry is not None else None
+
+    def is_fresh(self, ville, now=None):
+        entry = self.entry(ville)
+        if entry is None:
+            return False
+        now = now or datetime.now()
+        return now - datetime.fromisoformat(entry["fetched_at"]) < self.ttl
+
+    # Villes à (re)scraper : jamais vues ou plus anciennes que le TTL
+    def stale_cities(self, villes, now=None):
+        return [ville for ville in villes if not self.is_fresh(ville, now)]
+
+    # En-têtes de revalidation conditionnelle pour une ville déjà en cache
+    def conditional_headers(self, ville):
+        entry = self.entry(ville)
+        headers = {}
+        if entry is not None and entry["hotels"]:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, ville, hotels, etag=None, last_modified=None):
+        self.entries[normalize_city(ville)] = {
+            "name": ville,
+            "hotels": hotels,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.dirty = True
+
+    # Réponse 304 : la liste en cache est toujours valable
+    def touch(self, ville):
+        entry = self.entry(ville)
+        if entry is not None:
+            entry["fetched_at"] = datetime.now().isoformat(timespec="seconds")
+            self.dirty = True
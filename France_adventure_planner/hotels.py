@@ -0,0 +1,33 @@
+import pandas as pd
+
+HOTEL_FIELDS = ["Name", "Link", "Note"]
+
+
+# Table des hôtels : une ligne par (ville, rang), construite une fois depuis le spider
+def hotel_table(hotel_results):
+    # Une ville scrapée deux fois : on garde le premier résultat
+    hotels_by_city = {}
+    for result in hotel_results:
+        hotels_by_city.setdefault(result["city"], result["hotels"])
+
+    rows = [
+        {
+            "Ville": ville,
+            "Rank": i + 1,
+            "Name": hotel.get("hotel_name", "N/A"),
+            "Link": hotel.get("link", "N/A"),
+            "Note": hotel.get("note", "N/A"),
+        }
+        for ville, city_hotels in hotels_by_city.items()
+        for i, hotel in enumerate(city_hotels)
+    ]
+    return pd.DataFrame(rows, columns=["Ville", "Rank"] + HOTEL_FIELDS)
+
+
+# Une ligne par ville (clé `key`) avec les colonnes Hotel_{i}_Name / Hotel_{i}_Link / Hotel_{i}_Note
+def hotels_wide(hotels, key="Ville"):
+    wide = hotels.pivot(index=key, columns="Rank", values=HOTEL_FIELDS)
+    ranks = sorted(hotels["Rank"].unique())
+    wide = wide.reindex(columns=[(field, rank) for rank in ranks for field in HOTEL_FIELDS])
+    wide.columns = [f"Hotel_{rank}_{field}" for field, rank in wide.columns]
+    return wide
@@ -0,0 +1,152 @@
+import asyncio
+import random
+import time
+import requests
+
+# URL API Nominatim (OpenStreetMap) pour récupérer les coordonnées
+nominatim_url = "https://nominatim.openstreetmap.org/search"
+# URL API OpenWeatherMap (prévisions 5 jours / 3 heures)
+weather_url = "https://api.openweathermap.org/data/2.5/forecast"
+
+# Limites des API
+# Nominatim : 1 requête par seconde maximum
+NOMINATIM_RATE = 1.0
+NOMINATIM_BURST = 1
+# OpenWeatherMap (offre gratuite) : 60 appels par minute, sur n'importe quelle fenêtre de 60 s
+# (pas de rafale : un seau plein en plus de la recharge permettrait près de 120 appels la première minute)
+OWM_RATE = 60 / 60
+OWM_BURST = 1
+# Nombre maximum de villes traitées en parallèle
+MAX_CONCURRENCY = 8
+# Timeout des requêtes HTTP (secondes)
+REQUEST_TIMEOUT = 30
+# Nouvelles tentatives : erreurs réseau, 429 et 5xx, délai exponentiel avec jitter
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Ville introuvable (Nominatim ne renvoie rien, OpenWeatherMap répond 404) : échec définitif,
+# à ne pas confondre avec une erreur passagère (réseau, 429, 5xx) que --resume peut réessayer
+NOT_FOUND = "not_found"
+
+
+# Limiteur de débit "token bucket" pour un service
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Le verrou garde les appels dans l'ordre d'arrivée
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Remplacer les API par un serveur de rejeu local (bench/replay_server.py), mêmes chemins sous `base_url`
+def use_api_base(base_url):
+    global nominatim_url, weather_url
+    nominatim_url = f"{base_url}/nominatim/search"
+    weather_url = f"{base_url}/owm/data/2.5/forecast"
+
+
+# Délai avant la tentative n° `attempt` (0, 1, 2...) : "full jitter" sur un plafond exponentiel
+def backoff_delay(attempt):
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+# Requête GET bloquante exécutée dans un thread après avoir obtenu un jeton
+# Renvoie la dernière réponse, ou None si toutes les tentatives ont échoué sur une erreur réseau
+async def limited_get(bucket, url, **kwargs):
+    response = None
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(backoff_delay(attempt - 1))
+        await bucket.acquire()
+        try:
+            response = await asyncio.to_thread(requests.get, url, timeout=REQUEST_TIMEOUT, **kwargs)
+        except requests.RequestException as e:
+            print(f"Erreur réseau sur {url} (tentative {attempt + 1}) : {e}")
+            response = None
+            continue
+        if response.status_code not in RETRY_STATUSES:
+            return response
+        print(f"Réponse {response.status_code} de {url} (tentative {attempt + 1})")
+    return response
+
+
+# Coordonnées via Nominatim ; NOT_FOUND si la ville est introuvable, None si la requête a échoué
+async def geocode(ville, nominatim_bucket):
+    params = {"city": ville, "country": "France", "format": "json", "limit": 1}
+    headers = {"User-Agent": "NotNecessary"}
+    r = await limited_get(nominatim_bucket, nominatim_url, params=params, headers=headers)
+    if r is None or r.status_code != 200:
+        print(f"Géocodage impossible pour {ville}.")
+        return None
+    data = r.json()
+    if not data:
+        print(f"Ville introuvable sur Nominatim : {ville}.")
+        return NOT_FOUND
+    return data[0]["lat"], data[0]["lon"]
+
+
+# Coordonnées (cache puis Nominatim) puis météo pour une ville
+async def fetch_city(ville, api_key, semaphore, nominatim_bucket, owm_bucket, geocodes, on_result, on_not_found):
+    async with semaphore:
+        coords = geocodes.get(ville) if geocodes is not None else None
+        if coords is None:
+            coords = await geocode(ville, nominatim_bucket)
+            if coords is None:
+                return None
+            if coords == NOT_FOUND:
+                if on_not_found is not None:
+                    on_not_found(ville)
+                return None
+            if geocodes is not None:
+                geocodes.put(ville, *coords)
+
+        lat, lon = coords
+        weather_params = {"lat": lat, "lon": lon, "units": "metric", "appid": api_key}
+        weather_r = await limited_get(owm_bucket, weather_url, params=weather_params)
+        if weather_r is not None and weather_r.status_code == 404:
+            print(f"Météo introuvable pour {ville}.")
+            if on_not_found is not None:
+                on_not_found(ville)
+            return None
+        if weather_r is None or weather_r.status_code != 200:
+            print(f"Météo indisponible pour {ville}.")
+            return None
+        result = ville, lat, lon, weather_r.json()
+        if on_result is not None:
+            on_result(result)
+        return result
+
+
+async def fetch_forecasts_async(villes, api_key, geocodes=None, on_result=None, concurrency=None, on_not_found=None):
+    semaphore = asyncio.Semaphore(concurrency or MAX_CONCURRENCY)
+    nominatim_bucket = TokenBucket(NOMINATIM_RATE, NOMINATIM_BURST)
+    owm_bucket = TokenBucket(OWM_RATE, OWM_BURST)
+    tasks = [
+        fetch_city(ville, api_key, semaphore, nominatim_bucket, owm_bucket, geocodes, on_result, on_not_found)
+        for ville in villes
+    ]
+    # gather conserve l'ordre de la liste des villes
+    results = await asyncio.gather(*tasks)
+    return [result for result in results if result is not None]
+
+
+# Renvoie (ville, lat, lon, weather_data) pour chaque ville, dans l'ordre de `villes`
+# `geocodes` (GeocodeCache) évite de redemander à Nominatim les villes déjà connues
+# `on_result` est appelé dès qu'une ville est récupérée (point de reprise),
+# `on_not_found` pour une ville introuvable (échec définitif, pas de nouvelle tentative)
+def fetch_forecasts(villes, api_key, geocodes=None, on_result=None, concurrency=None, on_not_found=None):
+    return asyncio.run(fetch_forecasts_async(villes, api_key, geocodes, on_result, concurrency, on_not_found))
@@ -1,11 +1,14 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-
+from data_access import load_results
+from group_mode import grouped_mode
 
 
 def load_data():
-    df = pd.read_csv("final_results.csv")
+    df = load_results(columns=[
+        "Ville", "Latitude", "Longitude", "Date", "Hour", "Day_Time",
+        "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather"
+    ])
     return df
 
 # Affiche l'image
@@ -32,14 +35,14 @@ df = load_data()
 
 
 # Regrouper les Data
-df_agg = df.groupby(["Ville", "Date", "Day_Time"], as_index=False).agg({
+df_agg = df.groupby(["Ville", "Date", "Day_Time"], as_index=False, observed=True).agg({
     "Temp_Max": "mean",
     "Temp_Min": "mean",
     "Temp_Avg": "mean",
     "Humidity": "mean",
     "Rain_Probability": "mean",
-    "Weather": lambda x: x.mode()[0]
 })
+df_agg["Weather"] = grouped_mode(df, ["Ville", "Date", "Day_Time"], "Weather").to_numpy()
 
 # Arrondir
 df_agg["Temp_Max"] = df_agg["Temp_Max"].round(1)
@@ -49,7 +52,7 @@ df_agg["Humidity"] = df_agg["Humidity"].round(1)
 df_agg["Rain_Probability"] = df_agg["Rain_Probability"].round(1)
 
 # ajouter une colonne Date_Hour
-df["Date_Hour"] = df["Date"] + " " + df["Hour"].astype(str) + ":00"
+df["Date_Hour"] = df["Date"].dt.strftime("%Y-%m-%d") + " " + df["Hour"].astype(str) + ":00"
 
 # Section : À Propos du Projet
 st.markdown("## The Project")
@@ -70,12 +73,12 @@ min_temp = df["Temp_Min"].min()
 max_temp = df["Temp_Max"].max()
 
 # Carte
-fig = px.density_mapbox(
+fig = px.density_map(
     df,
     lat="Latitude",
     lon="Longitude",
     z="Temp_Avg",
-    mapbox_style="open-street-map",
+    map_style="open-street-map",
     animation_frame="Date_Hour",
     zoom=3.5,
     radius=4,
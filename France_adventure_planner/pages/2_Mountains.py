@@ -1,198 +1,89 @@
+import json
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-
-
-# Fonction pour charger les données
-#@st.cache_data
-def load_and_prepare_data(): 
-    df = pd.read_csv("final_results.csv")
-    
-    # Agréger les données
-    df_agg = df.groupby(["Ville", "Date", "Latitude", "Longitude"], as_index=False).agg({
-        "Temp_Max": "max",
-        "Temp_Min": "min",
-        "Temp_Avg": "mean",
-        "Humidity": "mean",
-        "Rain_Probability": "mean",
-        "Weather": lambda x: x.mode()[0]
-    })
-    
-    # Arrondir
-    df_agg["Temp_Max"] = df_agg["Temp_Max"].round(1)
-    df_agg["Temp_Min"] = df_agg["Temp_Min"].round(1)
-    df_agg["Temp_Avg"] = df_agg["Temp_Avg"].round(1)
-    df_agg["Humidity"] = df_agg["Humidity"].round(1)
-    df_agg["Rain_Probability"] = df_agg["Rain_Probability"].round(2)
-    
-    return df
-
-# Charger les données
-df = load_and_prepare_data()
-
-# Exemple de treks
-treks = {
-    "Northern Alps (Mont-Blanc)": ["Chamonix", "Les Houches", 
-                                   "Saint-Gervais-les-Bains", "Servoz", "Vallorcine", 
-                                   "Argentière", "Combloux", "Megève", 
-                                   "Les Contamines-Montjoie", "Cordon", "Domancy", 
-                                   "Demi-Quartier", "Praz-sur-Arly", 
-                                   "Sixt-Fer-à-Cheval"],
-    "Central Alps (Vanoise, Écrins, Beaufortain)": ["Bourg d'Oisans", "Le Périer", 
-                                                        "La Chapelle-en-Valgaudémar", "Vallouise", 
-                                                        "Ailefroide", "Monêtier-les-Bains", "La Grave", 
-                                                        "Saint-Christophe-en-Oisans", "Val-d'Isère", 
-                                                        "Tignes", "Pralognan-la-Vanoise", "Termignon", 
-                                                        "Modane", "Bonneval-sur-Arc", "Aussois", 
-                                                        "Lanslebourg-Mont-Cenis", "Bessans", #"Beaufort", 
-                                                        "Arêches", "Les Saisies", "Hauteluce", 
-                                                        "Villard-sur-Doron", "Queige", 
-                                                        "Saint-Pierre-de-Chartreuse", "Grenoble", 
-                                                        "Le Sappey-en-Chartreuse", "Saint-Laurent-du-Pont", 
-                                                        "Entremont-le-Vieux"],
-    "Southern Alps (Écrins, Queyras, Mercantour)": ["Saint-Martin-Vésubie", "Isola", "Barcelonnette", 
-                                                   "Tende", "Valdeblore", "La Brigue", "Breil-sur-Roya", 
-                                                   "Rimplas", "Saint-Véran", "Abriès", "Ceillac", "Guillestre", 
-                                                   "Molines-en-Queyras", "Château-Ville-Vieille", "Aiguilles", 
-                                                   "Saint-Jean-de-Maurienne", "Valloire", "Lanslebourg-Mont-Cenis", 
-                                                   "Termignon", "Albiez-Montrond", "Aussois", "Bessans", 
-                                                   "Saint-Sorlin-d'Arves", "Saint-Colomban-des-Villards"],
-    "Western Pyrenees": ["Gourette", "Eaux-Bonnes", "Artouste", "Arudy", 
-                                      "Oloron-Sainte-Marie"],
-    "Central Pyrenees": ["Saint-Lary-Soulan", "Luz-Saint-Sauveur", "Cauterets", 
-                           "Gavarnie", "Barèges", "Bagnères-de-Bigorre", 
-                           "Piau-Engaly", "Campan", "Les Angles", "Portet-d'Aspet",
-                           "Luchon (Bagnères-de-Luchon)", "Peyragudes"],
-    "Eastern Pyrenees": ["Font-Romeu", "Mont-Louis", 
-                                  "Villefranche-de-Conflent", "Ax-les-Thermes",
-                                  "Prats-de-Mollo-la-Preste"],
-    "Jura": ["Les Rousses", "Morbier", "Saint-Claude", "Lons-le-Saunier", 
-             "Arbois", "Baume-les-Messieurs", "Salins-les-Bains", "Métabief", 
-             "Clairvaux-les-Lacs", "Lamoura", "Château-Chalon", "Nantua"]
-}
+from cities import TREKS, CITY_NAMES, select_cities
+from data_access import load_results, load_dimension, load_day_time_tables, load_region_map
+
+
+# Colonnes lues par la page (agrégat par ville et par jour, calculé par le script quotidien)
+PAGE_COLUMNS = [
+    "City_Id", "Ville", "Latitude", "Longitude", "Date",
+    "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather"
+]
+
+# Fonction pour charger les données (cache partagé par toutes les sessions, voir data_access)
+def load_and_prepare_data(city_ids):
+    # Agrégats déjà calculés et arrondis : seules les villes utiles sont lues, rien à regrouper
+    return load_results(columns=PAGE_COLUMNS, city_ids=city_ids, table="daily")
 
 # Titre
 st.markdown("# Trek & Mountains")
 st.markdown("### Select a known trek/hike destination and explore its weather forecasts and nearby accommodations.")
 
 # Sélection de l'itinéraire
-chosen_trek = st.selectbox("Choose a Destination :", list(treks.keys()))
+chosen_trek = st.selectbox("Choose a Destination :", list(TREKS.keys()))
 
 # Sélectionner les villes associées à cet itinéraire
-selected_cities = treks[chosen_trek]
+selected_ids = TREKS[chosen_trek]
+selected_cities = [CITY_NAMES[city_id] for city_id in selected_ids]
+
+# Charger les données des villes sélectionnées
+df = load_and_prepare_data(selected_ids)
 st.markdown(f"## Forecast for the itinerary **{chosen_trek}**")
 st.markdown(f"Cities Involved    : {', '.join(selected_cities)}")
 
 # Filtrer les données pour les villes sélectionnées
-df_filtered = df[df["Ville"].isin(selected_cities)]
+df_filtered = select_cities(df, selected_ids)
 
-# Carte
+# Carte (précalculée par le script quotidien : un point par ville et par jour, voir region_maps)
 if not df_filtered.empty:
-        
-    # Centrer la carte sur les coordonnées
-    center_lat = df_filtered["Latitude"].mean()
-    center_lon = df_filtered["Longitude"].mean()
-    # Calculer les valeurs min et max de Temp_Avg pour toute la dataset
-    min_temp = df["Temp_Avg"].min()
-    max_temp = df["Temp_Avg"].max()
-    
-    # Carte
-    fig = px.density_mapbox(
-        df_filtered,
-        lat="Latitude",
-        lon="Longitude",
-        hover_name="Ville",
-        mapbox_style="open-street-map",
-        animation_frame="Date",
-        z="Temp_Avg",
-        zoom=6,  
-        radius=7,
-        center={"lat": center_lat, "lon": center_lon},
-        color_continuous_scale="Plasma",
-        range_color=[min_temp, max_temp],
-        hover_data=["Humidity", "Weather"]
-    )
-    
+    fig = json.loads(load_region_map("treks", chosen_trek, df_filtered))
     st.plotly_chart(fig, use_container_width=True)
 
-# Titre
-st.title("Explore Weather and Links 🏙️🚆")
-# Filtrer les villes en fonction du trek
-selected_cities = treks[chosen_trek]
-
-# Bouton pour afficher les informations d'une ville
-selected_city = st.selectbox("Choose a city :", selected_cities)
-
-# Filtrer les données pour la ville sélectionnée
-city_data = df[df["Ville"] == selected_city]
-if not city_data.empty:
-    # Regrouper les données par jour
-    city_grouped = city_data.groupby(["Date"], as_index=False).agg({
-        "Temp_Max": "max",
-        "Temp_Min": "min", 
-        "Temp_Avg": "mean",  
-        "Humidity": "mean",
-        "Rain_Probability": "max",
-        "Weather": lambda x: x.mode()[0]
-    })
-
-    # Arrondir
-    city_grouped["Temp_Max"] = city_grouped["Temp_Max"].round(1)
-    city_grouped["Temp_Min"] = city_grouped["Temp_Min"].round(1)
-    city_grouped["Temp_Avg"] = city_grouped["Temp_Avg"].round(1)
-    city_grouped["Humidity"] = city_grouped["Humidity"].round(1)
-    city_grouped["Rain_Probability"] = city_grouped["Rain_Probability"].round(2)
-
-    # Afficher tableau
-    st.markdown(f"### Forecast for **{selected_city}**")
-    st.dataframe(city_grouped[[
-        "Date", "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather"
-    ]])
-
-    # Afficher le lien du train
-    train_link = city_data.iloc[0]["Train"]
-    st.markdown(f"[🚄 See Trains for {selected_city}]({train_link})", unsafe_allow_html=True)
-
-    # Afficher les hôtels
-    st.markdown(f"#### Hotels in {selected_city}")
-    for i in range(1, 6):
-        hotel_name_col = f"Hotel_{i}_Name"
-        hotel_link_col = f"Hotel_{i}_Link"
-
-        if hotel_name_col in city_data.columns and hotel_link_col in city_data.columns:
-            hotel_name = city_data[hotel_name_col].iloc[0]
-            hotel_link = city_data[hotel_link_col].iloc[0]
-
+# Ville choisie (tableau, train, hôtels) en fragment : changer de ville ne relance que cette section,
+# pas la lecture des données ni la carte de la région
+@st.fragment
+def city_details(df, selected_ids):
+    # Titre
+    st.title("Explore Weather and Links 🏙️🚆")
+    # Bouton pour afficher les informations d'une ville
+    selected_city_id = st.selectbox("Choose a city :", selected_ids, format_func=CITY_NAMES.get)
+    selected_city = CITY_NAMES[selected_city_id]
+
+    # Filtrer les données pour la ville sélectionnée
+    city_data = df[df["City_Id"] == selected_city_id]
+    if not city_data.empty:
+        # Une ligne par jour, déjà agrégée et arrondie
+        city_grouped = city_data.assign(Date=city_data["Date"].dt.date)
+
+        # Afficher tableau
+        st.markdown(f"### Forecast for **{selected_city}**")
+        st.dataframe(city_grouped[[
+            "Date", "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather"
+        ]])
+
+        # Afficher le lien du train
+        train_link = load_dimension("links", [selected_city_id])["Train"].iloc[0]
+        st.markdown(f"[🚄 See Trains for {selected_city}]({train_link})", unsafe_allow_html=True)
+
+        # Afficher les hôtels
+        st.markdown(f"#### Hotels in {selected_city}")
+        city_hotels = load_dimension("hotels", [selected_city_id]).sort_values("Rank")
+        for hotel_name, hotel_link in zip(city_hotels["Name"], city_hotels["Link"]):
             if pd.notna(hotel_name) and pd.notna(hotel_link):
                 st.markdown(f"- [{hotel_name}]({hotel_link})")
-else:
-    st.markdown(f"No data available for **{selected_city}**.")
+    else:
+        st.markdown(f"No data available for **{selected_city}**.")
+
+
+city_details(df, selected_ids)
 
 st.markdown("## Daily Weather Highlights by City")
-for city in selected_cities:
-    city_data = df_filtered[df_filtered["Ville"] == city]
-    if not city_data.empty:
-        # Regrouper par Date et Day_Time
-        grouped_data = df_filtered.groupby(["Date", "Day_Time"], as_index=False).agg({
-        "Weather": lambda x: x.mode()[0]  
-        })
-
-        # Avoir "Day_Time" comme colonnes
-        pivot_table = grouped_data.pivot(index="Date", columns="Day_Time", values="Weather")
-
-        # Réorganiser les colonnes dans l'ordre
-        desired_order = ["Morning", "Afternoon", "Evening", "Night"]
-        pivot_table = pivot_table.reindex(columns=desired_order)
-        
+# Météo dominante par moment de la journée : un tableau par ville de la région, calculés en une passe et en cache
+day_time_tables = load_day_time_tables(selected_ids)
+for city_id in selected_ids:
+    pivot_table = day_time_tables.get(city_id)
+    if pivot_table is not None and not pivot_table.empty:
         # Afficher
-        st.markdown(f"### **{city}**")
+        st.markdown(f"### **{CITY_NAMES[city_id]}**")
         st.dataframe(pivot_table)
-
-# Regrouper
-grouped_data = df_filtered.groupby(["Date", "Day_Time"], as_index=False).agg({
-    "Weather": lambda x: x.mode()[0]  # Météo la plus fréquente pour chaque période
-})
-
-# Avoir "Day_Time" comme colonnes
-pivot_table = grouped_data.pivot(index="Date", columns="Day_Time", values="Weather")
-
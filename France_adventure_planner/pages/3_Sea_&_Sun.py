@@ -1,182 +1,89 @@
+import json
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-
-
-# Fonction pour charger les données
-#@st.cache_data
-def load_and_prepare_data():
-    df = pd.read_csv("final_results.csv")
-    
-    # Agréger les données
-    df_agg = df.groupby(["Ville", "Date", "Latitude", "Longitude"], as_index=False).agg({
-        "Temp_Max": "max",
-        "Temp_Min": "min",
-        "Temp_Avg": "mean",
-        "Humidity": "mean",
-        "Rain_Probability": "mean",
-        "Weather": lambda x: x.mode()[0]
-    })
-    
-    # Arrondir
-    df_agg["Temp_Max"] = df_agg["Temp_Max"].round(1)
-    df_agg["Temp_Min"] = df_agg["Temp_Min"].round(1)
-    df_agg["Temp_Avg"] = df_agg["Temp_Avg"].round(1)
-    df_agg["Humidity"] = df_agg["Humidity"].round(1)
-    df_agg["Rain_Probability"] = df_agg["Rain_Probability"].round(2)
-    
-    return df
-
-# Charger les données
-df = load_and_prepare_data()
-
-regions = {
-    "Mediterranean Coast": ["Nice", "Cannes", "Antibes", "Saint-Tropez", "Menton", 
-                            "Juan-les-Pins", "Marseille", "Cassis", "Bandol", 
-                            "Hyères", "Sanary-sur-Mer", "Montpellier", "Sète", 
-                            "Agde", "Cap d’Agde", "Gruissan", "Narbonne", 
-                            "Palavas-les-Flots", "Collioure", "Port-Vendres", 
-                            "Banyuls-sur-Mer", "Argelès-sur-Mer"],
-    "Atlantic Coast": ["Hendaye", "Saint-Jean-de-Luz", "Biarritz", "Anglet", 
-                       "Bayonne", "Hossegor", "Capbreton", "Seignosse", 
-                       "Biscarrosse", "Mimizan", "Arcachon", "Lège-Cap-Ferret", 
-                       "Lacanau", "Soulac-sur-Mer", "Les Sables-d'Olonne", 
-                       "Saint-Jean-de-Monts", "Saint-Gilles-Croix-de-Vie", 
-                       "La Tranche-sur-Mer", "Île de Noirmoutier", "Île d'Yeu", 
-                       "La Rochelle", "Île de Ré", "Île d'Oléron", "Royan", 
-                       "Châtelaillon-Plage", "Rochefort"],
-    "Bretagne/Normandie": ["Vannes", "Lorient", "Carnac", "Quiberon", "La Baule", 
-                           "Pornic", "Saint-Nazaire", "Pornic", "Préfailles", 
-                           "Saint-Brévin-les-Pins", "Saint-Malo", "Dinard", 
-                           "Cancale", "Deauville", "Trouville-sur-Mer", "Cabourg", 
-                           "Honfleur", "Étretat", "Fécamp", "Dieppe", "Le Havre"], 
-    "English Channel Coast": ["Calais", "Boulogne-sur-Mer", "Wimereux", "Wissant", 
-                              "Le Touquet", "Berck-sur-Mer", "Saint-Valery-sur-Somme", 
-                              "Le Crotoy", "Cayeux-sur-Mer", "Mers-les-Bains"]
-}
+from cities import COASTS, CITY_NAMES, select_cities
+from data_access import load_results, load_dimension, load_day_time_tables, load_region_map
+
+
+# Colonnes lues par la page (agrégat par ville et par jour, calculé par le script quotidien)
+PAGE_COLUMNS = [
+    "City_Id", "Ville", "Latitude", "Longitude", "Date",
+    "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather"
+]
+
+# Fonction pour charger les données (cache partagé par toutes les sessions, voir data_access)
+def load_and_prepare_data(city_ids):
+    # Agrégats déjà calculés et arrondis : seules les villes utiles sont lues, rien à regrouper
+    return load_results(columns=PAGE_COLUMNS, city_ids=city_ids, table="daily")
 
 # Titre
 st.markdown("# Sea & Sun")
 st.markdown("### Choose a coastal region and see weather forecasts and hotel suggestions for famous beach destinations.")
 
 # Sélection de l'itinéraire
-chosen_region = st.selectbox("Choose a Coastal Region", list(regions.keys()))
+chosen_region = st.selectbox("Choose a Coastal Region", list(COASTS.keys()))
 
 # Sélectionner les villes associées
-selected_cities = regions[chosen_region]
+selected_ids = COASTS[chosen_region]
+selected_cities = [CITY_NAMES[city_id] for city_id in selected_ids]
+
+# Charger les données des villes sélectionnées
+df = load_and_prepare_data(selected_ids)
 st.markdown(f"## Forecast for the itinerary **{chosen_region}**")
 st.markdown(f"Cities Involved: {', '.join(selected_cities)}")
 
 # Filtrer les données pour les villes sélectionnées
-df_filtered = df[df["Ville"].isin(selected_cities)]
+df_filtered = select_cities(df, selected_ids)
 
-# Carte
+# Carte (précalculée par le script quotidien : un point par ville et par jour, voir region_maps)
 if not df_filtered.empty:
-        
-    # Centrer la carte
-    center_lat = df_filtered["Latitude"].mean()
-    center_lon = df_filtered["Longitude"].mean()
-    # Calculer les valeurs min et max de Temp_Avg pour toute la dataset
-    min_temp = df["Temp_Avg"].min()
-    max_temp = df["Temp_Avg"].max()
-
-    # Carte
-    fig = px.density_mapbox(
-        df_filtered,
-        lat="Latitude",
-        lon="Longitude",
-        hover_name="Ville",
-        mapbox_style="open-street-map",
-        animation_frame="Date",
-        z="Temp_Avg",
-        zoom=5,
-        radius=7,
-        center={"lat": center_lat, "lon": center_lon},
-        color_continuous_scale="Plasma",
-        range_color=[min_temp, max_temp],
-        hover_data=["Humidity", "Weather"]
-    )
-    
+    fig = json.loads(load_region_map("coasts", chosen_region, df_filtered))
     st.plotly_chart(fig, use_container_width=True)
 
-# Titre
-st.title("Explore Weather and Links 🏙️🚆")
-# Filtrer les villes en fonction de la région
-selected_cities = regions[chosen_region]
-
-# Bouton pour afficher les informations d'une seule ville
-selected_city = st.selectbox("Choose a city :", selected_cities)
-
-# Filtrer les données pour la ville sélectionnée
-city_data = df[df["Ville"] == selected_city]
-if not city_data.empty:
-    # Regrouper les données
-    city_grouped = city_data.groupby(["Date"], as_index=False).agg({
-        "Temp_Max": "max",
-        "Temp_Min": "min", 
-        "Temp_Avg": "mean", 
-        "Humidity": "mean",
-        "Rain_Probability": "max",
-        "Weather": lambda x: x.mode()[0]  
-    })
-
-    # Arrondir 
-    city_grouped["Temp_Max"] = city_grouped["Temp_Max"].round(1)
-    city_grouped["Temp_Min"] = city_grouped["Temp_Min"].round(1)
-    city_grouped["Temp_Avg"] = city_grouped["Temp_Avg"].round(1)
-    city_grouped["Humidity"] = city_grouped["Humidity"].round(1)
-    city_grouped["Rain_Probability"] = city_grouped["Rain_Probability"].round(2)
-
-    # Afficher les prévisions météo
-    st.markdown(f"### Forecast for **{selected_city}**")
-    st.dataframe(city_grouped[[
-        "Date", "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather"
-    ]])
-
-    # Afficher les trains
-    train_link = city_data.iloc[0]["Train"]
-    st.markdown(f"[🚄 See Trains for {selected_city}]({train_link})", unsafe_allow_html=True)
-
-    # Afficher les hôtels
-    st.markdown(f"#### Hotels in {selected_city}")
-    for i in range(1, 6):
-        hotel_name_col = f"Hotel_{i}_Name"
-        hotel_link_col = f"Hotel_{i}_Link"
-
-        if hotel_name_col in city_data.columns and hotel_link_col in city_data.columns:
-            hotel_name = city_data[hotel_name_col].iloc[0]
-            hotel_link = city_data[hotel_link_col].iloc[0]
-
+# Ville choisie (tableau, train, hôtels) en fragment : changer de ville ne relance que cette section,
+# pas la lecture des données ni la carte de la région
+@st.fragment
+def city_details(df, selected_ids):
+    # Titre
+    st.title("Explore Weather and Links 🏙️🚆")
+    # Bouton pour afficher les informations d'une seule ville
+    selected_city_id = st.selectbox("Choose a city :", selected_ids, format_func=CITY_NAMES.get)
+    selected_city = CITY_NAMES[selected_city_id]
+
+    # Filtrer les données pour la ville sélectionnée
+    city_data = df[df["City_Id"] == selected_city_id]
+    if not city_data.empty:
+        # Une ligne par jour, déjà agrégée et arrondie
+        city_grouped = city_data.assign(Date=city_data["Date"].dt.date)
+
+        # Afficher les prévisions météo
+        st.markdown(f"### Forecast for **{selected_city}**")
+        st.dataframe(city_grouped[[
+            "Date", "Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather"
+        ]])
+
+        # Afficher les trains
+        train_link = load_dimension("links", [selected_city_id])["Train"].iloc[0]
+        st.markdown(f"[🚄 See Trains for {selected_city}]({train_link})", unsafe_allow_html=True)
+
+        # Afficher les hôtels
+        st.markdown(f"#### Hotels in {selected_city}")
+        city_hotels = load_dimension("hotels", [selected_city_id]).sort_values("Rank")
+        for hotel_name, hotel_link in zip(city_hotels["Name"], city_hotels["Link"]):
             if pd.notna(hotel_name) and pd.notna(hotel_link):
                 st.markdown(f"- [{hotel_name}]({hotel_link})")
-else:
-    st.markdown(f"No data available for **{selected_city}**.")
+    else:
+        st.markdown(f"No data available for **{selected_city}**.")
 
-st.markdown("## Daily Weather Highlights by City")
-for city in selected_cities:
-    city_data = df_filtered[df_filtered["Ville"] == city]
-    if not city_data.empty:
-        # Regrouper 
-        grouped_data = df_filtered.groupby(["Date", "Day_Time"], as_index=False).agg({
-        "Weather": lambda x: x.mode()[0] 
-        })
-
-        # Avoir "Day_Time" comme colonnes
-        pivot_table = grouped_data.pivot(index="Date", columns="Day_Time", values="Weather")
-
-        # Réorganiser les colonnes dans l'ordre 
-        desired_order = ["Morning", "Afternoon", "Evening", "Night"]
-        pivot_table = pivot_table.reindex(columns=desired_order)
-                  
-        # Afficher 
-        st.markdown(f"### **{city}**")
-        st.dataframe(pivot_table)
 
-# Regrouper 
-grouped_data = df_filtered.groupby(["Date", "Day_Time"], as_index=False).agg({
-    "Weather": lambda x: x.mode()[0] 
-})
-
-# Avoir "Day_Time" comme colonnes
-pivot_table = grouped_data.pivot(index="Date", columns="Day_Time", values="Weather")
+city_details(df, selected_ids)
 
+st.markdown("## Daily Weather Highlights by City")
+# Météo dominante par moment de la journée : un tableau par ville de la région, calculés en une passe et en cache
+day_time_tables = load_day_time_tables(selected_ids)
+for city_id in selected_ids:
+    pivot_table = day_time_tables.get(city_id)
+    if pivot_table is not None and not pivot_table.empty:
+        # Afficher
+        st.markdown(f"### **{CITY_NAMES[city_id]}**")
+        st.dataframe(pivot_table)
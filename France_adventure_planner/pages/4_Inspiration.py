@@ -2,11 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import random
+from data_access import load_results, join_dimensions
+from group_mode import grouped_mode
 
 
 # Fonction pour charger et préparer les données
 def load_data():
-    return pd.read_csv("final_results.csv")
+    return load_results(columns=[
+        "City_Id", "Ville", "Latitude", "Longitude", "Date", "Temp_Avg", "Weather", "Rain_Probability",
+        "Weather_Score"
+    ])
 
 # Charger les données
 df = load_data()
@@ -57,6 +62,8 @@ if method == "Filter by Preferences":
 
     if not best_cities_per_day.empty:
         st.markdown("### Top Recommendations Based on Your Preferences")
+        # Lien hôtel et lien SNCF des villes retenues uniquement
+        best_cities_per_day = join_dimensions(best_cities_per_day, ["Hotel_1_Link", "Train"])
 
         # liens cliquables pour l'hôtel
         def safe_hotel_link(row):
@@ -82,13 +89,13 @@ if method == "Filter by Preferences":
 
         # Carte
         st.markdown("### Explore on the Map")
-        fig = px.scatter_mapbox(
+        fig = px.scatter_map(
             best_cities_per_day,
             lat="Latitude",
             lon="Longitude",
             hover_name="Ville",
             hover_data=["Temp_Avg", "Weather", "Rain_Probability"],
-            mapbox_style="open-street-map",
+            map_style="open-street-map",
             zoom=4
         )
         # Agrandir les points 
@@ -109,20 +116,20 @@ elif method == "City with Best Weather Score and Temperature":
     
     # Regrouper les données par Ville et Date
     daily_city_data = (
-        df.groupby(["Ville", "Date"], as_index=False)
+        df.groupby(["Ville", "Date"], as_index=False, observed=True)
         .agg({
             "Weather_Score": "sum",
             "Temp_Avg": "mean",
             "Rain_Probability": "mean",
-            "Weather": lambda x: x.mode()[0],  # météo la plus fréquente
             "Latitude": "first",
             "Longitude": "first",
-            "Hotel_1_Link": "first",
-            "Train": "first"
+            "City_Id": "first"
         })
+        # météo la plus fréquente
+        .assign(Weather=grouped_mode(df, ["Ville", "Date"], "Weather").to_numpy())
 )
-    best_city = daily_city_data.sort_values(
-        by=["Weather_Score", "Temp_Avg"], ascending= [False, False]).iloc[0]
+    best_city = join_dimensions(daily_city_data.sort_values(
+        by=["Weather_Score", "Temp_Avg"], ascending= [False, False]).head(1), ["Hotel_1_Link", "Train"]).iloc[0]
 
     # Vérifier si le lien d'hôtel existe
     hotel_link = (
@@ -134,21 +141,21 @@ elif method == "City with Best Weather Score and Temperature":
     # Créer l'affichage avec ou sans le lien hôtel
     st.markdown(f"### Best Destination: **{best_city['Ville']}**")
     st.markdown(f"""
-    - **Date**: {best_city['Date']}
-    - **Average Temperature**: {best_city['Temp_Avg']}°C
+    - **Date**: {best_city['Date']:%Y-%m-%d}
+    - **Average Temperature**: {best_city['Temp_Avg']:.2f}°C
     - **Weather**: {best_city['Weather']}
-    - **Rain Probability**: {best_city['Rain_Probability']}%
+    - **Rain Probability**: {best_city['Rain_Probability']:.2f}%
     - **Hotel**: {'[Book it!](' + hotel_link + ')' if hotel_link else 'No hotel available'}
     - **Train**: [Let's Go!]({best_city['Train']})
     """)
 
     # Carte
-    fig = px.scatter_mapbox(
+    fig = px.scatter_map(
         pd.DataFrame([best_city]),
         lat="Latitude",
         lon="Longitude",
         hover_name="Ville",
-        mapbox_style="open-street-map",
+        map_style="open-street-map",
         zoom=6,
     )
     # Agrandir les points
@@ -163,6 +170,7 @@ elif method == "Random City":
 
     # Regrouper par jour pour afficher une ligne par jour
     city_grouped_by_day = city_data.groupby("Date").first().reset_index()
+    city_grouped_by_day = join_dimensions(city_grouped_by_day, ["Hotel_1_Link", "Train"])
 
     # liens cliquables pour l'hôtel
     def safe_hotel_link(row):
@@ -191,12 +199,12 @@ elif method == "Random City":
 
     # Carte
     st.markdown("### Explore on the Map")
-    fig = px.scatter_mapbox(
+    fig = px.scatter_map(
         city_grouped_by_day,
         lat="Latitude",
         lon="Longitude",
         hover_name="Ville",
-        mapbox_style="open-street-map",
+        map_style="open-street-map",
         zoom=6
     )
     # Agrandir les points
@@ -1,37 +1,32 @@
+import json
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import plotly.express as px
-import seaborn as sns
+from forecast_store import FORECAST_FOLDER
+from forecast_decoder import weather_labels
+from analysis_bundle import city_tables, city_charts
+from data_access import load_analysis_bundle
+from figure_cache import render_png
 
 st.set_page_config(page_title="Weather Analysis", page_icon="📊")
 
-# Définition des chemins des fichiers
-file_paths = {
-    "jour1": "Analyse_Bloc_6_CDSD/forecasts/weather_data_forecast_1day.csv",
-    "jour2": "Analyse_Bloc_6_CDSD/forecasts/weather_data_forecast_2day.csv",
-    "jour3": "Analyse_Bloc_6_CDSD/forecasts/weather_data_forecast_3day.csv",
-    "jour4": "Analyse_Bloc_6_CDSD/forecasts/weather_data_forecast_4day.csv",
-    "jour5": "Analyse_Bloc_6_CDSD/forecasts/weather_data_forecast_5day.csv",
-}
-
-# Charger chaque fichier en DataFrame
-dfs = {day: pd.read_csv(path) for day, path in file_paths.items()}
-# Liste des colonnes à conserver une seule fois
-columns_to_keep_once = ["Ville", "Latitude", "Longitude", "Date"]
-# Séparer les colonnes uniques et les données spécifiques aux jours
-df_base = dfs["jour1"][columns_to_keep_once].copy()  # On garde ces colonnes depuis le premier fichier
-# Supprimer ces colonnes des autres fichiers avant la fusion et ajouter des suffixes
-for day in dfs:
-    dfs[day] = dfs[day].drop(columns=columns_to_keep_once, errors="ignore").add_suffix(f"_{day}")
-# Fusionner les fichiers sans les colonnes redondantes
-all_data = pd.concat([df_base] + list(dfs.values()), axis=1)
 
+# Classements, graphiques et cartes de tout l'historique : lot d'artefacts construit par le workflow après
+# l'ingestion (analysis_bundle.py) ; la page ne fait que les afficher, quelle que soit la taille de l'historique.
+# Un seul lot en mémoire par processus, partagé par toutes les sessions (relu quand le lot change) ;
+# aucune synchronisation de la base ni reconstruction du cube pendant une requête
+bundle = load_analysis_bundle(FORECAST_FOLDER)
+if bundle is None:
+    st.info("The weather history has not been analysed yet: the analysis appears after the next daily update.")
+    st.stop()
+tables, images, figures = bundle["tables"], bundle["images"], bundle["figures"]
+
+# Statistiques par ville pour le jour 1 (classements et cartes), villes dans l'ordre alphabétique
+city_stats = tables["city_stats"]
 
 # Extraire la liste des villes uniques dans l'ordre alphabétique
-villes_disponibles = all_data["Ville"].unique()
-villes_disponibles.sort()
+villes_disponibles = city_stats["Ville"].to_numpy()
 
 # Sidebar 
 with st.sidebar:
@@ -54,12 +49,8 @@ with st.sidebar:
     st.markdown("""- [🌡️ Temperature](#temperature)""", unsafe_allow_html=True)
     st.markdown("""- [🌧️ Rain Probability](#rain-probability)""", unsafe_allow_html=True)
     st.markdown("""- [🎯 Weather Accuracy](#accuracy)""", unsafe_allow_html=True)
-    
-    selected_city = st.selectbox("📍 Select a City:", villes_disponibles)
 
-    # Création d'un lien dynamique vers la section correspondante
-    city_anchor = selected_city.lower().replace(" ", "-")
-    st.markdown(f"[🔍 View Analysis](#city-{city_anchor})", unsafe_allow_html=True)
+    # Le choix de la ville est dessiné par le fragment de l'analyse par ville (fin de page)
 
     #st.markdown("</div>", unsafe_allow_html=True)  # Fermer le div pour appliquer le CSS
 
@@ -124,30 +115,12 @@ st.image("Assets/DataFlow.png", use_container_width=False, width=600)
 st.markdown("#### From 250 to 50")
 st.write("""Mapping the most Weather-Consistent destinations in France 🌍""")
 
-# Agréger les données en faisant la somme des scores météo par jour
-agg_data = all_data.groupby(["Date", "Latitude", "Longitude"], as_index=False)["Weather_Score_jour1"].sum()
-
-fig = px.density_mapbox(
-    agg_data,
-    lat="Latitude",
-    lon="Longitude",
-    z="Weather_Score_jour1",  # Influence des données
-    mapbox_style="open-street-map",
-    animation_frame="Date",  # Animation basée sur la date
-    zoom=3.5,
-    radius=7,
-    color_continuous_scale="thermal",
-    center={"lat": 46.603354, "lon": 1.888334},
-    labels={"Weather_Score_jour1": "Weather Score"},
-    range_color=[agg_data["Weather_Score_jour1"].min(), agg_data["Weather_Score_jour1"].max()]
-)
-
-# Affichage
-st.plotly_chart(fig, use_container_width=True)
+# Somme des scores météo par ville et par jour (carte animée du lot)
+st.plotly_chart(json.loads(figures["score_map"]), use_container_width=True)
 
 st.markdown("#### Why These 50 Cities?")
 # Exemple de 50 villes
-villes = all_data["Ville"].unique()
+villes = villes_disponibles.copy()
 
 # Définir le nombre de colonnes souhaité (ex. 4 colonnes pour un affichage optimisé)
 num_cols = 5
@@ -211,7 +184,7 @@ st.markdown("""
 st.write("#### Top 10 Cities with the Best Weather Scores")
 
 # Calculer le score total pour chaque ville pour le jour 1
-city_ranking = all_data.groupby("Ville")["Weather_Score_jour1"].sum().reset_index()
+city_ranking = city_stats[["Ville", "Weather_Score_jour1"]]
     
 # Trier les villes par meilleur score
 city_ranking = city_ranking.sort_values(by="Weather_Score_jour1", ascending=False)
@@ -240,38 +213,8 @@ with col2:
 
 
 
-# Visualisation du classement en barplot
-fig2 = plt.figure(figsize=(12, 8))
-sns.barplot(
-x="Weather_Score_jour1", 
-y="Ville", 
-data=city_ranking.head(10), 
-palette="plasma"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=city_ranking["Weather_Score_jour1"].iloc[i] + 0.1,
-        y=i,
-        s=city_ranking["Weather_Score_jour1"].iloc[i],
-        ha="right",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="white"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Weather Score (Sum)", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig2)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["score_best"], use_container_width=True)
 
 st.markdown("""
     The bar chart above clearly illustrates the ranking of the top 10 French cities 
@@ -312,38 +255,8 @@ with col2:
     st.write(f"{third_worst_city['Weather_Score_jour1']}")
 
 
-# Visualisation du classement en barplot
-fig2 = plt.figure(figsize=(12, 8))
-sns.barplot(
-x="Weather_Score_jour1", 
-y="Ville", 
-data=city_ranking_end.head(10), 
-palette="viridis"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=city_ranking_end["Weather_Score_jour1"].iloc[i] + 0.1,
-        y=i,
-        s=city_ranking_end["Weather_Score_jour1"].iloc[i],
-        ha="right",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="white"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Weather Score (Sum)", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig2)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["score_worst"], use_container_width=True)
 
 st.markdown("""
     This bar chart presents the 10 cities in France with the lowest overall weather 
@@ -356,54 +269,8 @@ st.markdown("""
 
 st.write("#### Top 25 and Bottom 25 Cities on the French Map")
 # Weather_Score map
-if all(col in all_data.columns for col in ["Weather_Score_jour1", "Latitude", "Longitude"]):
-    
-    # Calculer le score total pour chaque ville pour le jour 1
-    city_ranking = all_data.groupby("Ville", as_index=False).agg({
-        "Weather_Score_jour1": "sum",
-        "Latitude": "first",
-        "Longitude": "first"
-    })
-    
-    # Trier les villes par meilleur score
-    city_ranking = city_ranking.sort_values(by="Weather_Score_jour1", ascending=False)
-
-    # Sélectionner les 25 meilleures et les 25 pires villes
-    top_25_cities = city_ranking.head(25).copy()
-    worst_25_cities = city_ranking.tail(25).copy()
-
-    # Ajouter une colonne pour différencier les catégories
-    top_25_cities["Category"] = "Top 25"
-    worst_25_cities["Category"] = "Worst 25"
-
-    # Fusionner les deux catégories
-    top_worst_cities = pd.concat([top_25_cities, worst_25_cities])
-
-    # Appliquer une taille uniforme pour toutes les villes
-    top_worst_cities["Size"] = 5  # Taille fixe pour tous les points
-
-    # Définir une palette de couleurs : Rouge pour le Top 25, Bleu pour le Worst 25
-    color_map = {"Top 25": "red", "Worst 25": "blue"}
-
-    # Carte interactive des 25 meilleures et 25 pires villes
-    fig3 = px.scatter_mapbox(
-        top_worst_cities,
-        lat="Latitude",
-        lon="Longitude",
-        color="Category",  
-        size="Size",  
-        hover_name="Ville",
-        hover_data={"Weather_Score_jour1": True},
-        mapbox_style="open-street-map",
-        zoom=3.5,
-        color_discrete_map=color_map,
-        size_max=10  
-    )
-
-    st.plotly_chart(fig3, use_container_width=True)
-
-else:
-    st.write("Some columns are missing. Please check the dataset.")
+# Carte interactive des 25 meilleures et 25 pires villes
+st.plotly_chart(json.loads(figures["score_top_bottom_map"]), use_container_width=True)
 
 st.markdown("""
     This interactive map highlights the geographical distribution of the best (red) 
@@ -432,31 +299,8 @@ st.header("🌡️ Temperature")
 
 # Afficher la temperature moyenne par jour pour chaque ville
 st.write("#### Evolution of the average Temperature per Day")
-Temp_date = (all_data.groupby("Date")["Temp_Avg_jour1"].mean())
-
-# Affichage sur un lineplot
-fig10 = plt.figure(figsize=(18, 8))
-sns.lineplot(
-    x=Temp_date.index,
-    y=Temp_date.values,
-    marker="o",
-    color="blue",
-    linewidth=2,
-    markersize=8
-)
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Date", fontsize=12, color="black", fontweight="bold")
-plt.ylabel("Average Temperature", fontsize=12, color="black", fontweight="bold")
-plt.xticks(rotation=90, fontsize=10, color="black")
-plt.yticks(fontsize=10, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig10)
+# Température moyenne par jour, toutes villes confondues (graphique du lot)
+st.image(images["temp_by_date"], use_container_width=True)
 
 st.markdown("""
     This line chart shows the daily average temperature over the analyzed period. 
@@ -472,7 +316,7 @@ st.markdown("## 🏆 <u>Ranking Cities Based on Temperature</u>", unsafe_allow_h
 st.write("#### Top 10 Cities with the Highest Temperature")
 
 # Calculer la avg_temp pour chaque ville pour le jour 1
-city_temp = all_data.groupby("Ville")["Temp_Avg_jour1"].mean().reset_index()
+city_temp = city_stats[["Ville", "Temp_Avg_jour1"]]
     
 # Trier les villes par température
 city_temp = city_temp.sort_values(by="Temp_Avg_jour1", ascending=False)
@@ -501,38 +345,8 @@ with col6:
 
 
 
-# Visualisation du classement en barplot
-fig4 = plt.figure(figsize=(12, 8))
-sns.barplot(
-x="Temp_Avg_jour1", 
-y="Ville", 
-data=city_temp.head(10), 
-palette="plasma"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=city_temp["Temp_Avg_jour1"].iloc[i] + 0.1,
-        y=i,
-        s=f"{city_temp['Temp_Avg_jour1'].iloc[i]:.2f}",
-        ha="left",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="black"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Average Temperature", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig4)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["temp_best"], use_container_width=True)
 
 st.markdown("""
     This visualization highlights the top 10 French cities with the highest average 
@@ -572,38 +386,8 @@ with col8:
     st.write(f"{third_worst_city_temp['Temp_Avg_jour1']:.2f}")
 
 
-# Visualisation du classement en barplot
-fig5 = plt.figure(figsize=(12, 8))
-sns.barplot(
-x="Temp_Avg_jour1", 
-y="Ville", 
-data=city_temp_end.head(10), 
-palette="viridis"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=city_temp_end["Temp_Avg_jour1"].iloc[i] + 0.1,
-        y=i,
-        s=f"{city_temp_end['Temp_Avg_jour1'].iloc[i]:.2f}",
-        ha="left",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="black"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Weather Score (Sum)", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig5)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["temp_worst"], use_container_width=True)
 
 st.markdown("""
     This bar chart highlights the French cities with the lowest average temperatures. 
@@ -617,54 +401,8 @@ st.markdown("""
 
 st.write("#### Top 25 and Bottom 25 Cities on the French Map")
 # Weather_Score map
-if all(col in all_data.columns for col in ["Temp_Avg_jour1", "Latitude", "Longitude"]):
-    
-    # Calculer le score total pour chaque ville pour le jour 1
-    city_temp = all_data.groupby("Ville", as_index=False).agg({
-        "Temp_Avg_jour1": "mean",
-        "Latitude": "first",
-        "Longitude": "first"
-    })
-    
-    # Trier les villes par meilleur score
-    city_temp = city_temp.sort_values(by="Temp_Avg_jour1", ascending=False)
-
-    # Sélectionner les 25 meilleures et les 25 pires villes
-    top_25_cities = city_temp.head(25).copy()
-    worst_25_cities = city_temp.tail(25).copy()
-
-    # Ajouter une colonne pour différencier les catégories
-    top_25_cities["Category"] = "Top 25"
-    worst_25_cities["Category"] = "Worst 25"
-
-    # Fusionner les deux catégories
-    top_worst_cities = pd.concat([top_25_cities, worst_25_cities])
-
-    # Appliquer une taille uniforme pour toutes les villes
-    top_worst_cities["Size"] = 5  # Taille fixe pour tous les points
-
-    # Définir une palette de couleurs : Rouge pour le Top 5, Bleu pour le Worst 5
-    color_map = {"Top 25": "red", "Worst 25": "blue"}
-
-    # Carte interactive des 25 meilleures et 25 pires villes
-    fig6 = px.scatter_mapbox(
-        top_worst_cities,
-        lat="Latitude",
-        lon="Longitude",
-        color="Category",  
-        size="Size",  
-        hover_name="Ville",
-        hover_data={"Temp_Avg_jour1": True},
-        mapbox_style="open-street-map",
-        zoom=3.5,
-        color_discrete_map=color_map,
-        size_max=10  
-    )
-
-    st.plotly_chart(fig6, use_container_width=True)
-
-else:
-    st.write("Some columns are missing. Please check the dataset.")
+# Carte interactive des 25 villes les plus chaudes et les plus froides
+st.plotly_chart(json.loads(figures["temp_top_bottom_map"]), use_container_width=True)
 
 st.markdown("""
     This interactive map visually summarizes the geographic distribution of the cities 
@@ -694,7 +432,7 @@ st.header("🌧️ Rain Probability")
 st.markdown("## 🏆 <u>Ranking Cities Based on Rain Probability</u>", unsafe_allow_html=True)
 
 # Calculer la avg_temp pour chaque ville pour le jour 1
-city_rain = all_data.groupby("Ville")["Rain_Probability_jour1"].sum().reset_index()
+city_rain = city_stats[["Ville", "Rain_Probability_jour1"]]
     
 # Trier les villes
 city_rain = city_rain.sort_values(by="Rain_Probability_jour1", ascending=False)
@@ -728,38 +466,8 @@ with col12:
     st.write(f"{third_worst_city_rain['Rain_Probability_jour1']:.2f}")
 
 
-# Visualisation du classement en barplot
-fig8 = plt.figure(figsize=(12, 8))
-sns.barplot(
-x="Rain_Probability_jour1", 
-y="Ville", 
-data=city_rain_end.head(10), 
-palette="plasma"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=city_rain_end["Rain_Probability_jour1"].iloc[i] + 0.1,
-        y=i,
-        s=f"{city_rain_end['Rain_Probability_jour1'].iloc[i]:.2f}",
-        ha="right",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="white"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Rain Probability (Sum)", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig8)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["rain_lowest"], use_container_width=True)
 
 st.markdown("""
     This visualization highlights the French cities least likely to experience rainfall, 
@@ -799,38 +507,8 @@ with col10:
 
 
 
-# Visualisation du classement en barplot
-fig7 = plt.figure(figsize=(12, 8))
-sns.barplot(
-x="Rain_Probability_jour1", 
-y="Ville", 
-data=city_rain.head(10), 
-palette="viridis"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=city_rain["Rain_Probability_jour1"].iloc[i] + 0.1,
-        y=i,
-        s=f"{city_rain['Rain_Probability_jour1'].iloc[i]:.2f}",
-        ha="right",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="white"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Rain Probability (sum)", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig7)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["rain_highest"], use_container_width=True)
 
 st.markdown("""
     This chart identifies the French cities most likely to experience rainfall. 
@@ -843,54 +521,8 @@ st.markdown("""
 
 st.write("#### Top 25 and Bottom 25 Cities on the Map")
 # Rain_Probability map
-if all(col in all_data.columns for col in ["Rain_Probability_jour1", "Latitude", "Longitude"]):
-    
-    # Calculer le score total pour chaque ville pour le jour 1
-    city_rain = all_data.groupby("Ville", as_index=False).agg({
-        "Rain_Probability_jour1": "sum",
-        "Latitude": "first",
-        "Longitude": "first"
-    })
-    
-    # Trier les villes par meilleur score
-    city_rain = city_rain.sort_values(by="Rain_Probability_jour1", ascending=False)
-
-    # Sélectionner les 25 meilleures et les 25 pires villes
-    top_25_cities_rain = city_rain.head(25).copy()
-    worst_25_cities_rain = city_rain.tail(25).copy()
-
-    # Ajouter une colonne pour différencier les catégories
-    top_25_cities_rain["Category"] = "High Prob 25"
-    worst_25_cities_rain["Category"] = "Low Prob 25"
-
-    # Fusionner les deux catégories
-    top_worst_cities_rain = pd.concat([top_25_cities_rain, worst_25_cities_rain])
-
-    # Appliquer une taille uniforme pour toutes les villes
-    top_worst_cities_rain["Size"] = 5  # Taille fixe pour tous les points
-
-    # Définir une palette de couleurs : Rouge pour le Top 5, Bleu pour le Worst 5
-    color_map = {"Low Prob 25": "red", "High Prob 25": "blue"}
-
-    # Carte interactive des 25 meilleures et 25 pires villes
-    fig9 = px.scatter_mapbox(
-        top_worst_cities_rain,
-        lat="Latitude",
-        lon="Longitude",
-        color="Category",  
-        size="Size",  
-        hover_name="Ville",
-        hover_data={"Rain_Probability_jour1": True},
-        mapbox_style="open-street-map",
-        zoom=3.5,
-        color_discrete_map=color_map,
-        size_max=10  
-    )
-
-    st.plotly_chart(fig9, use_container_width=True)
-
-else:
-    st.write("Some columns are missing. Please check the dataset.")
+# Carte interactive des 25 villes les plus et les moins pluvieuses
+st.plotly_chart(json.loads(figures["rain_top_bottom_map"]), use_container_width=True)
 
 st.markdown("""
     This map provides an insightful visualization of rainfall probability across French 
@@ -924,42 +556,8 @@ st.write("---")
 
 st.markdown("<a name='accuracy'></a>", unsafe_allow_html=True)
 
-# Liste des jours à comparer avec la référence (jour 1)
-jours_previsions = ["jour2", "jour3", "jour4", "jour5"]
-
-# Calcul des écarts relatifs pour chaque jour de prévision par rapport à jour1
-for jour in jours_previsions:
-    all_data[f"Temp_Error_{jour}"] = abs(all_data[f"Temp_Avg_{jour}"] - all_data["Temp_Avg_jour1"]) / all_data["Temp_Avg_jour1"]
-    all_data[f"Rain_Error_{jour}"] = abs(all_data[f"Rain_Probability_{jour}"] - all_data["Rain_Probability_jour1"])
-    all_data[f"Weather_Score_Error_{jour}"] = abs(all_data[f"Weather_Score_{jour}"] - all_data["Weather_Score_jour1"]) / 200
-
-# Score d'accuracy basé sur les écarts
-for jour in jours_previsions:
-    all_data[f"Accuracy_{jour}"] = 100 - (
-        (all_data[f"Temp_Error_{jour}"] * 40) + 
-        (all_data[f"Rain_Error_{jour}"] * 35) + 
-        (all_data[f"Weather_Score_Error_{jour}"] * 25)
-    )
-
-# Normalisation du score pour qu'il reste entre 0 et 100
-for jour in jours_previsions:
-    all_data[f"Accuracy_{jour}"] = all_data[f"Accuracy_{jour}"].clip(0, 100)
-
-# Affichage des résultats
-all_data[["Ville", "Date"] + [f"Accuracy_{jour}" for jour in jours_previsions]].head()
-
-# regrouper pour chaque ville
-city_accuracy = all_data.groupby("Ville")[[f"Accuracy_{jour}" for jour in jours_previsions]].mean()
-# Calculer la moyenne des scores d'accuracy pour chaque ville et garder les latitudes et longitudes
-city_accuracy = all_data.groupby("Ville")[[f"Accuracy_{jour}" for jour in jours_previsions]].mean().reset_index()
-# Calculer la moyenne des scores d'accuracy pour chaque ville
-city_accuracy["Mean_Accuracy"] = city_accuracy[[f"Accuracy_{jour}" for jour in jours_previsions]].mean(axis=1)
-# Trier les villes par la moyenne des scores d'accuracy
-city_accuracy = city_accuracy.sort_values(by="Mean_Accuracy", ascending=False)
-# incorporer le score d'accuracy dans le DataFrame
-city_accuracy_lat_long = pd.merge(city_accuracy, all_data[["Ville", "Latitude", "Longitude"]], on="Ville")
-# Drop duplicates
-city_accuracy_lat_long = city_accuracy.drop_duplicates(subset=["Ville"])
+# Accuracy moyenne par ville (jours 2 à 5 comparés au jour 1), triée de la meilleure à la pire
+city_accuracy = tables["city_accuracy"]
 
 st.header("🎯 Accuracy of Weather Predictions")
 
@@ -1078,38 +676,8 @@ with col14:
     st.write(f"{third_best_city_accuracy['Mean_Accuracy']:.2f}%")
 
 
-# Visualisation du classement en barplot
-fig11 = plt.figure(figsize=(12, 8))
-sns.barplot(
-    x="Mean_Accuracy",
-    y="Ville",
-    data=city_accuracy.head(10),
-    palette="plasma"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=city_accuracy["Mean_Accuracy"].iloc[i] + 0.1,
-        y=i,
-        s=f"{city_accuracy['Mean_Accuracy'].iloc[i]:.2f}%",
-        ha="right",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="white"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Mean Accuracy Score", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")  
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig11)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["accuracy_best"], use_container_width=True)
 
 st.markdown("""
     This chart showcases the cities in France where weather forecasts are 
@@ -1152,39 +720,8 @@ with col16:
     st.write(f"{third_worst_city_accuracy['Mean_Accuracy']:.2f}%")
 
 
-end_accuracy = city_accuracy.sort_values(by="Mean_Accuracy", ascending=True)
-# Visualisation du classement en barplot
-fig12 = plt.figure(figsize=(12, 8))
-sns.barplot(
-    x="Mean_Accuracy",
-    y="Ville",
-    data=end_accuracy.head(10),
-    palette="viridis"
-)
-
-# ajouter les labels sur les barres
-for i in range(10):
-    plt.text(
-        x=end_accuracy["Mean_Accuracy"].iloc[i] + 0.1,
-        y=i,
-        s=f"{end_accuracy['Mean_Accuracy'].iloc[i]:.2f}%",
-        ha="right",
-        va="center",
-        fontsize=18,
-        fontweight="bold",
-        color="white"
-    )
-
-# Modifier la couleur des labels et du titre
-plt.xlabel("Mean Accuracy Score", fontsize=12, color="black")
-plt.ylabel("City", fontsize=12, color="black")
-
-# Modifier la couleur des axes
-plt.xticks(color="black")
-plt.yticks(color="black")  
-
-# Affichage du graphique dans Streamlit
-st.pyplot(fig12)
+# Visualisation du classement en barplot (graphique du lot)
+st.image(images["accuracy_worst"], use_container_width=True)
 
 st.markdown("""
     This chart highlights the cities where weather forecasts have shown the 
@@ -1199,44 +736,9 @@ st.markdown("""
 """)
 st.write("")
 
-# Fusionner les données de latitude et longitude avec city_accuracy
-city_accuracy_lat_long = city_accuracy.merge(
-    all_data[["Ville", "Latitude", "Longitude"]].drop_duplicates(),
-    on="Ville",
-    how="left"
-)
-
 st.write("#### Geographical Distribution of Forecast Accuracy")
-# Sélectionner les 25 meilleures et les 25 pires villes
-top_25_cities_accurate = city_accuracy_lat_long.head(25).copy()
-worst_25_cities_accurate = city_accuracy_lat_long.tail(25).copy()
-# Ajouter une colonne pour différencier les catégories
-top_25_cities_accurate["Category"] = "High Prob 25"
-worst_25_cities_accurate["Category"] = "Low Prob 25"   
-# Fusionner les deux catégories
-top_worst_cities_accurate = pd.concat([top_25_cities_accurate, worst_25_cities_accurate])
-# Appliquer une taille uniforme pour toutes les villes
-top_worst_cities_accurate["Size"] = 5  # Taille fixe pour tous les points
-
-# Définir une palette de couleurs : Rouge pour le Top 5, Bleu pour le Worst 5
-color_map = {"High Prob 25": "red", "Low Prob 25": "blue"}
-
-# Carte interactive des 25 meilleures et 25 pires villes
-fig15 = px.scatter_mapbox(
-        top_worst_cities_accurate,
-        lat="Latitude",
-        lon="Longitude",
-        color="Category",  
-        size="Size",  
-        hover_name="Ville",
-        hover_data={"Mean_Accuracy": True},
-        mapbox_style="open-street-map",
-        zoom=3.5,
-        color_discrete_map=color_map,
-        size_max=10  
-    )
-
-st.plotly_chart(fig15, use_container_width=True)
+# Carte interactive des 25 meilleures et 25 pires villes (coordonnées jointes dans le lot)
+st.plotly_chart(json.loads(figures["accuracy_top_bottom_map"]), use_container_width=True)
 
 st.markdown("""
     This map visualizes the top 25 cities with the highest forecast accuracy 
@@ -1266,68 +768,14 @@ st.markdown("""
     whether adjustments should be made when interpreting them over time.
 """)
 
-# Extraire les Scores météo pour chaque jour avec les bons suffixes
-weather_socre_avg = {
-    "Day +1": all_data["Weather_Score_jour1"].mean(),
-    "Day +2": all_data["Weather_Score_jour2"].mean(),
-    "Day +3": all_data["Weather_Score_jour3"].mean(),
-    "Day +4": all_data["Weather_Score_jour4"].mean(),
-    "Day +5": all_data["Weather_Score_jour5"].mean(),
-}
-# Extraire les Temperatures pour chaque jour avec les bons suffixes
-Temp_Avg = {
-    "Day +1": all_data["Temp_Avg_jour1"].mean(),
-    "Day +2": all_data["Temp_Avg_jour2"].mean(),
-    "Day +3": all_data["Temp_Avg_jour3"].mean(),
-    "Day +4": all_data["Temp_Avg_jour4"].mean(),
-    "Day +5": all_data["Temp_Avg_jour5"].mean(),
-}
-# Extraire les Rain_Probability pour chaque jour avec les bons suffixes
-Rain_Prob = {
-    "Day +1": all_data["Rain_Probability_jour1"].mean(),
-    "Day +2": all_data["Rain_Probability_jour2"].mean(),
-    "Day +3": all_data["Rain_Probability_jour3"].mean(),
-    "Day +4": all_data["Rain_Probability_jour4"].mean(),
-    "Day +5": all_data["Rain_Probability_jour5"].mean(),
-}
-# Extraire les Rain_Probability pour chaque jour avec les bons suffixes
-Humidity_Prob = {
-    "Day +1": all_data["Humidity_jour1"].mean(),
-    "Day +2": all_data["Humidity_jour2"].mean(),
-    "Day +3": all_data["Humidity_jour3"].mean(),
-    "Day +4": all_data["Humidity_jour4"].mean(),
-    "Day +5": all_data["Humidity_jour5"].mean(),
-}
-
-# Fonction pour créer un lineplot amélioré
-def create_lineplot(data, title, xlabel, ylabel, color):
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.plot(list(data.keys()), list(data.values()), marker="o", linestyle="-", color=color, linewidth=2)
-    
-    # Ajouter les valeurs sur les points
-    for i, txt in enumerate(data.values()):
-        ax.annotate(f"{txt:.2f}", (list(data.keys())[i], txt), textcoords="offset points", xytext=(0, 8), ha='center', fontsize=10, fontweight="bold")
-
-    #ax.set_xlabel(xlabel)
-    ax.set_ylabel(ylabel)
-    ax.set_title(title, fontsize=12, fontweight="bold")
-    ax.grid(True)
-    return fig
-
-# Création des graphiques
-fig_weather = create_lineplot(weather_socre_avg, "Weather Score", "Day", "Weather Score", "purple")
-fig_temp = create_lineplot(Temp_Avg, "Temperature", "Day", "Average Temperature", "red")
-fig_rain = create_lineplot(Rain_Prob, "Rain Probability", "Day", "Rain Probability", "blue")
-fig_humidity = create_lineplot(Humidity_Prob, "Humidity", "Day", "Average Humidity", "green")
-
-# Afficher les graphiques
+# Moyennes par jour de prévision (graphiques du lot)
 col17, col18 = st.columns(2)
-col17.pyplot(fig_weather)
-col18.pyplot(fig_temp)
+col17.image(images["bias_weather_score"], use_container_width=True)
+col18.image(images["bias_temp"], use_container_width=True)
 
 col19, col22 = st.columns(2)
-col19.pyplot(fig_rain)
-col22.pyplot(fig_humidity)
+col19.image(images["bias_rain"], use_container_width=True)
+col22.image(images["bias_humidity"], use_container_width=True)
 
 # 📌 Ajout d’une section d'interprétation après les graphiques
 st.markdown("#### 🔎  Key Insights from the Forecast Bias Analysis")
@@ -1435,193 +883,110 @@ st.write("---")
 
 
 
-# Filtrer les données en fonction de la ville sélectionnée
-city_data = all_data[all_data["Ville"] == selected_city]
-st.markdown(f"<a name='city-{selected_city.lower().replace(' ', '-')}'></a>", unsafe_allow_html=True)
+# Analyse détaillée d'une ville, en fragment : changer de ville dans la barre latérale ne relance que cette section,
+# pas les classements et graphiques de toute la page
+@st.fragment
+def city_deep_dive():
+    with st.sidebar:
+        selected_city = st.selectbox("📍 Select a City:", villes_disponibles)
 
-# Affichage des informations générales
-st.markdown(f"## 🌆 {selected_city} - Weather Overview")
-st.write(f"**Data from:** {city_data['Date'].min()} to {city_data['Date'].max()}")
-#st.write(f"**Latitude:** {city_data['Latitude'].iloc[0]}")
-#st.write(f"**Longitude:** {city_data['Longitude'].iloc[0]}")
+        # Création d'un lien dynamique vers la section correspondante
+        city_anchor = selected_city.lower().replace(" ", "-")
+        st.markdown(f"[🔍 View Analysis](#city-{city_anchor})", unsafe_allow_html=True)
 
-# Calcul des statistiques
-avg_temp = city_data["Temp_Avg_jour1"].mean()
-max_temp = city_data["Temp_Max_jour1"].max()
-min_temp = city_data["Temp_Min_jour1"].min()
-avg_humidity = city_data["Humidity_jour1"].mean()
-rain_prob = city_data["Rain_Probability_jour1"].mean()
-weather_score = city_data["Weather_Score_jour1"].sum()
-accuracy_score = city_accuracy[city_accuracy["Ville"] == selected_city]["Mean_Accuracy"].values[0]
-# Valeur la plus fréquente dans la colonne Weather_jour1
-weather = city_data["Weather_jour1"].mode().values[0]
+    # Filtrer les données en fonction de la ville sélectionnée : prévisions du jour 1 par date et créneau,
+    # moyennes par jour de prévision (tables du lot)
+    city_data, city_horizon_means = city_tables(tables, selected_city)
+    charts = city_charts(city_data, city_horizon_means, selected_city)
 
-# Affichage des stats
-st.markdown("### 📊 Weather Statistics")
-col20, col21, col23 = st.columns(3)
-col20.metric("🌡️ Avg Temp", f"{avg_temp:.2f}°C")
-col21.metric("🔥 Max Temp", f"{max_temp:.2f}°C")
-col23.metric("❄️ Min Temp", f"{min_temp:.2f}°C")
+    # Graphique de la ville : déjà rendu dans le lot pour la première ville (celle affichée à l'ouverture de la page),
+    # sinon rendu à la demande par figure_cache.render_png (png en cache, revoir une ville ne refait aucun rendu)
+    def chart(name):
+        if selected_city == villes_disponibles[0] and f"city_{name}" in images:
+            return images[f"city_{name}"]
+        draw, args, kwargs = charts[name]
+        return render_png(draw, *args, **kwargs)
 
-col24, col25, col26 = st.columns(3)
-col24.metric("💧 Humidity", f"{avg_humidity:.1f}%")
-col25.metric("☔ Rain Prob", f"{rain_prob * 100:.1f}%")
-col26.metric("📊 Weather Score", f"{weather_score}")
+    # Identifiants de condition, convertis en libellés pour l'affichage
+    city_weather = city_data["Weather"].to_numpy()
+    city_data["Weather"] = weather_labels(city_weather)
+    st.markdown(f"<a name='city-{selected_city.lower().replace(' ', '-')}'></a>", unsafe_allow_html=True)
 
-col27, col28, col29 = st.columns(3)
-col27.metric("🎯 Accuracy", f"{accuracy_score:.2f}")
-col28.metric("🌦️ Most Common Weather", f"{weather}")
+    # Affichage des informations générales
+    st.markdown(f"## 🌆 {selected_city} - Weather Overview")
+    st.write(f"**Data from:** {city_data['Date'].min()} to {city_data['Date'].max()}")
+    #st.write(f"**Latitude:** {city_data['Latitude'].iloc[0]}")
+    #st.write(f"**Longitude:** {city_data['Longitude'].iloc[0]}")
 
-# Appliquer une taille uniforme pour toutes les villes
-city_data["Size"] = 5
-# 📍 Carte interactive avec Plotly
-st.markdown("### 🗺️ City Location")
-fig_map = px.scatter_mapbox(
-    city_data.groupby(["Ville", "Latitude", "Longitude"]).first().reset_index(),
-    lat="Latitude",
-    lon="Longitude",
-    hover_name="Ville",
-    mapbox_style="open-street-map",
-    zoom=7,
-    size="Size",
-    size_max=10,
-    color_discrete_sequence=["red"],
-)
-st.plotly_chart(fig_map)
-
-st.markdown("### 📊 Weather Trends Over Time")
-# Calcul du total de Weather_Score par jour
-weather_score_daily = city_data.groupby("Date")["Weather_Score_jour1"].sum().reset_index()
-
-# 📊 Graphique du score météo
-fig_weather_score, ax = plt.subplots(figsize=(15, 8))
-sns.lineplot(x=weather_score_daily["Date"], 
-             y=weather_score_daily["Weather_Score_jour1"], 
-             marker="o", 
-             color="purple", 
-             ax=ax,
-             ci=None)
-
-plt.xticks(rotation=90, fontsize=10, color="black")
-plt.yticks(fontsize=10, color="black")
-plt.title("Weather Score", fontsize=16, color="black", fontweight="bold")
-plt.ylabel("Weather Score", fontsize=12, color="black", fontweight="bold")
-
-# 📈 Graphique des températures
-fig_temp, ax = plt.subplots(figsize=(15, 8))
-sns.lineplot(
-    x=city_data["Date"], 
-    y=city_data["Temp_Avg_jour1"], 
-    marker="o", 
-    ci=None,
-    linewidth=2,
-    markersize=8,
-    ax=ax)
-
-plt.xticks(rotation=90, fontsize=10, color="black")
-plt.yticks(fontsize=10, color="black")
-plt.title("Temperature", fontsize=16, color="black", fontweight="bold")
-plt.ylabel("Average Temperature (°C)", fontsize=12, color="black", fontweight="bold")
-
-# 📊 Graphique des précipitations
-fig_rain, ax = plt.subplots(figsize=(15, 8))
-sns.lineplot(x=city_data["Date"], 
-             y=city_data["Rain_Probability_jour1"], 
-             marker="o", 
-             color="blue", 
-             ax=ax,
-             ci=None
-             )
-
-plt.xticks(rotation=90, fontsize=10, color="black")
-plt.yticks(fontsize=10, color="black")
-plt.title("Rain Probability", fontsize=16, color="black", fontweight="bold")
-plt.ylabel("Rain Probability (%)", fontsize=12, color="black", fontweight="bold")
-
-# 📉 Graphique de l'humidité
-fig_humidity, ax = plt.subplots(figsize=(15, 8))
-sns.lineplot(x=city_data["Date"], 
-             y=city_data["Humidity_jour1"], 
-             marker="o", 
-             color="green", 
-             ax=ax,
-             ci=None
-             )
-
-plt.xticks(rotation=90, fontsize=10, color="black")
-plt.yticks(fontsize=10, color="black")
-plt.title("Humidity", fontsize=16, color="black", fontweight="bold")
-plt.ylabel("Humidity (%)", fontsize=12, color="black", fontweight="bold")
-
-# Affichage des graphiques en 2 colonnes
-col54, col55 = st.columns(2)
-col54.pyplot(fig_weather_score)
-col55.pyplot(fig_temp)
-
-col56, col57 = st.columns(2)
-col56.pyplot(fig_rain)
-col57.pyplot(fig_humidity)
-
-
-st.markdown("### 🎯 Optimistic or Pessimistic?")
-# 📊 Calcul des statistiques spécifiques à la ville
-weather_score_city = {
-    "Day +1": city_data["Weather_Score_jour1"].mean(),
-    "Day +2": city_data["Weather_Score_jour2"].mean(),
-    "Day +3": city_data["Weather_Score_jour3"].mean(),
-    "Day +4": city_data["Weather_Score_jour4"].mean(),
-    "Day +5": city_data["Weather_Score_jour5"].mean(),
-}
-temp_avg_city = {
-    "Day +1": city_data["Temp_Avg_jour1"].mean(),
-    "Day +2": city_data["Temp_Avg_jour2"].mean(),
-    "Day +3": city_data["Temp_Avg_jour3"].mean(),
-    "Day +4": city_data["Temp_Avg_jour4"].mean(),
-    "Day +5": city_data["Temp_Avg_jour5"].mean(),
-}
-rain_prob_city = {
-    "Day +1": city_data["Rain_Probability_jour1"].mean(),
-    "Day +2": city_data["Rain_Probability_jour2"].mean(),
-    "Day +3": city_data["Rain_Probability_jour3"].mean(),
-    "Day +4": city_data["Rain_Probability_jour4"].mean(),
-    "Day +5": city_data["Rain_Probability_jour5"].mean(),
-}
-humidity_avg_city = {
-    "Day +1": city_data["Humidity_jour1"].mean(),
-    "Day +2": city_data["Humidity_jour2"].mean(),
-    "Day +3": city_data["Humidity_jour3"].mean(),
-    "Day +4": city_data["Humidity_jour4"].mean(),
-    "Day +5": city_data["Humidity_jour5"].mean(),
-}
-
-# 📈 Fonction pour créer un lineplot amélioré
-def create_lineplot(data, title, xlabel, ylabel, color):
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.plot(list(data.keys()), list(data.values()), marker="o", linestyle="-", color=color, linewidth=2)
-    
-    # Ajouter les valeurs sur les points
-    for i, txt in enumerate(data.values()):
-        ax.annotate(f"{txt:.2f}", (list(data.keys())[i], txt), textcoords="offset points", xytext=(0, 8), ha='center', fontsize=10, fontweight="bold")
+    # Calcul des statistiques
+    avg_temp = city_data["Temp_Avg"].mean()
+    max_temp = city_data["Temp_Max"].max()
+    min_temp = city_data["Temp_Min"].min()
+    avg_humidity = city_data["Humidity"].mean()
+    rain_prob = city_data["Rain_Probability"].mean()
+    weather_score = city_data["Weather_Score"].sum()
+    # Ville sans ligne de précision (aucune prévision comparable) : "N/A"
+    city_accuracy_rows = city_accuracy[city_accuracy["Ville"] == selected_city]["Mean_Accuracy"]
+    accuracy_score = "N/A" if city_accuracy_rows.empty else f"{city_accuracy_rows.values[0]:.2f}"
+    # Valeur la plus fréquente dans la colonne Weather (comptage des identifiants de condition),
+    # "N/A" si aucune valeur n'est renseignée
+    city_weather = city_weather[~np.isnan(city_weather)].astype(int)
+    weather = weather_labels([np.bincount(city_weather).argmax()])[0] if city_weather.size else "N/A"
 
-    
-    ax.set_ylabel(ylabel, fontsize=12, fontweight="bold")
-    ax.set_title(title, fontsize=14, fontweight="bold")
-    ax.grid(True)
-    return fig
+    # Affichage des stats
+    st.markdown("### 📊 Weather Statistics")
+    col20, col21, col23 = st.columns(3)
+    col20.metric("🌡️ Avg Temp", f"{avg_temp:.2f}°C")
+    col21.metric("🔥 Max Temp", f"{max_temp:.2f}°C")
+    col23.metric("❄️ Min Temp", f"{min_temp:.2f}°C")
+
+    col24, col25, col26 = st.columns(3)
+    col24.metric("💧 Humidity", f"{avg_humidity:.1f}%")
+    col25.metric("☔ Rain Prob", f"{rain_prob * 100:.1f}%")
+    col26.metric("📊 Weather Score", f"{weather_score}")
+
+    col27, col28, col29 = st.columns(3)
+    col27.metric("🎯 Accuracy", accuracy_score)
+    col28.metric("🌦️ Most Common Weather", f"{weather}")
+
+    # Appliquer une taille uniforme pour toutes les villes
+    city_data["Size"] = 5
+    # 📍 Carte interactive avec Plotly
+    st.markdown("### 🗺️ City Location")
+    fig_map = px.scatter_map(
+        city_data.groupby(["Ville", "Latitude", "Longitude"]).first().reset_index(),
+        lat="Latitude",
+        lon="Longitude",
+        hover_name="Ville",
+        map_style="open-street-map",
+        zoom=7,
+        size="Size",
+        size_max=10,
+        color_discrete_sequence=["red"],
+    )
+    st.plotly_chart(fig_map)
+
+    st.markdown("### 📊 Weather Trends Over Time")
+    # 📊 Graphiques du score météo (total par jour), des températures, des précipitations et de l'humidité,
+    # en 2 colonnes
+    col54, col55 = st.columns(2)
+    col54.image(chart("trend_score"), use_container_width=True)
+    col55.image(chart("trend_temp"), use_container_width=True)
+
+    col56, col57 = st.columns(2)
+    col56.image(chart("trend_rain"), use_container_width=True)
+    col57.image(chart("trend_humidity"), use_container_width=True)
 
-# 📊 Création des graphiques dynamiques pour la ville sélectionnée
-fig_weather_city = create_lineplot(weather_score_city, f"Weather Score Evolution in {selected_city}", "Day", "Weather Score", "purple")
-fig_temp_city = create_lineplot(temp_avg_city, f"Temperature Evolution in {selected_city}", "Day", "Average Temperature", "red")
-fig_rain_city = create_lineplot(rain_prob_city, f"Rain Probability Evolution in {selected_city}", "Day", "Rain Probability", "blue")
-fig_humidity_city = create_lineplot(humidity_avg_city, f"Humidity Evolution in {selected_city}", "Day", "Average Humidity", "green")
 
-# Affichage des graphiques en 2 colonnes
-col50, col51 = st.columns(2)
-col50.pyplot(fig_weather_city)
-col51.pyplot(fig_temp_city)
+    st.markdown("### 🎯 Optimistic or Pessimistic?")
+    # 📊 Graphiques dynamiques pour la ville sélectionnée (moyennes par jour de prévision), en 2 colonnes
+    col50, col51 = st.columns(2)
+    col50.image(chart("horizon_score"), use_container_width=True)
+    col51.image(chart("horizon_temp"), use_container_width=True)
 
-col52, col53 = st.columns(2)
-col52.pyplot(fig_rain_city)
-col53.pyplot(fig_humidity_city)
+    col52, col53 = st.columns(2)
+    col52.image(chart("horizon_rain"), use_container_width=True)
+    col53.image(chart("horizon_humidity"), use_container_width=True)
 
 
+city_deep_dive()
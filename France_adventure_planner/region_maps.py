@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import plotly.express as px
+from storage import atomic_write_json
+from cities import TREKS, COASTS, select_cities
+from results_store import RESULTS_FOLDER, read_results
+
+# Cartes animées des pages Trek & Mountains et Sea & Sun, construites par le script quotidien :
+#   results/maps.json -> {"treks/{itinéraire}" ou "coasts/{région}": {"key": empreinte des données, "figure": figure Plotly}}
+# Une carte = un point par ville et par jour (agrégat daily), seules les colonnes affichées au survol sont gardées.
+# Les pages envoient la figure telle quelle à st.plotly_chart au lieu de refaire px.density_map à chaque rerun ;
+# si la carte manque ou ne correspond plus aux données lues (empreinte différente), elle est construite à la volée.
+MAPS_NAME = "maps.json"
+MAP_COLUMNS = ["City_Id", "Ville", "Latitude", "Longitude", "Date", "Temp_Avg", "Humidity", "Weather"]
+HOVER_COLUMNS = ["Humidity", "Weather"]
+# Pages : itinéraires ou régions, et zoom de la carte
+REGIONS = {"treks": (TREKS, 6), "coasts": (COASTS, 5)}
+
+
+def maps_path(folder=RESULTS_FOLDER):
+    return os.path.join(folder, MAPS_NAME)
+
+
+# Empreinte des lignes d'une région : la carte précalculée n'est servie que pour ces données exactes
+def data_key(df):
+    return hashlib.sha1(df[MAP_COLUMNS].to_csv(index=False).encode("utf-8")).hexdigest()[:16]
+
+
+# Carte animée d'une région (lignes de l'agrégat daily), sous forme de dict JSON
+#   range_color : échelle de température commune à toutes les régions (min et max de tout le jeu de données)
+def build_figure(df, zoom, range_color):
+    fig = px.density_map(
+        df,
+        lat="Latitude",
+        lon="Longitude",
+        hover_name="Ville",
+        map_style="open-street-map",
+        animation_frame=df["Date"].dt.strftime("%Y-%m-%d"),
+        z="Temp_Avg",
+        zoom=zoom,
+        radius=7,
+        center={"lat": df["Latitude"].mean(), "lon": df["Longitude"].mean()},
+        color_continuous_scale="Plasma",
+        range_color=range_color,
+        hover_data=HOVER_COLUMNS
+    )
+    return figure_dict(fig)
+
+
+# Figure Plotly -> dict JSON ; le thème est appliqué à l'affichage (thème Streamlit) :
+# inutile de stocker le modèle par défaut de Plotly
+def figure_dict(fig):
+    figure = json.loads(fig.to_json())
+    figure["layout"].pop("template", None)
+    return figure
+
+
+def temperature_range(daily):
+    return [float(daily["Temp_Avg"].min()), float(daily["Temp_Avg"].max())]
+
+
+# Toutes les cartes des pages à partir de l'agrégat daily complet
+def build_region_maps(daily):
+    range_color = temperature_range(daily)
+    maps = {}
+    for kind, (regions, zoom) in REGIONS.items():
+        for name, city_ids in regions.items():
+            df = select_cities(daily, city_ids).reset_index(drop=True)
+            if not df.empty:
+                maps[f"{kind}/{name}"] = {"key": data_key(df), "figure": build_figure(df, zoom, range_color)}
+    return maps
+
+
+# Étape du script quotidien, après write_results
+def write_region_maps(folder=RESULTS_FOLDER):
+    daily = read_results(columns=MAP_COLUMNS, folder=folder, table="daily")
+    maps = build_region_maps(daily)
+    atomic_write_json(maps, maps_path(folder))
+    return len(maps)
+
+
+def read_region_maps(folder=RESULTS_FOLDER):
+    if not os.path.exists(maps_path(folder)):
+        return {}
+    with open(maps_path(folder), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Figure d'une région pour les lignes `df` affichées par la page : précalculée si elle correspond, sinon construite
+def region_figure(kind, name, df, folder=RESULTS_FOLDER, maps=None):
+    df = df.reset_index(drop=True)
+    entry = (maps if maps is not None else read_region_maps(folder)).get(f"{kind}/{name}")
+    if entry is not None and entry["key"] == data_key(df):
+        return entry["figure"]
+    all_temps = read_results(columns=["Temp_Avg"], folder=folder, table="daily")
+    return build_figure(df, REGIONS[kind][1], temperature_range(all_temps))
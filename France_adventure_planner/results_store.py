@@ -0,0 +1,339 @@
+import os
+import pandas as pd
+from storage import atomic_write_csv, atomic_write_parquet
+from forecast_decoder import DAY_TIMES, known_codes, weather_codes, weather_labels
+from cities import add_city_ids
+from group_mode import grouped_mode
+from hotels import HOTEL_FIELDS, hotels_wide
+
+# pyarrow est optionnel : sans lui, la table des prévisions est écrite et lue en CSV
+try:
+    import pyarrow  # type: ignore # noqa: F401
+    import pyarrow.parquet  # type: ignore # noqa: F401
+except ImportError:
+    pyarrow = None
+
+# Résultats du jour, en étoile autour de la table des prévisions (clé City_Id) :
+#   results/forecasts.parquet (ou .csv) -> une ligne par ville et par créneau de 3 h
+#   results/cities.csv                  -> City_Id, Ville, Latitude, Longitude
+#   results/hotels.csv                  -> City_Id, Rank, Name, Link, Note
+#   results/links.csv                   -> City_Id, Train
+#   results/conditions.csv              -> Weather_Code, Weather : description de l'API pour les identifiants
+#                                          hors vocabulaire (forecast_decoder.CONDITIONS) vus dans les prévisions
+# Les hôtels et le lien SNCF ne sont plus répétés sur chaque créneau : les pages joignent à la demande.
+# Agrégats calculés une fois par le script quotidien (même format que la table des prévisions) :
+#   results/daily.parquet      -> une ligne par ville et par jour : températures max/min/moyenne, humidité moyenne,
+#                                 probabilité de pluie max, météo dominante
+#   results/day_times.parquet  -> une ligne par ville et par jour, météo dominante par moment de la journée
+RESULTS_FOLDER = "results"
+DIMENSIONS = ["cities", "hotels", "links"]
+AGGREGATES = ["daily", "day_times"]
+# Anciens fichiers larges : encore lus tant que results/ n'existe pas, supprimés à la première écriture
+LEGACY_CSV = "final_results.csv"
+LEGACY_FILES = [LEGACY_CSV, "final_results.parquet"]
+
+CITY_COLUMNS = ["Ville", "Latitude", "Longitude"]
+LINK_COLUMNS = ["Train"]
+HOTEL_COLUMNS = [f"Hotel_{rank}_{field}" for rank in range(1, 6) for field in HOTEL_FIELDS]
+
+# Types des colonnes
+#   - textes répétés (ville, météo, liens) -> category
+#   - météo : identifiant OWM (Weather_Code, et un par moment de la journée dans day_times) -> Int16,
+#     le libellé "Weather" n'est pas stocké mais recalculé à la lecture
+#   - mesures et notes des hôtels ("N/A" -> NaN) -> float32 (coordonnées gardées en float64)
+#   - dates -> datetime64
+CATEGORY_COLUMNS = ["Ville", "Weather", "Train"] + [
+    f"Hotel_{rank}_{field}" for rank in range(1, 6) for field in ["Name", "Link"]
+]
+CODE_COLUMNS = ["Weather_Code"] + DAY_TIMES
+FLOAT32_COLUMNS = ["Temp_Max", "Temp_Min", "Temp_Avg", "Humidity", "Rain_Probability", "Weather_Score"] + [
+    f"Hotel_{rank}_Note" for rank in range(1, 6)
+]
+DATE_COLUMNS = ["Date", "Run_Date"]
+
+
+# Les agrégats, déjà arrondis pour l'affichage, restent en float64 (un float32 afficherait 20.799999)
+def typed_results(df, float_dtype="float32"):
+    df = df.copy()
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(float_dtype)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in CODE_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int16")
+    if "Day_Time" in df.columns:
+        df["Day_Time"] = pd.Categorical(df["Day_Time"], categories=DAY_TIMES, ordered=True)
+    if "Hour" in df.columns:
+        df["Hour"] = df["Hour"].astype("int8")
+    if "City_Id" in df.columns:
+        df["City_Id"] = df["City_Id"].astype("Int32")
+    return df
+
+
+# Identifiants météo retrouvés depuis les libellés (fichiers écrits avant les identifiants)
+def _with_codes(df):
+    if "Weather_Code" not in df.columns and "Weather" in df.columns:
+        df = df.assign(Weather_Code=weather_codes(df["Weather"].astype(object)))
+    return df
+
+
+# Descriptions des identifiants hors vocabulaire : {identifiant: description}
+def read_conditions(folder=RESULTS_FOLDER):
+    path = table_path("conditions", folder)
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path)
+    return dict(zip(df["Weather_Code"].astype(int), df["Weather"]))
+
+
+# Libellés météo recalculés depuis les identifiants, puis colonnes demandées seulement
+def _with_labels(df, columns=None, folder=RESULTS_FOLDER):
+    extra = None
+    if "Weather_Code" in df.columns and "Weather" not in df.columns and (columns is None or "Weather" in columns):
+        extra = read_conditions(folder)
+        df["Weather"] = weather_labels(df["Weather_Code"], extra)
+    for col in DAY_TIMES:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            if extra is None:
+                extra = read_conditions(folder)
+            df[col] = weather_labels(df[col], extra)
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+# Colonnes à lire pour obtenir `columns` : le libellé météo vient de l'identifiant
+def _stored_columns(columns):
+    if columns is None or "Weather" not in columns or "Weather_Code" in columns:
+        return columns
+    return list(columns) + ["Weather_Code"]
+
+
+def _float_dtype(name):
+    return "float64" if name in AGGREGATES else "float32"
+
+
+def table_path(name, folder=RESULTS_FOLDER, ext="csv"):
+    return os.path.join(folder, f"{name}.{ext}")
+
+
+# Tables du jour à partir des prévisions décodées, de la table longue des hôtels et des liens SNCF par ville
+def build_tables(df_meteo, hotels, train_links):
+    df_meteo = _with_codes(add_city_ids(df_meteo))
+    cities = df_meteo.drop_duplicates("City_Id")[["City_Id"] + CITY_COLUMNS].reset_index(drop=True)
+    links = pd.DataFrame({"City_Id": cities["City_Id"], "Train": cities["Ville"].map(train_links)})
+    hotels = cities[["City_Id", "Ville"]].merge(hotels, on="Ville")[["City_Id", "Rank"] + HOTEL_FIELDS]
+    # Seul le libellé des identifiants hors vocabulaire est gardé, il ne se recalcule pas
+    unknown = ~known_codes(df_meteo["Weather_Code"].fillna(-1).to_numpy(dtype="int64"))
+    conditions = df_meteo.loc[unknown, ["Weather_Code", "Weather"]].drop_duplicates("Weather_Code")
+    forecasts = df_meteo.drop(columns=CITY_COLUMNS + ["Weather"])
+    return {
+        "forecasts": forecasts, "cities": cities, "hotels": hotels, "links": links,
+        "conditions": conditions.reset_index(drop=True),
+        "daily": daily_table(forecasts), "day_times": day_time_table(forecasts),
+    }
+
+
+# Agrégat par ville et par jour, arrondi comme il est affiché
+def daily_table(forecasts):
+    forecasts = _with_codes(forecasts)
+    daily = forecasts.groupby(["City_Id", "Date"], as_index=False, observed=True).agg({
+        "Temp_Max": "max",
+        "Temp_Min": "min",
+        "Temp_Avg": "mean",
+        "Humidity": "mean",
+        "Rain_Probability": "max",
+    })
+    daily["Weather_Code"] = grouped_mode(forecasts, ["City_Id", "Date"], "Weather_Code").to_numpy()
+    for col in ["Temp_Max", "Temp_Min", "Temp_Avg", "Humidity"]:
+        daily[col] = daily[col].round(1)
+    daily["Rain_Probability"] = daily["Rain_Probability"].round(2)
+    return daily
+
+
+# Météo dominante par ville, jour et moment de la journée, un moment par colonne
+def day_time_table(forecasts):
+    grouped = grouped_mode(_with_codes(forecasts), ["City_Id", "Date", "Day_Time"], "Weather_Code")
+    pivot = grouped.unstack("Day_Time")
+    pivot = pivot.reindex(columns=DAY_TIMES).reset_index()
+    pivot.columns.name = None
+    return pivot
+
+
+# Découper un ancien fichier large (hôtels et lien répétés sur chaque ligne) en tables
+def split_wide(df):
+    df = add_city_ids(df)
+    first = df.drop_duplicates("City_Id")
+    hotel_cols = [col for col in HOTEL_COLUMNS if col in df.columns]
+
+    long = first.melt(id_vars="City_Id", value_vars=hotel_cols).dropna(subset=["value"])
+    parts = long["variable"].str.split("_", expand=True)
+    long = long.assign(Rank=parts[1].astype(int), Field=parts[2])
+    hotels = long.pivot(index=["City_Id", "Rank"], columns="Field", values="value").reset_index()
+    hotels = hotels.reindex(columns=["City_Id", "Rank"] + HOTEL_FIELDS)
+
+    return {
+        "forecasts": df.drop(columns=CITY_COLUMNS + LINK_COLUMNS + hotel_cols, errors="ignore"),
+        "cities": first[["City_Id"] + CITY_COLUMNS].reset_index(drop=True),
+        "hotels": hotels,
+        "links": first.reindex(columns=["City_Id"] + LINK_COLUMNS).reset_index(drop=True),
+    }
+
+
+# Écrire les tables (dimensions d'abord : la table des prévisions ne référence jamais une ville absente)
+def write_results(tables, folder=RESULTS_FOLDER):
+    for name in DIMENSIONS + ["conditions"]:
+        if name in tables:
+            atomic_write_csv(tables[name], table_path(name, folder))
+
+    stale = []
+    for name in ["forecasts"] + [name for name in AGGREGATES if name in tables]:
+        parquet_path, csv_path = table_path(name, folder, "parquet"), table_path(name, folder)
+        if pyarrow is not None:
+            atomic_write_parquet(typed_results(tables[name], _float_dtype(name)), parquet_path)
+            stale.append(csv_path)
+        else:
+            atomic_write_csv(tables[name], csv_path)
+            stale.append(parquet_path)
+
+    # Un seul format par table, et plus d'ancien fichier large à côté des tables
+    for path in stale + LEGACY_FILES:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _has_tables(folder):
+    return os.path.exists(table_path("cities", folder))
+
+
+def _filter_rows(df, city_ids=None, start=None, end=None):
+    if city_ids is not None:
+        df = df[df["City_Id"].isin(list(city_ids))]
+    if start is not None:
+        df = df[df["Date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["Date"] <= pd.Timestamp(end)]
+    return df.reset_index(drop=True)
+
+
+# Table par ville et par date ("forecasts" ou un agrégat), colonnes et filtres appliqués à la lecture
+# quand c'est possible ; None si la table n'a pas été écrite
+def _read_table(name, columns=None, city_ids=None, start=None, end=None, folder=RESULTS_FOLDER):
+    parquet_path, csv_path = table_path(name, folder, "parquet"), table_path(name, folder)
+    stored = _stored_columns(columns)
+    if pyarrow is not None and os.path.exists(parquet_path):
+        if stored is not None:
+            available = pyarrow.parquet.read_schema(parquet_path).names
+            stored = [col for col in stored if col in available]
+        filters = []
+        if city_ids is not None:
+            filters.append(("City_Id", "in", [int(city_id) for city_id in city_ids]))
+        if start is not None:
+            filters.append(("Date", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("Date", "<=", pd.Timestamp(end)))
+        df = pd.read_parquet(parquet_path, columns=stored, filters=filters or None).reset_index(drop=True)
+        return _with_labels(df, columns, folder)
+
+    if not os.path.exists(csv_path):
+        return None
+    df = pd.read_csv(csv_path, usecols=(lambda col: col in stored) if stored is not None else None)
+    return _with_labels(_filter_rows(typed_results(df, _float_dtype(name)), city_ids, start, end), columns, folder)
+
+
+# Table des prévisions seule
+def read_forecasts(columns=None, city_ids=None, start=None, end=None, folder=RESULTS_FOLDER):
+    df = _read_table("forecasts", columns, city_ids, start, end, folder)
+    if df is not None:
+        return df
+    df = _with_codes(split_wide(pd.read_csv(LEGACY_CSV))["forecasts"])
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return _filter_rows(typed_results(df), city_ids, start, end)
+
+
+# Agrégat du jour ("daily" ou "day_times")
+def read_aggregate(name, columns=None, city_ids=None, start=None, end=None, folder=RESULTS_FOLDER):
+    df = _read_table(name, columns, city_ids, start, end, folder)
+    if df is not None:
+        return df
+    # Résultats écrits avant les agrégats : calculés à la lecture
+    build = {"daily": daily_table, "day_times": day_time_table}[name]
+    df = typed_results(build(read_forecasts(None, city_ids, start, end, folder)), "float64")
+    return _with_labels(df, columns, folder)
+
+
+# Une table de dimension ("cities", "hotels" ou "links"), éventuellement pour quelques villes
+def read_dimension(name, city_ids=None, folder=RESULTS_FOLDER):
+    if _has_tables(folder):
+        df = pd.read_csv(table_path(name, folder))
+    else:
+        df = split_wide(pd.read_csv(LEGACY_CSV))[name]
+    df = typed_results(df)
+    if city_ids is not None:
+        df = df[df["City_Id"].isin(list(city_ids))]
+    return df.reset_index(drop=True)
+
+
+# Ajouter à `df` (avec une colonne City_Id) les colonnes de dimension demandées
+# (read_dimension remplaçable, ex. par la version en cache de data_access)
+def join_dimensions(df, columns, folder=RESULTS_FOLDER, read_dimension=read_dimension):
+    wanted = [col for col in columns if col not in df.columns]
+    city_ids = df["City_Id"].dropna().unique()
+
+    city_cols = [col for col in wanted if col in CITY_COLUMNS]
+    if city_cols:
+        df = df.merge(read_dimension("cities", city_ids, folder)[["City_Id"] + city_cols], on="City_Id", how="left")
+    link_cols = [col for col in wanted if col in LINK_COLUMNS]
+    if link_cols:
+        df = df.merge(read_dimension("links", city_ids, folder)[["City_Id"] + link_cols], on="City_Id", how="left")
+    hotel_cols = [col for col in wanted if col in HOTEL_COLUMNS]
+    if hotel_cols:
+        hotels = read_dimension("hotels", city_ids, folder)
+        wide = hotels_wide(hotels, key="City_Id").reindex(columns=hotel_cols)
+        df = df.merge(typed_results(wide), left_on="City_Id", right_index=True, how="left")
+    return df
+
+
+# Tableaux "Daily Weather Highlights" d'une région : {City_Id: météo dominante, une ligne par jour (date) et
+# une colonne par moment de la journée}, en une lecture de day_times et un seul groupby par ville
+def read_day_time_tables(city_ids, folder=RESULTS_FOLDER):
+    day_times = read_aggregate("day_times", ["City_Id", "Date"] + DAY_TIMES, city_ids, folder=folder)
+    day_times = day_times.assign(Date=day_times["Date"].dt.date).set_index("Date")
+    return {int(city_id): table[DAY_TIMES] for city_id, table in day_times.groupby("City_Id", observed=True)}
+
+
+# Lire les résultats du jour en ne chargeant que ce qui est demandé
+#   columns  : colonnes utiles, prévisions et dimensions mélangées (None = toutes)
+#   city_ids : villes à garder (ex. TREKS[...], COASTS[...])
+#   start/end: bornes incluses sur la date de prévision
+#   table    : "forecasts" (un créneau de 3 h par ligne) ou un agrégat ("daily", "day_times")
+# Seules les dimensions dont une colonne est demandée sont lues et jointes.
+def read_results(columns=None, city_ids=None, start=None, end=None, folder=RESULTS_FOLDER, table="forecasts"):
+    dimension_columns = CITY_COLUMNS + LINK_COLUMNS + HOTEL_COLUMNS
+    fact_columns = None
+    if columns is not None:
+        fact_columns = ["City_Id"] + [col for col in columns if col not in dimension_columns + ["City_Id"]]
+        if (start is not None or end is not None) and "Date" not in fact_columns:
+            fact_columns.append("Date")
+
+    if table == "forecasts":
+        df = read_forecasts(fact_columns, city_ids, start, end, folder)
+    else:
+        df = read_aggregate(table, fact_columns, city_ids, start, end, folder)
+    df = join_dimensions(df, columns if columns is not None else dimension_columns, folder)
+
+    # Les catégories absentes des lignes lues ne servent à rien
+    for col in df.select_dtypes("category").columns:
+        if col != "Day_Time":
+            df[col] = df[col].cat.remove_unused_categories()
+
+    if columns is not None:
+        df = df[list(columns)]
+    return df
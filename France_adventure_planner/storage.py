@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+import numpy as np
+
+# Écritures atomiques : fichier temporaire dans le même dossier puis os.replace,
+# les lecteurs (pages Streamlit) voient soit l'ancien fichier, soit le nouveau, jamais un fichier à moitié écrit.
+# mkstemp crée le fichier temporaire en 0600 et os.replace garde ce mode : on lui redonne les droits d'un fichier
+# créé normalement (0666 moins le umask, 0644 en général), lisible par une page Streamlit lancée par un autre compte.
+# Le umask ne se lit qu'en le remplaçant : lu une fois au chargement du module.
+_umask = os.umask(0o022)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+
+def _atomic_write(path, write):
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=os.path.basename(path))
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_csv(df, path, **to_csv_kwargs):
+    to_csv_kwargs.setdefault("index", False)
+    to_csv_kwargs.setdefault("encoding", "utf-8")
+    _atomic_write(path, lambda tmp_path: df.to_csv(tmp_path, **to_csv_kwargs))
+
+
+def atomic_write_json(obj, path, **json_kwargs):
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, **json_kwargs)
+    _atomic_write(path, write)
+
+
+def atomic_write_parquet(df, path, **to_parquet_kwargs):
+    to_parquet_kwargs.setdefault("index", False)
+    _atomic_write(path, lambda tmp_path: df.to_parquet(tmp_path, **to_parquet_kwargs))
+
+
+def atomic_write_npy(array, path):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+    _atomic_write(path, write)